@@ -49,7 +49,11 @@ REST_FRAMEWORK = {
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
-        'PAGE_SIZE': 100
+        'PAGE_SIZE': 100,
+    'DEFAULT_RENDERER_CLASSES': (
+        'ebay.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
 
@@ -103,7 +107,8 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware'
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'ebay.db_routing.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'charityshopbackend.urls'
@@ -125,18 +130,57 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'charityshopbackend.wsgi.application'
 
+# Postgres connections are pooled per process by default (psycopg 3). With
+# DB_POOL=False they are kept open for DB_CONN_MAX_AGE seconds instead.
+# run_worker.py sets PROCESS_TYPE=worker so RQ jobs get a smaller pool.
+PROCESS_TYPE = os.getenv("PROCESS_TYPE", "web")
+DB_POOL = os.getenv("DB_POOL", "True") == "True"
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 1 if PROCESS_TYPE == "worker" else 2))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 2 if PROCESS_TYPE == "worker" else 4))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 10))
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", 600))
+
+
+def database_config(url):
+    database = dj_database_url.parse(url)
+    if database["ENGINE"] != "django.db.backends.postgresql":
+        return database
+
+    if DB_POOL:
+        from psycopg_pool import ConnectionPool
+
+        database["CONN_MAX_AGE"] = 0
+        database.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": DB_POOL_MIN_SIZE,
+            "max_size": DB_POOL_MAX_SIZE,
+            "timeout": DB_POOL_TIMEOUT,
+            "max_idle": 300,
+            "check": ConnectionPool.check_connection,
+        }
+    else:
+        database["CONN_MAX_AGE"] = DB_CONN_MAX_AGE
+        database["CONN_HEALTH_CHECKS"] = True
+    return database
+
+
 if len(sys.argv) == 1:
     DATABASES = {
-        "default": dj_database_url.parse(os.environ.get("DATABASE_URL")),
+        "default": database_config(os.environ.get("DATABASE_URL")),
     }
 
 elif len(sys.argv) > 0 and sys.argv[1] != 'collectstatic':
     if os.getenv("DATABASE_URL", None) is None:
         raise Exception("DATABASE_URL environment variable not defined")
     DATABASES = {
-        "default": dj_database_url.parse(os.environ.get("DATABASE_URL")),
+        "default": database_config(os.environ.get("DATABASE_URL")),
     }
 
+if os.getenv("READ_REPLICA_URL") and 'DATABASES' in globals():
+    DATABASES["replica"] = database_config(os.environ.get("READ_REPLICA_URL"))
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+DATABASE_ROUTERS = ['ebay.db_routing.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 15))
 
 CACHES = {
     "default": {
@@ -146,6 +190,16 @@ CACHES = {
                 "ssl_cert_reqs": None
         }
     },
+    # API responses: a per-process LRU in front of the shared Redis cache
+    "tiered": {
+        "BACKEND": "ebay.tiered_cache.TieredCache",
+        "OPTIONS": {
+            "SHARED_CACHE": "default",
+            "LOCAL_MAX_ENTRIES": int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", "500")),
+            "LOCAL_TIMEOUT": int(os.getenv("LOCAL_CACHE_TIMEOUT", "30")),
+            "CHANNEL": None if TESTING else "cache_invalidation",
+        }
+    },
     "diskcache": {
         "BACKEND": "diskcache.DjangoCache",
         "LOCATION": os.path.join(BASE_DIR, "diskcache"),
@@ -155,6 +209,10 @@ CACHES = {
     }
 }
 
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "database")
+SEARCH_INDEX_DIR = os.getenv("SEARCH_INDEX_DIR", os.path.join(BASE_DIR, "searchindex"))
+SEARCH_INDEX_MAX_RESULTS = 1000
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -2,6 +2,8 @@ import os
 import sys
 from unittest import TestCase, main, mock
 import importlib
+import importlib.util
+import unittest
 
 class TestASGIBasic(TestCase):
 
@@ -80,4 +82,31 @@ class TestWSGIConfiguration(TestCase):
         import charityshopbackend.wsgi
         importlib.reload(charityshopbackend.wsgi)
         
-        mock_get_wsgi.assert_called()
\ No newline at end of file
+        mock_get_wsgi.assert_called()
+
+class TestDatabaseConfig(TestCase):
+
+    def setUp(self):
+        self.settings = importlib.import_module('charityshopbackend.settings')
+
+    def test_sqlite_is_left_unchanged(self):
+        database = self.settings.database_config('sqlite:////tmp/db.sqlite3')
+
+        self.assertNotIn('pool', database.get('OPTIONS', {}))
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+
+    def test_persistent_connections_when_pool_disabled(self):
+        with mock.patch.object(self.settings, 'DB_POOL', False):
+            database = self.settings.database_config('postgres://user:pw@localhost:5432/shop')
+
+        self.assertEqual(database['CONN_MAX_AGE'], self.settings.DB_CONN_MAX_AGE)
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+        self.assertNotIn('pool', database.get('OPTIONS', {}))
+
+    @unittest.skipUnless(importlib.util.find_spec('psycopg_pool'), "psycopg_pool is not installed")
+    def test_pool_options_when_pool_enabled(self):
+        with mock.patch.object(self.settings, 'DB_POOL', True):
+            database = self.settings.database_config('postgres://user:pw@localhost:5432/shop')
+
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+        self.assertEqual(database['OPTIONS']['pool']['max_size'], self.settings.DB_POOL_MAX_SIZE)
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.contrib.auth import views as auth_views
-from ebay.views.favorite_list import FavoriteListView
+from ebay.views.favorite_list import FavoriteListView, FavoriteBatchView
 from databasescripts.views import RefreshDatabaseView
 from aiassistant.views import AiItemAssistantView
 
@@ -12,6 +12,7 @@ urlpatterns = [
     path('api/users/', include('ebay.urls.user_urls')),
     path('api/report/', include('ebay.urls.report_urls')),
     path('api/favorites/', FavoriteListView.as_view()),
+    path('api/favorites/batch/', FavoriteBatchView.as_view()),
     path('api/ai_assistant/', AiItemAssistantView.as_view()),
     path('api/refresh_items/', RefreshDatabaseView.as_view()),
     path("password_reset/", auth_views.PasswordResetView.as_view(template_name='reset_password.html'), name="reset_password.html"),
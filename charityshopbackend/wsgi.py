@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'charityshopbackend.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings
+
+if settings.SEARCH_BACKEND == 'index':
+    from ebay.search_index import get_index
+    get_index()
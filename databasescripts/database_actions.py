@@ -1,19 +1,88 @@
-from ebay.models import Charity, Item
+from ebay.models import Charity, FacetCount, Item, ItemArchive
 from ebay.serializers import CharitySerializer
+from ebay import search_index
+from ebay.rollups import ROLLUP_FIELDS, record_items_removed
+from ebay.archive import ARCHIVE_FIELDS, archive_rows
+from ebay.favorites_cache import users_favoriting, invalidate_users
+from ebay.generations import GLOBAL_SCOPE, bump, category_scope, charity_scope, items_changed
+from ebay.worker import get_redis
+from django.db import transaction
+from rq import Queue, get_current_job
 import logging
 
 logger = logging.getLogger(__name__)
+CHARITY_DELETE_CHUNK_SIZE = 1000
 
 def deleteCharity(id):
-     
-    try: 
-        charity = Charity.objects.get(id=id)
-        charity.delete()
+    """Hide the charity now and delete it with its items in a background job."""
+
+    try:
+        if Charity.objects.filter(id=id).update(is_hidden=True) == 0:
+            raise Charity.DoesNotExist(f"Charity {id} does not exist")
+        scopes = charityScopes(id)
+        bump(scopes)
+
+        try:
+            q = Queue(connection=get_redis())
+            q.enqueue(deleteCharityInChunks, id, job_id=charityDeletionJobId(id), job_timeout=10000,
+                      result_ttl=86400, failure_ttl=86400)
+        except Exception:
+            # nothing would ever delete it, so don't leave it hidden
+            Charity.objects.filter(id=id).update(is_hidden=False)
+            bump(scopes)
+            raise
         return "Success"
     except Exception as e:
         print(f"Error deleting charity: {e}")
         return e
 
+def charityScopes(charity_id):
+    """Every cache generation holding pages with this charity's items, read from its FacetCount rollups."""
+    categories = (FacetCount.objects.filter(facet='charity', value=str(charity_id), count__gt=0)
+                  .exclude(scope='').values_list('scope', flat=True))
+    return {GLOBAL_SCOPE, charity_scope(charity_id), *(category_scope(name) for name in categories)}
+
+def charityDeletionJobId(charity_id):
+    return f"delete_charity_{charity_id}"
+
+def deleteCharityInChunks(charity_id, chunk_size=CHARITY_DELETE_CHUNK_SIZE):
+    from ebay.views.charity_views import invalidate_charities
+
+    from ebay.suggest import rebuild_suggestions
+
+    job = get_current_job()
+    try:
+        # drop the hidden charity's items from suggestions before the slow part
+        rebuild_suggestions()
+    except Exception as e:
+        logger.error(f"Error rebuilding suggestions {e}")
+
+    items = Item.objects.filter(charity_id=charity_id)
+    total = items.count()
+    deleted = 0
+    reportDeletionProgress(job, deleted, total)
+
+    while True:
+        chunk = list(items.order_by('id').values_list('id', flat=True)[:chunk_size])
+        if not chunk:
+            break
+        deleted += deleteItems(Item.objects.filter(id__in=chunk))
+        reportDeletionProgress(job, deleted, total)
+        logger.info(f"Deleted {deleted}/{total} items of charity {charity_id}")
+
+    favorited_by = users_favoriting(charity_ids=[charity_id])
+    Charity.objects.filter(id=charity_id).delete()
+    invalidate_users(favorited_by)
+    invalidate_charities()
+    return deleted
+
+def reportDeletionProgress(job, deleted, total):
+
+    if job is None:
+        return
+    job.meta.update({"deleted": deleted, "total": total})
+    job.save_meta()
+
 def addCharity(charity_data):
 
     serializer = CharitySerializer(data=charity_data)
@@ -23,6 +92,10 @@ def addCharity(charity_data):
     else:
         return "Failure"
     
+def visibleItems():
+    """Items whose charity isn't hidden; a deleted charity stays hidden until its items are gone."""
+    return Item.objects.filter(charity__is_hidden=False)
+
 def itemInDatabase(item_id):
 
    try: 
@@ -35,10 +108,11 @@ def itemInDatabase(item_id):
    except Exception as e:
        print(e)
 
-def retrieveItem(item_id):
+def retrieveItem(item_id, only=None):
 
    try: 
-        item = Item.objects.get(ebay_id=item_id)
+        items = visibleItems().only(*only) if only else visibleItems()
+        item = items.get(ebay_id=item_id)
         return item
 
    except Item.DoesNotExist:
@@ -59,8 +133,8 @@ def getItemsByCategory(category_id):
 def deleteItemFromDatabase(item_id):
 
     try:
-        item = retrieveItem(item_id)
-        item.delete()
+        if deleteItems(Item.objects.filter(ebay_id=item_id)) == 0:
+            raise Item.DoesNotExist(item_id)
         logger.info(f"Deleted {item_id} from the database")
 
         return "Success"
@@ -68,10 +142,37 @@ def deleteItemFromDatabase(item_id):
         print(f"Error deleting item from database: {e}")
         return "Failure"
     
+def deleteItems(items, reason=ItemArchive.REASON_DELETED):
+
+    rows = list(items.values(*ROLLUP_FIELDS, *(field for field in ARCHIVE_FIELDS if field not in ROLLUP_FIELDS)))
+    if not rows:
+        return 0
+
+    item_ids = [row['id'] for row in rows]
+    favorited_by = users_favoriting(item_ids=item_ids)
+    with transaction.atomic():
+        archive_rows(rows, reason)
+        Item.objects.filter(id__in=item_ids).delete()
+        record_items_removed(rows)
+        items_changed(rows)
+    invalidate_users(favorited_by)
+    removeFromSearchIndex(item_ids)
+    return len(item_ids)
+
+def removeFromSearchIndex(item_ids):
+
+    if not search_index.index_enabled():
+        return
+
+    try:
+        search_index.remove_items(item_ids)
+    except Exception as e:
+        logger.error(f"Error removing items from search index: {e}")
+    
 def getItemsBySubCategory(subcategory):
     
     try:
-        items = Item.objects.filter(category_list__contains=[{"categoryName": subcategory}])
+        items = visibleItems().filter(category_list__contains=[{"categoryName": subcategory}])
         return items
     
     except Exception as e:
@@ -80,7 +181,7 @@ def getItemsBySubCategory(subcategory):
 
 def getItemsByFilter(subcategory, filter):
     try:
-         items = Item.objects.filter(category_list__contains=[{"categoryName": subcategory}]).filter(name__icontains=filter)
+         items = visibleItems().filter(category_list__contains=[{"categoryName": subcategory}]).filter(name__icontains=filter)
          return items
     except Exception as e:
         print(f'Error retrieving items by filter')
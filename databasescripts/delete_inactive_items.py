@@ -1,6 +1,6 @@
-from ebay.models import Item
+from ebay.models import Item, ItemArchive
 import logging
-from .database_actions import deleteItemFromDatabase
+from .database_actions import deleteItems
 from ebay.ebay_client import EbayClient
 import datetime
 
@@ -19,22 +19,20 @@ def deleteInactiveItems():
         current_date = datetime.date.today()
         items = Item.objects.filter(updated_at__lte=current_date - datetime.timedelta(days=DAYS_WITHOUT_CHECKING))[:5000]
 
+        active = []
+        delisted = []
         for item in items:
 
             item_is_active = client.isItemActive(item.ebay_id)
 
             if item_is_active == True:
-                item.updated_at = current_date
-                Item.save(item)
-                count += 1
-            elif item_is_active == "error":
-                deleteItemFromDatabase(item.ebay_id)
-                count += 1
-                deleted += 1
+                active.append(item.id)
             else:
-                deleteItemFromDatabase(item.ebay_id)
-                count += 1
-                deleted += 1
+                delisted.append(item.id)
+            count += 1
+
+        Item.objects.filter(id__in=active).update(updated_at=current_date)
+        deleted = deleteItems(Item.objects.filter(id__in=delisted), reason=ItemArchive.REASON_DELISTED)
 
         logger.info(f"processed {count} items.")
         logger.info(f"deleted {deleted} items")
@@ -0,0 +1,107 @@
+import copy
+import statistics
+import threading
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.utils import ConnectionHandler
+
+
+class Command(BaseCommand):
+    help = ("Compare per-request latency and Postgres connection counts for new-connection-per-request, "
+            "persistent and pooled connections")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="requests per thread")
+        parser.add_argument('--threads', type=int, default=4)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write("This benchmark needs a Postgres DATABASE_URL")
+            return
+
+        base = copy.deepcopy(settings.DATABASES['default'])
+        base.setdefault('OPTIONS', {}).pop('pool', None)
+        modes = {
+            'per_request': {'CONN_MAX_AGE': 0},
+            'persistent': {'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True},
+            'pooled': {'CONN_MAX_AGE': 0, 'pool': {'min_size': 1, 'max_size': options['threads']}},
+        }
+
+        self.stdout.write(f"{'mode':>12} {'p50 ms':>8} {'p95 ms':>8} {'opened':>7} {'held':>5}")
+        for name, mode in modes.items():
+            alias = f'bench_{name}'
+            database = copy.deepcopy(base)
+            database['CONN_MAX_AGE'] = mode['CONN_MAX_AGE']
+            database['CONN_HEALTH_CHECKS'] = mode.get('CONN_HEALTH_CHECKS', False)
+            database['OPTIONS']['application_name'] = alias
+            if 'pool' in mode:
+                database['OPTIONS']['pool'] = mode['pool']
+
+            handler = ConnectionHandler({alias: database})
+            sessions_before = self.sessions_opened()
+            latencies, held = self.run_threads(handler, alias, options['threads'], options['requests'])
+            sessions_after = self.sessions_opened()
+            if 'pool' in mode:
+                handler[alias].close_pool()
+
+            opened = sessions_after - sessions_before if sessions_before is not None else 'n/a'
+            self.stdout.write(
+                f"{name:>12} {statistics.median(latencies):>8.2f} {self.percentile(latencies, 95):>8.2f} "
+                f"{opened:>7} {held:>5}"
+            )
+
+    def run_threads(self, handler, alias, thread_count, request_count):
+        """Simulate request_count requests per thread; returns latencies and backends held once they finish."""
+        latencies = []
+        lock = threading.Lock()
+        finished = threading.Barrier(thread_count + 1)
+        release = threading.Event()
+
+        def worker():
+            local = []
+            for _ in range(request_count):
+                start = time.perf_counter()
+                with handler[alias].cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                    cursor.fetchone()
+                # what Django does on request_finished
+                handler[alias].close_if_unusable_or_obsolete()
+                local.append((time.perf_counter() - start) * 1000)
+            with lock:
+                latencies.extend(local)
+            finished.wait()
+            release.wait()
+            handler[alias].close()
+
+        threads = [threading.Thread(target=worker) for _ in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        finished.wait()
+        held = self.backends(alias)
+        release.set()
+        for thread in threads:
+            thread.join()
+        return latencies, held
+
+    def backends(self, alias):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM pg_stat_activity WHERE application_name = %s", [alias])
+            return cursor.fetchone()[0]
+
+    def sessions_opened(self):
+        """Total sessions opened on this database (Postgres 14+), or None if unavailable."""
+        try:
+            # session statistics are flushed asynchronously
+            time.sleep(1)
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_stat_clear_snapshot()")
+                cursor.execute("SELECT sessions FROM pg_stat_database WHERE datname = current_database()")
+                return cursor.fetchone()[0]
+        except Exception:
+            return None
+
+    def percentile(self, values, percent):
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
@@ -0,0 +1,52 @@
+import time
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from ebay.models import Item
+from ebay.fragments import card_fragments, detail_fragment, splice_results
+from ebay.pagination import ITEMS_PAGE_SIZE
+from ebay.serializers import ItemSerializer, ItemListSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare requests/sec of the DRF serializer path and the pre-rendered JSON path for item reads"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        items = Item.objects.order_by('-id')
+        first = items.first()
+        if first is None:
+            self.stdout.write("No items to benchmark")
+            return
+
+        renderer = JSONRenderer()
+        envelope = {"count": items.count(), "count_exact": True, "next": None, "previous": None}
+
+        def serializer_detail():
+            return renderer.render(ItemSerializer(Item.objects.get(ebay_id=first.ebay_id)).data)
+
+        def fast_detail():
+            return detail_fragment(first.ebay_id)
+
+        def serializer_page():
+            rows = items.only(*ItemListSerializer.Meta.fields)[:ITEMS_PAGE_SIZE]
+            return renderer.render({**envelope, "results": ItemListSerializer(rows, many=True).data})
+
+        def fast_page():
+            rows = list(items.only('id', 'card_json')[:ITEMS_PAGE_SIZE])
+            return splice_results(envelope, card_fragments(rows))
+
+        self.stdout.write(f"{'request':>8} {'serializer req/s':>17} {'fast req/s':>11} {'bytes':>8}")
+        for name, slow, fast in (('detail', serializer_detail, fast_detail), ('page', serializer_page, fast_page)):
+            fast()
+            slow_rate = self.rate(options['repeat'], slow)
+            fast_rate = self.rate(options['repeat'], fast)
+            self.stdout.write(f"{name:>8} {slow_rate:>17.0f} {fast_rate:>11.0f} {len(fast()):>8}")
+
+    def rate(self, repeat, func):
+        func()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return repeat / (time.perf_counter() - start)
@@ -0,0 +1,55 @@
+import time
+from django.core.management.base import BaseCommand
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from ebay.models import Item
+from ebay.pagination import ItemPageNumberPagination, KeysetPagination
+from ebay.serializers import ItemSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare page-number and cursor pagination latency at shallow and deep pages"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', nargs='+', type=int, default=[1, 500])
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory(HTTP_HOST='localhost')
+        items = Item.objects.order_by('-id')
+        page_size = ItemPageNumberPagination.page_size
+
+        total = items.count()
+        self.stdout.write(f"{total} items, {page_size} per page")
+        self.stdout.write(f"{'page':>6} {'page-number ms':>15} {'cursor ms':>10}")
+
+        for page in options['pages']:
+            if (page - 1) * page_size >= total:
+                self.stdout.write(f"{page:>6} skipped, not enough items")
+                continue
+
+            page_request = Request(factory.get('/items/', {'page': page}))
+            page_ms = self.time(options['repeat'], lambda: self.render(ItemPageNumberPagination(), items, page_request))
+
+            cursor_request = Request(factory.get('/items/', self.cursor_params(items, page, page_size)))
+            cursor_ms = self.time(options['repeat'], lambda: self.render(KeysetPagination(), items, cursor_request))
+
+            self.stdout.write(f"{page:>6} {page_ms:>15.2f} {cursor_ms:>10.2f}")
+
+    def cursor_params(self, items, page, page_size):
+        if page <= 1:
+            return {'pagination': 'cursor'}
+
+        last_row = items.order_by('-id')[(page - 1) * page_size - 1]
+        return {'cursor': KeysetPagination().cursor_token(last_row, reverse=False)}
+
+    def render(self, paginator, items, request):
+        rows = paginator.paginate_queryset(items, request)
+        return paginator.get_paginated_response(ItemSerializer(rows, many=True).data)
+
+    def time(self, repeat, func):
+        func()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) * 1000 / repeat
@@ -0,0 +1,18 @@
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from ebay.tiered_cache import STATS_KEY_PREFIX, TIERS, tier_stats
+
+
+class Command(BaseCommand):
+    help = "Report how many API cache lookups each tier answered (local LRU, shared Redis, miss) across processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="zero the counters after reporting")
+
+    def handle(self, *args, **options):
+        shared = caches['default']
+        for tier, stats in tier_stats(shared).items():
+            self.stdout.write(f"{tier:>8} {stats['count']:>12} {stats['ratio']:>8.2%}")
+
+        if options['reset']:
+            shared.delete_many([STATS_KEY_PREFIX + tier for tier in TIERS])
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from ebay.projection import item_storage_stats
+
+
+class Command(BaseCommand):
+    help = "Report the item table's size and the average stored size of its seller, location and category JSON"
+
+    def handle(self, *args, **options):
+        for key, value in item_storage_stats(connection).items():
+            self.stdout.write(f"{key:>28} {value}")
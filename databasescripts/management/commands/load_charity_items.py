@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from ebay.load_data_to_db import DatabaseLoader
+from ebay.models import Charity
+
+
+class Command(BaseCommand):
+    help = "Load a charity's eBay listings; first loads use the COPY bootstrap loader unless told otherwise"
+
+    def add_arguments(self, parser):
+        parser.add_argument('charity_id', type=int)
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument('--bootstrap', action='store_true', help="force the COPY + ON CONFLICT loader")
+        mode.add_argument('--incremental', action='store_true', help="force the per-row loader")
+
+    def handle(self, *args, **options):
+        if not Charity.objects.filter(id=options['charity_id']).exists():
+            raise CommandError(f"Charity {options['charity_id']} does not exist")
+
+        bootstrap = True if options['bootstrap'] else False if options['incremental'] else None
+        loader = DatabaseLoader(options['charity_id'], bootstrap=bootstrap)
+        result = loader.load_items_to_db()
+        self.stdout.write(
+            f"{result}: processed={loader.items_processed} saved={loader.items_saved} skipped={loader.items_skipped}"
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from ebay.models import CategoryCount, FacetCount
+from ebay.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-category item counters and facet counts from the items table"
+
+    def handle(self, *args, **options):
+        rebuild_rollups()
+        self.stdout.write(
+            f"Rebuilt counts for {CategoryCount.objects.count()} categories "
+            f"and {FacetCount.objects.count()} facet values"
+        )
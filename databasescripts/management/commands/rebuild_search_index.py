@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from ebay.models import Item
+from ebay import search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the on-disk search index from every item in the database"
+
+    def handle(self, *args, **options):
+        items = Item.objects.only('id', 'name', 'category', 'category_list').iterator(chunk_size=2000)
+        search_index.rebuild(items)
+        index = search_index.SearchIndex()
+        self.stdout.write(f"Indexed {index.doc_count} items into {index.directory}")
@@ -3,12 +3,13 @@ import datetime
 
 logger = logging.getLogger(__name__)
 DAYS_WITHOUT_CHECKING = 30
+REFRESH_DELETE_CHUNK_SIZE = 1000
 
 
 def deleteInactiveItems(items):
-    from ebay.models import Item
+    from ebay.models import Item, ItemArchive
     from ebay.ebay_client import EbayClient
-    from .database_actions import deleteItemFromDatabase
+    from .database_actions import deleteItems
 
     client = EbayClient("")
     count = 0
@@ -16,22 +17,20 @@ def deleteInactiveItems(items):
 
     try:
 
+        active = []
+        delisted = []
         for item in items:
 
             item_is_active = client.isItemActive(item.ebay_id)
 
             if item_is_active == True:
-                item.updated_at = datetime.date.today()
-                Item.save(item)
-                count += 1
-            elif item_is_active == "error":
-                deleteItemFromDatabase(item.ebay_id)
-                count += 1
-                deleted += 1
+                active.append(item.id)
             else:
-                deleteItemFromDatabase(item.ebay_id)
-                count += 1
-                deleted += 1
+                delisted.append(item.id)
+            count += 1
+
+        Item.objects.filter(id__in=active).update(updated_at=datetime.date.today())
+        deleted = deleteItems(Item.objects.filter(id__in=delisted), reason=ItemArchive.REASON_DELISTED)
 
         logger.info(f"processed {count} items.")
         logger.info(f"deleted {deleted} items")
@@ -43,8 +42,10 @@ def deleteInactiveItems(items):
 
 
 def refreshDatabase():
-    from ebay.models import Item, FavoriteList, Charity
+    from ebay.models import Item, ItemArchive, FavoriteList, Charity
     from ebay.load_data_to_db import DatabaseLoader
+    from ebay.suggest import rebuild_suggestions
+    from .database_actions import deleteItems
 
     favoriteLists = FavoriteList.objects.filter(items__isnull=False)
     items = set()
@@ -54,11 +55,28 @@ def refreshDatabase():
 
     deleteInactiveItems(items)
 
-    for charity in Charity.objects.all():
+    favorited_ebay_ids = {item.ebay_id for item in items}
+    for charity in Charity.objects.filter(is_hidden=False):
         logger.info(f"refreshing charity {charity.name}")
-        Item.objects.filter(charity=charity).exclude(id__in=[item.id for item in items]).delete()
-        loader = DatabaseLoader(charity.id)
-        loader.load_items_to_db()
+        # changed listings are archived by the loader; unchanged ones are left alone
+        loader = DatabaseLoader(charity.id, refresh=True, keep_ebay_ids=favorited_ebay_ids)
+        result = loader.load_items_to_db()
+        if result not in ("success", "success - no items"):
+            logger.error(f"Not removing delisted items for charity {charity.name}, load failed: {result}")
+            continue
+
+        delisted = [item_id for item_id, ebay_id in Item.objects.filter(charity=charity).values_list('id', 'ebay_id')
+                    if ebay_id not in loader.seen_ebay_ids and ebay_id not in favorited_ebay_ids]
+        deleted = 0
+        for start in range(0, len(delisted), REFRESH_DELETE_CHUNK_SIZE):
+            deleted += deleteItems(Item.objects.filter(id__in=delisted[start:start + REFRESH_DELETE_CHUNK_SIZE]),
+                                   reason=ItemArchive.REASON_DELISTED)
+        logger.info(f"replaced {loader.items_replaced} changed and removed {deleted} delisted items")
+
+    try:
+        rebuild_suggestions()
+    except Exception as e:
+        logger.error(f"Error rebuilding suggestions {e}")
 
 
     
@@ -1,9 +1,11 @@
+from unittest.mock import patch
 from django.test import TestCase
-from ebay.models import Charity, Item
+from ebay.models import Charity, Item, ItemArchive
 from ebay.serializers import CharitySerializer
 
 from .database_actions import (
     deleteCharity,
+    deleteCharityInChunks,
     addCharity,
     itemInDatabase,
     retrieveItem,
@@ -23,11 +25,60 @@ class CharityUtilsTests(TestCase):
             image_url = "www.picture.com"
         )
 
-    def test_delete_charity_success(self):
+    @patch('databasescripts.database_actions.get_redis')
+    @patch('databasescripts.database_actions.Queue')
+    def test_delete_charity_hides_and_enqueues(self, mock_queue, mock_get_redis):
         result = deleteCharity(self.charity.id)
 
         self.assertEqual(result, "Success")
+        self.assertTrue(Charity.objects.get(id=self.charity.id).is_hidden)
+        mock_queue.return_value.enqueue.assert_called_once()
+        args, kwargs = mock_queue.return_value.enqueue.call_args
+        self.assertEqual(args, (deleteCharityInChunks, self.charity.id))
+        self.assertEqual(kwargs['job_id'], "delete_charity_1234")
+
+    @patch('databasescripts.database_actions.get_redis')
+    @patch('databasescripts.database_actions.Queue')
+    def test_delete_charity_unhides_when_enqueue_fails(self, mock_queue, mock_get_redis):
+        mock_queue.return_value.enqueue.side_effect = ConnectionError("redis down")
+
+        result = deleteCharity(self.charity.id)
+
+        self.assertIsInstance(result, ConnectionError)
+        self.assertFalse(Charity.objects.get(id=self.charity.id).is_hidden)
+
+    def test_charity_scopes_come_from_rollups(self):
+        from ebay.generations import GLOBAL_SCOPE, category_scope, charity_scope
+        from ebay.rollups import rebuild_rollups
+        from .database_actions import charityScopes
+
+        Item.objects.create(ebay_id="A", name="A", price=1, charity=self.charity,
+                            category_list=[{"categoryName": "Books"}, {"categoryName": "Maps"}])
+        rebuild_rollups()
+
+        with self.assertNumQueries(1):
+            scopes = charityScopes(self.charity.id)
+
+        self.assertEqual(scopes, {GLOBAL_SCOPE, charity_scope(1234), category_scope("Books"), category_scope("Maps")})
+
+    @patch('ebay.views.charity_views.cache')
+    @patch('databasescripts.database_actions.get_current_job')
+    def test_delete_charity_in_chunks_reports_progress(self, mock_get_job, mock_cache):
+        for index in range(5):
+            Item.objects.create(ebay_id=f"C{index}", name="Item", price=1, category_list=[], charity=self.charity)
+        job = mock_get_job.return_value
+        job.meta = {}
+        progress = []
+        job.save_meta.side_effect = lambda: progress.append(dict(job.meta))
+
+        deleted = deleteCharityInChunks(self.charity.id, chunk_size=2)
+
+        self.assertEqual(deleted, 5)
+        self.assertEqual([entry['deleted'] for entry in progress], [0, 2, 4, 5])
+        self.assertEqual(progress[-1]['total'], 5)
         self.assertFalse(Charity.objects.filter(id=self.charity.id).exists())
+        self.assertEqual(ItemArchive.objects.count(), 5)
+        mock_cache.delete.assert_called_once_with('charities_list')
 
     def test_delete_charity_not_found(self):
         result = deleteCharity(9999)
@@ -170,8 +221,126 @@ class ItemDeleteTests(TestCase):
 
         self.assertEqual(result, "Success")
         self.assertFalse(Item.objects.filter(ebay_id="DELETE_ME").exists())
+        archived = ItemArchive.objects.get(ebay_id="DELETE_ME")
+        self.assertEqual((archived.charity_id, archived.reason), (1234, ItemArchive.REASON_DELETED))
 
     def test_delete_item_not_found(self):
         result = deleteItemFromDatabase("MISSING")
 
-        self.assertEqual(result, "Failure")
\ No newline at end of file
+        self.assertEqual(result, "Failure")
+
+
+class InactiveItemSweepTests(TestCase):
+
+    def setUp(self):
+        charity = Charity.objects.create(id=1234, name="Test Charity", description="test charity")
+        for ebay_id in ("LIVE", "SOLD"):
+            Item.objects.create(ebay_id=ebay_id, name=ebay_id, price=5, category_list=[{"categoryName": "Misc"}],
+                                charity=charity)
+        Item.objects.update(updated_at="2020-01-01T00:00:00Z")
+
+    @patch('databasescripts.delete_inactive_items.EbayClient')
+    def test_delisted_items_are_archived_in_bulk(self, mock_client):
+        from .delete_inactive_items import deleteInactiveItems
+
+        mock_client.return_value.isItemActive.side_effect = lambda ebay_id: ebay_id == "LIVE"
+
+        deleteInactiveItems()
+
+        self.assertEqual(list(Item.objects.values_list('ebay_id', flat=True)), ["LIVE"])
+        self.assertGreater(Item.objects.get(ebay_id="LIVE").updated_at.year, 2020)
+        archived = ItemArchive.objects.get()
+        self.assertEqual((archived.ebay_id, archived.reason), ("SOLD", ItemArchive.REASON_DELISTED))
+
+
+def listing(ebay_id, price):
+    return {"itemId": ebay_id, "title": ebay_id, "price": {"value": price}, "itemWebUrl": "https://ebay.com",
+            "categories": [{"categoryName": "Misc"}, {"categoryName": "Misc"}]}
+
+
+class RefreshDatabaseTests(TestCase):
+
+    def setUp(self):
+        self.charity = Charity.objects.create(id=1234, name="Test Charity", description="test charity")
+        for ebay_id in ("SAME", "REPRICED", "GONE"):
+            Item.objects.create(ebay_id=ebay_id, name=ebay_id, price="5.00", web_url="https://ebay.com",
+                                category="Misc", category_list=[{"categoryName": "Misc"}], charity=self.charity)
+
+    @patch('ebay.suggest.rebuild_suggestions')
+    @patch('ebay.load_data_to_db.EbayClient')
+    def test_only_changed_and_delisted_items_are_archived(self, mock_client, mock_suggestions):
+        from .refresh_database import refreshDatabase
+
+        mock_client.return_value.getItems.return_value = {
+            "itemSummaries": [listing("SAME", "5.0"), listing("REPRICED", "7.50"), listing("NEW", "3.00")]}
+
+        refreshDatabase()
+
+        self.assertEqual(set(Item.objects.values_list('ebay_id', flat=True)), {"SAME", "REPRICED", "NEW"})
+        self.assertEqual(str(Item.objects.get(ebay_id="REPRICED").price), "7.50")
+        self.assertEqual(set(ItemArchive.objects.values_list('ebay_id', 'reason')),
+                         {("REPRICED", ItemArchive.REASON_REFRESHED), ("GONE", ItemArchive.REASON_DELISTED)})
+
+    @patch('ebay.suggest.rebuild_suggestions')
+    @patch('ebay.load_data_to_db.EbayClient')
+    def test_failed_load_keeps_existing_items(self, mock_client, mock_suggestions):
+        from .refresh_database import refreshDatabase
+
+        mock_client.return_value.getItems.return_value = {"error": "rate limited"}
+
+        refreshDatabase()
+
+        self.assertEqual(Item.objects.count(), 3)
+        self.assertFalse(ItemArchive.objects.exists())
+
+    @patch('ebay.load_data_to_db.time.sleep')
+    @patch('ebay.suggest.rebuild_suggestions')
+    @patch('ebay.load_data_to_db.EbayClient')
+    def test_error_on_a_later_page_keeps_unseen_items(self, mock_client, mock_suggestions, mock_sleep):
+        from .refresh_database import refreshDatabase
+
+        mock_client.return_value.getItems.side_effect = [
+            {"itemSummaries": [listing("SAME", "5.00")], "next": "page2"},
+            {"error": "rate limited"},
+        ]
+
+        refreshDatabase()
+
+        self.assertEqual(Item.objects.count(), 3)
+        self.assertFalse(ItemArchive.objects.exists())
+
+
+class HiddenCharityTests(TestCase):
+
+    def setUp(self):
+        hidden = Charity.objects.create(id=1234, name="Deleted Charity", description="test charity", is_hidden=True)
+        shown = Charity.objects.create(id=5678, name="Test Charity", description="test charity")
+        Item.objects.create(ebay_id="HIDDEN", name="Halo hidden", price=5, web_url="https://ebay.com",
+                            category_list=[{"categoryName": "Keepsakes"}], charity=hidden)
+        Item.objects.create(ebay_id="SHOWN", name="Halo shown", price=5, web_url="https://ebay.com",
+                            category_list=[{"categoryName": "Misc"}], charity=shown)
+
+    def test_retrieve_item_skips_hidden_charities(self):
+        self.assertIsNone(retrieveItem("HIDDEN"))
+        self.assertEqual(retrieveItem("SHOWN").ebay_id, "SHOWN")
+
+    def test_search_skips_hidden_charities(self):
+        from ebay.search import search
+
+        self.assertEqual(list(search("halo", backend="database").values_list('ebay_id', flat=True)), ["SHOWN"])
+
+    def test_detail_fragment_skips_hidden_charities(self):
+        from ebay.fragments import detail_fragment
+
+        self.assertIsNone(detail_fragment("HIDDEN"))
+        self.assertIsNotNone(detail_fragment("SHOWN"))
+
+    @patch('ebay.suggest.caches')
+    def test_suggestions_skip_hidden_charities(self, mock_caches):
+        from ebay.suggest import rebuild_suggestions
+
+        rebuild_suggestions()
+
+        entries = mock_caches.__getitem__.return_value.set.call_args_list[0][0][1]["entries"]
+        displays = {display for _, display, _ in entries}
+        self.assertNotIn("Keepsakes", displays)
@@ -4,14 +4,12 @@ from rest_framework.permissions import IsAdminUser
 from ebay.tasks import update_database
 from .delete_inactive_items import deleteInactiveItems
 from django.db import close_old_connections
-from django.core.cache import caches
 from rq import Queue
 from ebay.worker import get_redis
 import datetime
 from ebay.models import Charity
 from .refresh_database import refreshDatabase
-
-disk = caches['diskcache']
+from ebay.views.charity_views import invalidate_charities
 
 class RefreshDatabaseView(APIView):
 
@@ -34,7 +32,8 @@ class RefreshDatabaseView(APIView):
         charity.updated_at = current_date
         charity.save()
 
-        disk.clear()
+        # item, category and search pages are invalidated by generation as the job changes items
+        invalidate_charities()
         return Response("success")
 
     permission_classes = [IsAdminUser]
@@ -47,6 +46,5 @@ class RefreshDatabaseView(APIView):
 
         q.enqueue(refreshDatabase, job_timeout=172000)
 
-        disk.clear()
         return Response("success")
 
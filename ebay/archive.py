@@ -0,0 +1,71 @@
+import datetime
+import logging
+from django.db import connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+ARCHIVE_TABLE = 'ebay_itemarchive'
+ARCHIVE_FIELDS = ('id', 'ebay_id', 'name', 'price', 'shipping_price', 'charity_id', 'category', 'condition',
+                  'location_country', 'created_at')
+ARCHIVE_BATCH_SIZE = 1000
+
+# months whose partition is known to exist, per database alias
+_partitions = set()
+
+
+def month_bounds(moment):
+    start = moment.date().replace(day=1)
+    end = (start + datetime.timedelta(days=32)).replace(day=1)
+    return start, end
+
+
+def partition_name(month_start):
+    return f'{ARCHIVE_TABLE}_p{month_start:%Y%m}'
+
+
+def ensure_partition(moment, using='default'):
+    """Create the monthly partition holding `moment` on Postgres; other databases use a plain table."""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+
+    start, end = month_bounds(moment)
+    if (using, start) in _partitions:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF {ARCHIVE_TABLE} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    # the CREATE rolls back with the caller's transaction, so only remember partitions that committed
+    transaction.on_commit(lambda: _partitions.add((using, start)), using=using)
+
+
+def archive_rows(rows, reason, archived_at=None):
+    """Copy item rows (dicts with ARCHIVE_FIELDS) into ItemArchive; call inside the deleting transaction."""
+    from ebay.models import ItemArchive
+
+    if not rows:
+        return 0
+
+    archived_at = archived_at or timezone.now()
+    ensure_partition(archived_at)
+    ItemArchive.objects.bulk_create([
+        ItemArchive(
+            item_id=row['id'],
+            ebay_id=row['ebay_id'],
+            name=row['name'],
+            price=row['price'],
+            shipping_price=row['shipping_price'],
+            charity_id=row['charity_id'],
+            category=row['category'],
+            condition=row['condition'],
+            location_country=row['location_country'],
+            listed_at=row['created_at'],
+            archived_at=archived_at,
+            reason=reason,
+        )
+        for row in rows
+    ], batch_size=ARCHIVE_BATCH_SIZE)
+    return len(rows)
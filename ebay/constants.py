@@ -135,4 +135,42 @@ FILTER_OPTIONS = {
     "Art Drawings": ["Art Drawings", None],
     "Art NFTs": ["Art NFTs", None],
     "Textile Art & Fiber Art": ["Textile Art & Fiber Art", None]
-}
\ No newline at end of file
+}
+
+CONDITION_GROUPS = {
+    "New": ["New", "Brand New", "New with tags", "New without tags", "New with box",
+            "New without box", "New other (see details)", "New with defects"],
+    "Used": ["Used", "Pre-owned", "Like New", "Very Good", "Good", "Acceptable"],
+    "Refurbished": ["Certified - Refurbished", "Excellent - Refurbished", "Very Good - Refurbished",
+                    "Good - Refurbished", "Seller refurbished", "Remanufactured"],
+    "Open box": ["Open box"],
+    "For parts": ["For parts or not working"],
+}
+
+# a bare "new" is usually part of a title ("new balance", "new york"), so only these forms select a condition
+CONDITION_WORDS = {
+    "brand new": "New",
+    "new in box": "New",
+    "new with tags": "New",
+    "sealed": "New",
+    "used": "Used",
+    "pre owned": "Used",
+    "preowned": "Used",
+    "second hand": "Used",
+    "secondhand": "Used",
+    "refurbished": "Refurbished",
+    "refurb": "Refurbished",
+    "open box": "Open box",
+    "for parts": "For parts",
+    "not working": "For parts",
+}
+
+CHEAP_PRICE = 10
+
+PRICE_BANDS = [
+    ("Under $10", 0, 10),
+    ("$10 to $25", 10, 25),
+    ("$25 to $50", 25, 50),
+    ("$50 to $100", 50, 100),
+    ("$100 and up", 100, None),
+]
@@ -0,0 +1,54 @@
+import hashlib
+import json
+from django.core.cache import caches
+from django.db import connections
+from ebay.db_routing import primary_reads
+from ebay.generations import GLOBAL_SCOPE, namespace
+from ebay.models import CategoryCount
+from ebay.rollups import hidden_charity_counts
+
+cache = caches['tiered']
+COUNT_CACHE_TTL = 60 * 15
+EXACT_COUNT_THRESHOLD = 10000
+
+
+def category_count(subcategory):
+    count = CategoryCount.objects.filter(name=subcategory).values_list('count', flat=True).first()
+    # category pages leave out hidden charities, which the rollup still counts
+    hidden = sum(count for _, _, count in hidden_charity_counts(subcategory))
+    return max((count or 0) - hidden, 0), True
+
+
+def planner_estimate(queryset):
+    connection = connections[queryset.db]
+    sql, params = queryset.query.sql_with_params()
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def queryset_count(queryset, scope=GLOBAL_SCOPE):
+    """Exact count, or the planner's estimate past EXACT_COUNT_THRESHOLD; cached like the pages under `scope`."""
+    sql, params = queryset.query.sql_with_params()
+    cache_key = 'count_' + hashlib.sha1(repr((sql, params)).encode()).hexdigest() + namespace(scope)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return tuple(cached)
+
+    with primary_reads():
+        result = None
+        if connections[queryset.db].vendor == 'postgresql':
+            estimate = planner_estimate(queryset)
+            if estimate > EXACT_COUNT_THRESHOLD:
+                result = (estimate, False)
+
+        if result is None:
+            result = (queryset.count(), True)
+
+    cache.set(cache_key, result, COUNT_CACHE_TTL)
+    return result
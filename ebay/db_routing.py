@@ -0,0 +1,134 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import caches
+
+REPLICA_DB = 'replica'
+PRIMARY_DB = 'default'
+# auth and sessions are always read from the primary so logins and token checks see fresh rows
+PRIMARY_APPS = {'auth', 'admin', 'contenttypes', 'sessions', 'token_blacklist'}
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+logger = logging.getLogger(__name__)
+cache = caches['default']
+replica_reads = ContextVar('replica_reads', default=False)
+
+
+def replica_enabled():
+    return REPLICA_DB in settings.DATABASES
+
+
+@contextmanager
+def primary_reads():
+    """Read from the primary inside this block, even in a replica request.
+
+    Anything built here for a shared cache must see the writes that bumped
+    its generation; a lagging replica read would be cached under the new
+    key and served for the whole TTL.
+    """
+    token = replica_reads.set(False)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+def pin_key(user_id):
+    return f'db_primary_pin_{user_id}'
+
+
+def request_user_id(request):
+    """The caller's user id before DRF has authenticated the request: session user, else the JWT's claim."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.id
+
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.settings import api_settings
+
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        return None
+    try:
+        return authentication.get_validated_token(raw_token).get(api_settings.USER_ID_CLAIM)
+    except Exception:
+        return None
+
+
+def pin_to_primary(user_id):
+    try:
+        cache.set(pin_key(user_id), 1, settings.REPLICA_PIN_SECONDS)
+    except Exception as e:
+        logger.error(f"Error pinning user to primary: {e}")
+
+
+def pinned_to_primary(user_id):
+    try:
+        return cache.get(pin_key(user_id)) is not None
+    except Exception as e:
+        logger.error(f"Error reading primary pin: {e}")
+        # without the pin we can't promise read-your-writes
+        return True
+
+
+class ReplicaRouter():
+    """Send reads to the replica while a request has opted in; everything else uses the primary."""
+
+    def db_for_read(self, model, **hints):
+        if replica_reads.get() and replica_enabled() and model._meta.app_label not in PRIMARY_APPS:
+            return REPLICA_DB
+        return PRIMARY_DB
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY_DB
+
+
+class ReplicaMiddleware():
+    """Route safe requests to views marked `read_replica = True` to the replica.
+
+    Only uncached reads use it: cache fills run under primary_reads().
+
+    A successful write pins the user to the primary for REPLICA_PIN_SECONDS
+    with a Redis key, so they read their own writes while the replica catches
+    up. Anonymous requests have nobody to pin and always use the replica.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.use_replica = False
+        try:
+            response = self.get_response(request)
+        finally:
+            token = getattr(request, '_replica_token', None)
+            if token is not None:
+                replica_reads.reset(token)
+
+        if request.method not in SAFE_METHODS and response.status_code < 400 and replica_enabled():
+            # DRF copies the JWT-authenticated user back onto the Django request
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(user.id)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        if (request.method not in SAFE_METHODS or not getattr(view_class, 'read_replica', False)
+                or not replica_enabled()):
+            return None
+
+        user_id = request_user_id(request)
+        if user_id is None or not pinned_to_primary(user_id):
+            request.use_replica = True
+            request._replica_token = replica_reads.set(True)
+        return None
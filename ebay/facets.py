@@ -0,0 +1,166 @@
+import hashlib
+from collections import Counter
+from django.core.cache import caches
+from django.db import connections
+from django.db.models import Count, Q
+from ebay.constants import FILTER_OPTIONS, PRICE_BANDS
+from ebay.db_routing import primary_reads
+from ebay.models import CategoryCount, Charity, FacetCount, Item
+from ebay.query_parser import parse_query
+from ebay.generations import GLOBAL_SCOPE, category_scope, namespace
+from ebay.rollups import condition_value, hidden_charity_counts
+from ebay.search import search
+from databasescripts.database_actions import getItemsByFilter
+
+cache = caches['tiered']
+FACETS = ('category', 'condition', 'charity', 'price')
+FACET_LIMIT = 50
+FACET_CACHE_TTL = 60 * 15
+PRICE_BAND_ORDER = {label: position for position, (label, _, _) in enumerate(PRICE_BANDS)}
+
+
+def rollup_scope(query):
+    """The FacetCount scope that answers this query exactly, or None."""
+    if not query:
+        return ''
+
+    parsed = parse_query(query)
+    if parsed.text or parsed.filters() or parsed.category is None:
+        return None
+
+    subcategory, filter = FILTER_OPTIONS[parsed.category]
+    return subcategory if filter is None else None
+
+
+def scope_facets(scope):
+    counts = {facet: Counter() for facet in FACETS}
+
+    for facet, value, count in (FacetCount.objects.filter(scope=scope, count__gt=0)
+                                .values_list('facet', 'value', 'count')):
+        counts[facet][value] = count
+
+    if scope == '':
+        counts['category'] = Counter(dict(CategoryCount.objects.filter(count__gt=0).values_list('name', 'count')))
+
+    # rollups still count a deleted charity's items until its deletion job reaches them
+    hidden = hidden_facets(scope)
+    return {facet: +(counts[facet] - hidden[facet]) for facet in FACETS}
+
+
+def hidden_facets(scope):
+    """What hidden charities add to a scope's rollups: their charity entry and, globally, their categories.
+
+    Their condition and price counts aren't kept per charity, so those stay
+    until the deletion job removes the items.
+    """
+    hidden = {facet: Counter() for facet in FACETS}
+    for row_scope, value, count in hidden_charity_counts(None if scope == '' else scope):
+        if row_scope == scope:
+            hidden['charity'][value] += count
+        else:
+            hidden['category'][row_scope] += count
+    return hidden
+
+
+CATEGORY_FACET_SQL = {
+    'postgresql': (
+        "SELECT category.value->>'categoryName' AS category_name, COUNT(DISTINCT item.id) AS n "
+        "FROM {table} item CROSS JOIN LATERAL jsonb_array_elements(CASE WHEN jsonb_typeof(item.category_list) = "
+        "'array' THEN item.category_list ELSE '[]'::jsonb END) category "
+        "WHERE item.id IN ({ids}) AND category.value->>'categoryName' <> '' "
+        "GROUP BY category_name ORDER BY n DESC, category_name LIMIT %s"
+    ),
+    'sqlite': (
+        "SELECT json_extract(category.value, '$.categoryName') AS category_name, COUNT(DISTINCT item.id) AS n "
+        "FROM {table} item, json_each(CASE WHEN json_type(item.category_list) = 'array' "
+        "THEN item.category_list ELSE '[]' END) category "
+        "WHERE item.id IN ({ids}) AND json_extract(category.value, '$.categoryName') <> '' "
+        "GROUP BY category_name ORDER BY n DESC, category_name LIMIT %s"
+    ),
+}
+
+
+def category_facet(items):
+    ids_sql, params = items.values('id').query.sql_with_params()
+    sql = CATEGORY_FACET_SQL[connections[items.db].vendor].format(table=Item._meta.db_table, ids=ids_sql)
+    with connections[items.db].cursor() as cursor:
+        cursor.execute(sql, [*params, FACET_LIMIT])
+        return Counter(dict(cursor.fetchall()))
+
+
+def aggregate_facets(items):
+    """Top FACET_LIMIT values of each facet over `items`, counted by the database."""
+    items = items.order_by()
+    counts = {facet: Counter() for facet in FACETS}
+    counts['category'] = category_facet(items)
+
+    for condition, count in items.values_list('condition').annotate(n=Count('id')).order_by():
+        value = condition_value(condition)
+        if value is not None:
+            counts['condition'][value] += count
+    counts['condition'] = Counter(dict(counts['condition'].most_common(FACET_LIMIT)))
+
+    for charity_id, count in (items.exclude(charity_id=None).values_list('charity_id').annotate(n=Count('id'))
+                              .order_by('-n', 'charity_id')[:FACET_LIMIT]):
+        counts['charity'][str(charity_id)] = count
+
+    bands = items.aggregate(**{
+        f'band_{position}': Count('id', filter=Q(price__gte=low) & (Q(price__lt=high) if high is not None else Q()))
+        for position, (_, low, high) in enumerate(PRICE_BANDS)
+    })
+    counts['price'] = Counter({label: bands[f'band_{position}'] for position, (label, _, _) in enumerate(PRICE_BANDS)
+                               if bands[f'band_{position}']})
+    return counts
+
+
+def queryset_facets(items, scope=GLOBAL_SCOPE):
+    """GROUP BY fallback for searches that no rollup scope covers; cached like search pages under `scope`."""
+    sql, params = items.query.sql_with_params()
+    cache_key = 'facets_' + hashlib.sha1(repr((sql, params)).encode()).hexdigest() + namespace(scope)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return {facet: Counter(values) for facet, values in cached.items()}
+
+    with primary_reads():
+        counts = aggregate_facets(items)
+    cache.set(cache_key, {facet: dict(values) for facet, values in counts.items()}, FACET_CACHE_TTL)
+    return counts
+
+
+def facet_list(facet, counts, charity_names):
+    if facet == 'price':
+        values = sorted(counts.items(), key=lambda pair: PRICE_BAND_ORDER.get(pair[0], len(PRICE_BANDS)))
+    else:
+        values = counts.most_common(FACET_LIMIT)
+
+    entries = []
+    for value, count in values:
+        entry = {"value": value, "count": count}
+        if facet == 'charity':
+            entry["label"] = charity_names.get(value, value)
+        entries.append(entry)
+    return entries
+
+
+def get_facets(query=None, category=None, filter=None):
+    """Facet counts for a search query or a category page.
+
+    Plain category pages and category-only searches are answered from the
+    FacetCount rollups. Anything else falls back to a cached aggregate over
+    the matching items.
+    """
+    if category is not None:
+        if filter is None:
+            counts = scope_facets(category)
+        else:
+            counts = queryset_facets(getItemsByFilter(category, filter), category_scope(category))
+    else:
+        scope = rollup_scope(query)
+        counts = scope_facets(scope) if scope is not None else queryset_facets(search(query))
+
+    charity_names = {}
+    if counts['charity']:
+        charity_names = {str(charity_id): name for charity_id, name in
+                         Charity.objects.filter(id__in=list(counts['charity'])).values_list('id', 'name')}
+
+    return {facet: facet_list(facet, counts[facet], charity_names) for facet in FACETS}
@@ -0,0 +1,70 @@
+import logging
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+cache = caches['default']
+FAVORITES_CACHE_TTL = 60 * 60 * 24
+
+
+def ids_key(user_id):
+    return f'favorites_ids_{user_id}'
+
+
+def payload_key(user_id):
+    return f'favorites_{user_id}'
+
+
+def get_cached(key):
+    try:
+        return cache.get(key)
+    except Exception as e:
+        logger.error(f"Error reading favorites cache: {e}")
+        return None
+
+
+def set_cached(key, value):
+    try:
+        cache.set(key, value, FAVORITES_CACHE_TTL)
+    except Exception as e:
+        logger.error(f"Error writing favorites cache: {e}")
+
+
+def get_favorite_ids(user_id, load):
+    """{"items": [ebay_id, ...], "charities": [id, ...]} for a user, loaded on a miss."""
+    ids = get_cached(ids_key(user_id))
+    if ids is None:
+        ids = load(user_id)
+        set_cached(ids_key(user_id), ids)
+    return ids
+
+
+def get_favorites_payload(user_id, load):
+    payload = get_cached(payload_key(user_id))
+    if payload is None:
+        payload = load()
+        set_cached(payload_key(user_id), payload)
+    return payload
+
+
+def invalidate_users(user_ids):
+    keys = [key for user_id in set(user_ids) for key in (ids_key(user_id), payload_key(user_id))]
+    if not keys:
+        return
+
+    try:
+        cache.delete_many(keys)
+    except Exception as e:
+        logger.error(f"Error invalidating favorites cache: {e}")
+
+
+def users_favoriting(item_ids=(), charity_ids=()):
+    from ebay.models import FavoriteList
+
+    user_ids = set()
+    if item_ids:
+        user_ids.update(FavoriteList.items.through.objects.filter(item_id__in=list(item_ids))
+                        .values_list('favoritelist__user_id', flat=True))
+    if charity_ids:
+        user_ids.update(FavoriteList.charities.through.objects.filter(charity_id__in=list(charity_ids))
+                        .values_list('favoritelist__user_id', flat=True))
+    return user_ids
@@ -0,0 +1,60 @@
+import hashlib
+from rest_framework.exceptions import ValidationError
+
+
+class DynamicFieldsMixin():
+    """Serializer mixin taking a `fields` kwarg that narrows the declared fields."""
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+def parse_field_list(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def requested_fields(request, serializer_class, default_fields=None, prefix=''):
+    """Field names selected by ?fields= / ?exclude=, or None when neither is given.
+
+    `fields` picks from everything the serializer can render; `exclude`
+    removes names from `default_fields` (the serializer's own fields when
+    not given). Unknown names are a 400 rather than being silently ignored.
+    """
+    fields_param, exclude_param = f'{prefix}fields', f'{prefix}exclude'
+    if fields_param not in request.query_params and exclude_param not in request.query_params:
+        return None
+
+    available = list(serializer_class().fields)
+    default_fields = list(default_fields or available)
+
+    if fields_param in request.query_params:
+        selected = parse_field_list(request.query_params[fields_param])
+        unknown = set(selected) - set(available)
+        if unknown:
+            raise ValidationError({fields_param: f"Unknown fields: {', '.join(sorted(unknown))}"})
+        if not selected:
+            raise ValidationError({fields_param: "Select at least one field"})
+        return tuple(name for name in available if name in selected)
+
+    excluded = parse_field_list(request.query_params[exclude_param])
+    unknown = set(excluded) - set(available)
+    if unknown:
+        raise ValidationError({exclude_param: f"Unknown fields: {', '.join(sorted(unknown))}"})
+    return tuple(name for name in default_fields if name not in excluded)
+
+
+def model_columns(model, fields):
+    """The subset of `fields` that `.only()` can load; the primary key is always kept."""
+    concrete = {field.name for field in model._meta.concrete_fields}
+    return [model._meta.pk.name] + [name for name in fields if name in concrete and name != model._meta.pk.name]
+
+
+def fieldset_key(fields):
+    if fields is None:
+        return ''
+    return '_fs' + hashlib.sha1(','.join(fields).encode()).hexdigest()[:12]
@@ -0,0 +1,79 @@
+import logging
+from django.http import HttpResponse
+from ebay.models import Item
+from ebay.renderers import dumps
+
+logger = logging.getLogger(__name__)
+FRAGMENT_FIELDS = ('card_json', 'detail_json')
+# bulk-updated by the liveness sweeps without re-rendering, so spliced in at read time instead of stored
+LIVE_FIELDS = ('updated_at',)
+
+
+def render_fragments(item):
+    from ebay.serializers import ItemListSerializer, ItemSerializer
+
+    detail = ItemSerializer(item).data
+    for field in LIVE_FIELDS:
+        detail.pop(field, None)
+    return dumps(ItemListSerializer(item).data).decode(), dumps(detail).decode()
+
+
+def live_values(row):
+    from ebay.serializers import ItemSerializer
+
+    fields = ItemSerializer().fields
+    return {field: fields[field].to_representation(row[field]) if row[field] is not None else None
+            for field in LIVE_FIELDS}
+
+
+def splice_fields(fragment, values):
+    """Append rendered key/value pairs to a pre-rendered JSON object."""
+    tail = dumps(values)
+    separator = b',' if len(fragment) > 2 else b''
+    return fragment[:-1] + separator + tail[1:]
+
+
+def store_fragments(items):
+    """Render and save the card and detail JSON for fully loaded items."""
+    for item in items:
+        item.card_json, item.detail_json = render_fragments(item)
+    Item.objects.bulk_update(items, FRAGMENT_FIELDS, batch_size=500)
+
+
+def detail_fragment(ebay_id, with_charity=False):
+    """Detail JSON bytes for an item, or (charity_id, bytes) with with_charity; None if it doesn't exist."""
+    row = Item.objects.filter(ebay_id=ebay_id, charity__is_hidden=False).values('id', 'charity_id', 'detail_json', *LIVE_FIELDS).first()
+    if row is None:
+        return None
+
+    detail_json = row['detail_json']
+    if detail_json is None:
+        item = Item.objects.get(id=row['id'])
+        store_fragments([item])
+        detail_json = item.detail_json
+    body = splice_fields(detail_json.encode(), live_values(row))
+    return (row['charity_id'], body) if with_charity else body
+
+
+def card_fragments(rows):
+    """Card JSON for a page of items loaded with only('id', 'card_json'), filling any that are missing."""
+    missing = [row.id for row in rows if row.card_json is None]
+    if missing:
+        items = Item.objects.in_bulk(missing)
+        store_fragments(list(items.values()))
+        for row in rows:
+            if row.card_json is None:
+                row.card_json = items[row.id].card_json
+
+    return [row.card_json.encode() for row in rows]
+
+
+def splice_results(envelope, fragments):
+    """Append a pre-rendered "results" array to a rendered pagination envelope."""
+    head = dumps({key: value for key, value in envelope.items() if key != 'results'})
+    separator = b',' if len(head) > 2 else b''
+    return head[:-1] + separator + b'"results":[' + b','.join(fragments) + b']}'
+
+
+def json_response(body, status=200):
+    return HttpResponse(body, content_type='application/json', status=status)
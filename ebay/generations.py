@@ -0,0 +1,122 @@
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from django.core.cache import caches
+from django.db import transaction
+from ebay.rollups import category_names, item_row
+
+logger = logging.getLogger(__name__)
+cache = caches['default']
+# search pages, the report and free-text facets can contain any item
+GLOBAL_SCOPE = 'global'
+# scopes collected by an enclosing bump_once() block
+_pending_bumps = contextvars.ContextVar('pending_bumps', default=None)
+
+
+def charity_scope(charity_id):
+    return f'charity_{charity_id}'
+
+
+def category_scope(name):
+    return f'cat_{name}'
+
+
+def generation_key(scope):
+    return f'gen_{scope}'
+
+
+def seed():
+    # counters start at the clock rather than 0 so keys written before a Redis flush never match again
+    return time.time_ns()
+
+
+def current_generations(scopes):
+    """{scope: generation}, or None if Redis is unavailable so callers fall back to unversioned keys."""
+    keys = {generation_key(scope): scope for scope in scopes}
+    try:
+        found = cache.get_many(list(keys))
+        for key in keys:
+            if key not in found:
+                value = seed()
+                found[key] = value if cache.add(key, value, None) else cache.get(key, value)
+    except Exception as e:
+        logger.error(f"Error reading cache generations: {e}")
+        return None
+    return {scope: found[key] for key, scope in keys.items()}
+
+
+def namespace(*scopes):
+    """Cache key suffix that changes whenever any of the scopes is bumped."""
+    generations = current_generations(scopes)
+    if generations is None:
+        return ''
+    return '_g' + '.'.join(str(generations[scope]) for scope in scopes)
+
+
+def stamp(*scopes):
+    """Generations to store alongside a cached value whose scopes are only known after it is built."""
+    generations = current_generations(scopes)
+    return tuple(generations.items()) if generations is not None else None
+
+
+def is_current(stamped):
+    if not stamped:
+        return True
+    generations = current_generations([scope for scope, _ in stamped])
+    return generations is None or all(generations[scope] == generation for scope, generation in stamped)
+
+
+def bump(scopes):
+    for scope in set(scopes):
+        key = generation_key(scope)
+        try:
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.add(key, seed(), None)
+        except Exception as e:
+            logger.error(f"Error bumping cache generation {scope}: {e}")
+
+
+def item_scopes(items):
+    """Every generation a change to these items (models or rows with ROLLUP_FIELDS) can make stale."""
+    scopes = {GLOBAL_SCOPE}
+    for item in items:
+        row = item_row(item)
+        if row.get('charity_id') is not None:
+            scopes.add(charity_scope(row['charity_id']))
+        scopes.update(category_scope(name) for name in category_names(row.get('category_list')))
+    return scopes
+
+
+@contextmanager
+def bump_once():
+    """Hold back the bumps from items_changed() inside the block and apply them together when it exits.
+
+    A load commits a batch per page, and bumping GLOBAL_SCOPE per batch would
+    retire every search page on each one, so none ever got served stale.
+    """
+    if _pending_bumps.get() is not None:
+        yield
+        return
+
+    scopes = set()
+    token = _pending_bumps.set(scopes)
+    try:
+        yield
+    finally:
+        _pending_bumps.reset(token)
+        bump(scopes)
+
+
+def items_changed(items):
+    """Bump the generations these items belong to once the surrounding transaction commits."""
+    if not items:
+        return
+    scopes = item_scopes(items)
+    pending = _pending_bumps.get()
+    if pending is not None:
+        transaction.on_commit(lambda: pending.update(scopes))
+    else:
+        transaction.on_commit(lambda: bump(scopes))
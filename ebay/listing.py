@@ -0,0 +1,187 @@
+from decimal import Decimal, InvalidOperation
+from rest_framework.exceptions import ValidationError
+from ebay.constants import CONDITION_GROUPS
+from ebay.query_parser import ParsedQuery
+from ebay.locations import DEFAULT_RADIUS_KM, MAX_RADIUS_KM, postal_prefix, within_radius
+
+# sort name -> (field, descending); every order is broken by id so it is total
+SORTS = {
+    'newest': ('id', True),
+    'price_asc': ('price', False),
+    'price_desc': ('price', True),
+    'distance': ('distance', False),
+}
+# sorts on annotations rather than columns, so nothing extra to load
+COMPUTED_SORTS = {'distance'}
+CONDITION_BY_NAME = {name.lower(): name for name in CONDITION_GROUPS}
+TRUE_VALUES = ('1', 'true', 'yes')
+
+
+class ListingOptions():
+    """Price, condition, shipping, location and sort options for item listing endpoints."""
+
+    def __init__(self, parsed=None, sort=None, country=None, postal_prefix=None, near=None, radius=DEFAULT_RADIUS_KM):
+        self.parsed = parsed or ParsedQuery()
+        self.sort = sort
+        self.country = country
+        self.postal_prefix = postal_prefix
+        self.near = near
+        self.radius = radius
+
+    def filters(self):
+        filters = self.parsed.filters()
+        if self.country is not None:
+            filters['location_country'] = self.country
+        if self.postal_prefix is not None:
+            filters['location_postal_prefix'] = self.postal_prefix
+        return filters
+
+    def is_default(self):
+        return not self.filters() and self.near is None and self.sort is None
+
+    def needs_count(self):
+        """True when the result set differs from the unfiltered listing, so rollup counts don't apply."""
+        return bool(self.filters()) or self.near is not None
+
+    def ordering(self):
+        field, descending = SORTS[self.sort]
+        prefix = '-' if descending else ''
+        if field == 'id':
+            return [f'{prefix}id']
+        return [f'{prefix}{field}', f'{prefix}id']
+
+    def apply(self, items):
+        filters = self.filters()
+        if filters:
+            items = items.filter(**filters)
+        if self.near is not None:
+            items = within_radius(items, *self.near, self.radius)
+        if self.sort is not None:
+            items = items.order_by(*self.ordering())
+        return items
+
+    def sort_fields(self):
+        if self.sort is None or self.sort in COMPUTED_SORTS:
+            return []
+        return [SORTS[self.sort][0]]
+
+    def keyset_order(self, ranked_by=None):
+        """(sort_field, descending) for cursor pagination.
+
+        Without a sort, ranked results page through their rank annotation
+        `ranked_by` so the relevance order survives; anything else is newest first.
+        """
+        if self.sort is None and ranked_by is not None:
+            return (ranked_by, False)
+        return SORTS[self.sort or 'newest']
+
+    def cache_key(self):
+        if self.is_default():
+            return ''
+
+        parsed = self.parsed
+        parts = [
+            f's{self.sort}' if self.sort else '',
+            f'min{parsed.min_price}' if parsed.min_price is not None else '',
+            f'max{parsed.max_price}' if parsed.max_price is not None else '',
+            f'c{parsed.condition}' if parsed.condition else '',
+            'fs' if parsed.free_shipping else '',
+            f'co{self.country}' if self.country else '',
+            f'pc{self.postal_prefix}' if self.postal_prefix else '',
+            f'near{self.near[0]},{self.near[1]}r{self.radius}' if self.near else '',
+        ]
+        return '_' + '_'.join(part for part in parts if part)
+
+
+def parse_price(request, name):
+    value = request.query_params.get(name)
+    if value in (None, ''):
+        return None
+
+    try:
+        price = Decimal(value)
+    except InvalidOperation:
+        raise ValidationError({name: "Must be a number"})
+    if not price.is_finite() or price < 0:
+        raise ValidationError({name: "Must be a non-negative number"})
+    return price
+
+
+def parse_near(request):
+    value = request.query_params.get('near')
+    if not value:
+        return None
+
+    try:
+        latitude, longitude = (float(part) for part in value.split(','))
+    except ValueError:
+        raise ValidationError({'near': "Must be latitude,longitude"})
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValidationError({'near': "Coordinates out of range"})
+    return latitude, longitude
+
+
+def parse_radius(request):
+    value = request.query_params.get('radius')
+    if not value:
+        return DEFAULT_RADIUS_KM
+
+    try:
+        radius = float(value)
+    except ValueError:
+        raise ValidationError({'radius': "Must be a number"})
+    if not 0 < radius <= MAX_RADIUS_KM:
+        raise ValidationError({'radius': f"Must be between 0 and {MAX_RADIUS_KM} km"})
+    return radius
+
+
+def parse_country(request):
+    country = request.query_params.get('country')
+    if not country:
+        return None
+    if len(country) != 2 or not country.isalpha():
+        raise ValidationError({'country': "Must be a two-letter country code"})
+    return country.upper()
+
+
+def parse_postal_prefix(request):
+    value = request.query_params.get('postal_code')
+    if not value:
+        return None
+
+    prefix = postal_prefix(value)
+    if prefix is None:
+        raise ValidationError({'postal_code': "Must have at least 3 letters or digits"})
+    return prefix
+
+
+def listing_options(request):
+    min_price = parse_price(request, 'min_price')
+    max_price = parse_price(request, 'max_price')
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise ValidationError({'min_price': "Must not exceed max_price"})
+
+    condition = request.query_params.get('condition')
+    if condition:
+        if condition.lower() not in CONDITION_BY_NAME:
+            raise ValidationError({'condition': f"Must be one of: {', '.join(CONDITION_GROUPS)}"})
+        condition = CONDITION_BY_NAME[condition.lower()]
+    else:
+        condition = None
+
+    sort = request.query_params.get('sort') or None
+    if sort is not None and sort not in SORTS:
+        raise ValidationError({'sort': f"Must be one of: {', '.join(SORTS)}"})
+
+    near = parse_near(request)
+    if sort == 'distance' and near is None:
+        raise ValidationError({'sort': "Sorting by distance requires near=latitude,longitude"})
+
+    parsed = ParsedQuery(
+        condition=condition,
+        min_price=min_price,
+        max_price=max_price,
+        free_shipping=request.query_params.get('free_shipping', '').lower() in TRUE_VALUES,
+    )
+    return ListingOptions(parsed, sort, country=parse_country(request), postal_prefix=parse_postal_prefix(request),
+                          near=near, radius=parse_radius(request))
@@ -1,8 +1,16 @@
+import json
 import time
+from decimal import Decimal
 from .ebay_client import EbayClient
 import logging
 import traceback
-from django.db import connection, transaction
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from . import search_index
+from .rollups import ROLLUP_FIELDS, record_items_added
+from .fragments import store_fragments
+from .generations import bump_once, items_changed
+from .locations import extract_location
+from .projection import project_categories, project_location, project_seller
 
 logger = logging.getLogger(__name__)
 WORD_FILTER = {'playboy','play boy', 'penthouse', 'skin art magazine', 
@@ -10,14 +18,44 @@ WORD_FILTER = {'playboy','play boy', 'penthouse', 'skin art magazine',
 'sports illustrated swimsuit', 'swim suit edition', 
 'national lampoon humor magazine', 'red sonja', 'fhm magazine'}
 
+# bootstrap mode: rows are COPYed into a temp table and merged with one INSERT ... ON CONFLICT
+STAGING_TABLE = 'ebay_item_staging'
+STAGING_COLUMNS = ('ebay_id', 'name', 'price', 'web_url', 'charity_id', 'category', 'category_list',
+                   'item_location', 'seller', 'shipping_price', 'img_url', 'additional_images', 'condition',
+                   'location_country', 'location_postal_prefix', 'latitude', 'longitude')
+JSON_COLUMNS = {'category_list', 'item_location', 'seller', 'additional_images'}
+BOOTSTRAP_BATCH_SIZE = 20000
+# a refresh replaces a stored listing when any of these differ from eBay's current data
+REFRESH_FIELDS = ('name', 'price', 'shipping_price', 'condition', 'img_url')
+POST_MERGE_CHUNK_SIZE = 1000
+
 class DatabaseLoader():
 
-    def __init__(self, charity_id):
+    def __init__(self, charity_id, bootstrap=None, refresh=False, keep_ebay_ids=()):
         self.charity_id = charity_id
         self.client = EbayClient(charity_id)
         self.items_processed = 0
         self.items_saved = 0
         self.items_skipped = 0
+        # None picks bootstrap mode automatically for a charity's first load
+        self.bootstrap = bootstrap
+        self.staged_rows = []
+        # refresh mode replaces changed listings, except those in keep_ebay_ids (e.g. favorited items)
+        self.refresh = refresh
+        self.keep_ebay_ids = set(keep_ebay_ids)
+        self.seen_ebay_ids = set()
+        self.items_replaced = 0
+
+    def use_bootstrap(self):
+        from ebay.models import Item
+
+        if connection.vendor != 'postgresql':
+            if self.bootstrap:
+                logger.warning("Bootstrap loading needs PostgreSQL, using the per-row loader")
+            return False
+        if self.bootstrap is None:
+            return not Item.objects.filter(charity_id=self.charity_id).exists()
+        return self.bootstrap
 
     def __containsInvalidWord(self, title):
         title_lower = title.lower()
@@ -37,10 +75,10 @@ class DatabaseLoader():
                 "web_url": item["itemWebUrl"],
                 "charity": self.charity_id,
                 "category": item["categories"][1]["categoryName"],
-                "category_list": item.get("categories", []),
+                "category_list": project_categories(item.get("categories", [])),
                 "ebay_id": item["itemId"],
-                "item_location": item.get('itemLocation'),
-                "seller": item.get("seller"),
+                "item_location": project_location(item.get('itemLocation')),
+                "seller": project_seller(item.get("seller")),
                 "shipping_price": None,
                 "img_url": None,
                 "additional_images": {"additionalImages": []},
@@ -70,24 +108,151 @@ class DatabaseLoader():
         ).values_list('ebay_id', flat=True)
         
         return set(existing)
+
+    def __replace_changed_items(self, data, existing_ids):
+        """Archive and delete stored listings that changed on eBay; they are then saved again like new ones."""
+        from ebay.models import Item, ItemArchive
+        from databasescripts.database_actions import deleteItems
+
+        stored = {row['ebay_id']: row for row in
+                  Item.objects.filter(ebay_id__in=existing_ids).values('ebay_id', *REFRESH_FIELDS)}
+        changed = []
+        for item in data:
+            ebay_id = item['itemId']
+            if ebay_id not in stored or ebay_id in self.keep_ebay_ids:
+                continue
+            processed = self.__process_item(item)
+            if processed is not None and listing_changed(stored[ebay_id], processed):
+                changed.append(ebay_id)
+
+        if changed:
+            self.items_replaced += deleteItems(Item.objects.filter(ebay_id__in=changed),
+                                               reason=ItemArchive.REASON_REFRESHED)
+        return set(changed)
     
     def __save_items_batch(self, items_to_save):
         from .serializers import ItemSerializer
         
-        saved_count = 0
-        
+        saved_items = []
+        # eBay can list an item twice in one page; the serializer no longer checks ebay_id uniqueness
+        items_to_save = list({item_data['ebay_id']: item_data for item_data in items_to_save}.values())
+
         with transaction.atomic():
             for item_data in items_to_save:
                 serializer = ItemSerializer(data=item_data)
-                if serializer.is_valid():
-                    serializer.save()
-                    saved_count += 1
-                else:
+                if not serializer.is_valid():
                     logger.warning(f"Validation failed for {item_data.get('ebay_id')}: {serializer.errors}")
+                    continue
+                try:
+                    # a concurrent load of another charity may have saved the same listing
+                    with transaction.atomic():
+                        saved_items.append(serializer.save())
+                except IntegrityError as e:
+                    logger.warning(f"Skipping {item_data.get('ebay_id')}, already saved: {e}")
+            record_items_added(saved_items)
+            items_changed(saved_items)
+
+        if saved_items:
+            try:
+                store_fragments(saved_items)
+            except Exception as e:
+                logger.error(f"Error pre-rendering item JSON: {e}")
+
+        if saved_items and search_index.index_enabled():
+            try:
+                search_index.add_items(saved_items)
+            except Exception as e:
+                logger.error(f"Error adding items to search index: {e}")
         
-        return saved_count
-    
+        return len(saved_items)
+
+    def __staging_row(self, item_data):
+        from .serializers import ItemSerializer
+
+        serializer = ItemSerializer(data=item_data)
+        if not serializer.is_valid():
+            logger.warning(f"Validation failed for {item_data.get('ebay_id')}: {serializer.errors}")
+            return None
+
+        values = dict(serializer.validated_data)
+        values['charity_id'] = values.pop('charity').id
+        values.update(extract_location(values.get('item_location')))
+        return [json.dumps(values.get(column)) if column in JSON_COLUMNS and values.get(column) is not None
+                else values.get(column) for column in STAGING_COLUMNS]
+
+    def __stage_items(self, items_to_stage):
+        staged = 0
+        for item_data in items_to_stage:
+            row = self.__staging_row(item_data)
+            if row is not None:
+                self.staged_rows.append(row)
+                staged += 1
+
+        if len(self.staged_rows) >= BOOTSTRAP_BATCH_SIZE:
+            self.items_saved += len(self.__merge_staged_items())
+        return staged
+
+    def __merge_staged_items(self):
+        from ebay.models import Item
+
+        rows, self.staged_rows = self.staged_rows, []
+        if not rows:
+            return []
+
+        table = Item._meta.db_table
+        columns = ', '.join(STAGING_COLUMNS)
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(f"CREATE TEMP TABLE {STAGING_TABLE} ON COMMIT DROP AS "
+                               f"SELECT {columns} FROM {table} WITH NO DATA")
+                with cursor.copy(f"COPY {STAGING_TABLE} ({columns}) FROM STDIN") as copy:
+                    for row in rows:
+                        copy.write_row(row)
+                cursor.execute(
+                    f"INSERT INTO {table} ({columns}, created_at, updated_at) "
+                    f"SELECT DISTINCT ON (ebay_id) {columns}, now(), now() FROM {STAGING_TABLE} ORDER BY ebay_id "
+                    f"ON CONFLICT (ebay_id) DO NOTHING RETURNING id"
+                )
+                item_ids = [row[0] for row in cursor.fetchall()]
+            merged = list(Item.objects.filter(id__in=item_ids).values(*ROLLUP_FIELDS))
+            record_items_added(merged)
+            items_changed(merged)
+
+        logger.info(f"Merged {len(item_ids)} of {len(rows)} staged items")
+        self.__after_merge(item_ids)
+        return item_ids
+
+    def __merge_after_failure(self):
+        # rows staged before the error are valid items; keep them rather than refetching on the next run
+        if not self.staged_rows:
+            return
+        try:
+            self.items_saved += len(self.__merge_staged_items())
+        except Exception as e:
+            logger.error(f"Error merging staged items after a failed load: {e}")
+
+    def __after_merge(self, item_ids):
+        from ebay.models import Item
+
+        for start in range(0, len(item_ids), POST_MERGE_CHUNK_SIZE):
+            items = list(Item.objects.filter(id__in=item_ids[start:start + POST_MERGE_CHUNK_SIZE]))
+            try:
+                store_fragments(items)
+            except Exception as e:
+                logger.error(f"Error pre-rendering item JSON: {e}")
+
+            if search_index.index_enabled():
+                try:
+                    search_index.add_items(items)
+                except Exception as e:
+                    logger.error(f"Error adding items to search index: {e}")
+
     def load_items_to_db(self):
+        # cached pages are retired once for the whole load rather than after every page
+        with bump_once():
+            return self.__load_pages()
+
+    def __load_pages(self):
         try:
             logger.info(f"Starting load database script for charity {self.charity_id}")
             response = self.client.getItems()
@@ -100,6 +265,9 @@ class DatabaseLoader():
                 return "success - no items"
              
             page_count = 0
+            bootstrap = self.use_bootstrap()
+            if bootstrap:
+                logger.info(f"First load for charity {self.charity_id}, using bootstrap COPY loader")
 
             while True:
                 page_count += 1
@@ -112,7 +280,10 @@ class DatabaseLoader():
                 logger.info(f"Processing page {page_count} with {len(data)} items")
 
                 ebay_ids = [item['itemId'] for item in data]
+                self.seen_ebay_ids.update(ebay_ids)
                 existing_ids = self.__get_existing_ebay_ids(ebay_ids)
+                if self.refresh and existing_ids:
+                    existing_ids -= self.__replace_changed_items(data, existing_ids)
                 
                 items_to_save = []
                 for item in data:
@@ -128,22 +299,30 @@ class DatabaseLoader():
                     else:
                         self.items_skipped += 1
 
-                if items_to_save:
+                if items_to_save and bootstrap:
+                    staged = self.__stage_items(items_to_save)
+                    logger.info(f"Staged {staged} items from page {page_count}")
+                elif items_to_save:
                     saved = self.__save_items_batch(items_to_save)
                     self.items_saved += saved
                     logger.info(f"Saved {saved} items from page {page_count}")
 
-                connection.close()
+                close_old_connections()
 
                 if 'next' in response:
                     logger.info(f"Fetching next page, sleeping 5 seconds...")
                     time.sleep(5)
                     self.client.charity_url = response['next']
                     response = self.client.getItems()
+                    if "error" in response:
+                        raise Exception(response['error'])
                 else:
                     logger.info("No more pages")
                     break
 
+            if bootstrap:
+                self.items_saved += len(self.__merge_staged_items())
+
             logger.info(
                 f"Completed: processed={self.items_processed}, "
                 f"saved={self.items_saved}, skipped={self.items_skipped}"
@@ -153,7 +332,19 @@ class DatabaseLoader():
         except Exception as e:
             logger.error(f"Error loading items to database: {e}")
             logger.error(traceback.format_exc())
+            self.__merge_after_failure()
             return str(e)
         
         finally:
             connection.close()
+
+
+def normalized(field, value):
+    if value is None or field not in ('price', 'shipping_price'):
+        return value
+    return Decimal(str(value)).quantize(Decimal('0.01'))
+
+
+def listing_changed(stored, processed):
+    return any(normalized(field, stored[field]) != normalized(field, processed.get(field))
+               for field in REFRESH_FIELDS)
@@ -0,0 +1,77 @@
+import math
+from django.db.models import F, FloatField, ExpressionWrapper
+
+LOCATION_FIELDS = ('location_country', 'location_postal_prefix', 'latitude', 'longitude')
+POSTAL_PREFIX_LENGTH = 3
+KM_PER_DEGREE = 111.32
+DEFAULT_RADIUS_KM = 50
+MAX_RADIUS_KM = 500
+
+
+def postal_prefix(postal_code):
+    """eBay masks postal codes ("945**"), so only the leading characters are usable."""
+    if not postal_code:
+        return None
+    cleaned = ''.join(char for char in str(postal_code).upper() if char.isalnum())
+    if len(cleaned) < POSTAL_PREFIX_LENGTH:
+        return None
+    return cleaned[:POSTAL_PREFIX_LENGTH]
+
+
+def coordinate(value, limit):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(value) or abs(value) > limit:
+        return None
+    return value
+
+
+def extract_location(item_location):
+    """Typed location columns for an item's itemLocation JSON."""
+    location = dict.fromkeys(LOCATION_FIELDS)
+    if not isinstance(item_location, dict):
+        return location
+
+    country = item_location.get('country')
+    if isinstance(country, str) and len(country.strip()) == 2:
+        location['location_country'] = country.strip().upper()
+    location['location_postal_prefix'] = postal_prefix(item_location.get('postalCode'))
+
+    latitude = coordinate(item_location.get('latitude'), 90)
+    longitude = coordinate(item_location.get('longitude'), 180)
+    if latitude is not None and longitude is not None:
+        location['latitude'], location['longitude'] = latitude, longitude
+    return location
+
+
+def apply_location(item):
+    for field, value in extract_location(item.item_location).items():
+        setattr(item, field, value)
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """(min_lat, max_lat, min_lng, max_lng) enclosing a circle; longitude does not wrap at the antimeridian."""
+    lat_delta = radius_km / KM_PER_DEGREE
+    cos_lat = math.cos(math.radians(latitude))
+    lng_delta = 180 if cos_lat < 0.01 else min(180, lat_delta / cos_lat)
+    return (max(-90, latitude - lat_delta), min(90, latitude + lat_delta),
+            max(-180, longitude - lng_delta), min(180, longitude + lng_delta))
+
+
+def distance_expression(latitude, longitude):
+    """Squared equirectangular distance in degrees; monotonic in true distance at this scale."""
+    cos_lat = math.cos(math.radians(latitude))
+    lat_offset = F('latitude') - latitude
+    lng_offset = (F('longitude') - longitude) * cos_lat
+    return ExpressionWrapper(lat_offset * lat_offset + lng_offset * lng_offset, output_field=FloatField())
+
+
+def within_radius(items, latitude, longitude, radius_km):
+    """Items inside the bounding box (an index range scan), trimmed to the circle and annotated with distance."""
+    min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, radius_km)
+    limit = (radius_km / KM_PER_DEGREE) ** 2
+    return (items.filter(latitude__range=(min_lat, max_lat), longitude__range=(min_lng, max_lng))
+            .annotate(distance=distance_expression(latitude, longitude))
+            .filter(distance__lte=limit))
@@ -0,0 +1,47 @@
+from django.db import migrations, models
+
+
+POSTGRES_INDEXES = [
+    (
+        "CREATE INDEX IF NOT EXISTS ebay_item_category_list_gin ON ebay_item USING gin (category_list jsonb_path_ops)",
+        "DROP INDEX IF EXISTS ebay_item_category_list_gin",
+    ),
+    (
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        None,
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS ebay_item_name_trgm ON ebay_item USING gin ((UPPER(name::text)) gin_trgm_ops)",
+        "DROP INDEX IF EXISTS ebay_item_name_trgm",
+    ),
+]
+
+
+def create_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for create_sql, _ in POSTGRES_INDEXES:
+        schema_editor.execute(create_sql)
+
+
+def drop_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for _, drop_sql in reversed(POSTGRES_INDEXES):
+        if drop_sql:
+            schema_editor.execute(drop_sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ebay', '0025_charity_donation_url_charity_image_url'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['condition'], name='ebay_item_condition_idx'),
+        ),
+        migrations.RunPython(create_postgres_indexes, drop_postgres_indexes),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:08
+
+from collections import Counter
+from django.db import migrations, models
+
+
+def backfill_category_counts(apps, schema_editor):
+    Item = apps.get_model('ebay', 'Item')
+    CategoryCount = apps.get_model('ebay', 'CategoryCount')
+
+    counts = Counter()
+    for category_list in Item.objects.values_list('category_list', flat=True).iterator(chunk_size=2000):
+        if isinstance(category_list, list):
+            counts.update({category['categoryName'] for category in category_list
+                           if isinstance(category, dict) and category.get('categoryName')})
+
+    CategoryCount.objects.bulk_create(
+        [CategoryCount(name=name, count=count) for name, count in counts.items()], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ebay', '0026_item_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_category_counts, migrations.RunPython.noop),
+    ]
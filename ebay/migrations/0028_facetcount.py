@@ -0,0 +1,89 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:12
+
+from collections import Counter
+from decimal import Decimal
+from django.db import migrations, models
+
+# snapshots of ebay.constants as of this migration; later edits there must not change the backfill
+CONDITION_GROUPS = {
+    "New": ["New", "Brand New", "New with tags", "New without tags", "New with box",
+            "New without box", "New other (see details)", "New with defects"],
+    "Used": ["Used", "Pre-owned", "Like New", "Very Good", "Good", "Acceptable"],
+    "Refurbished": ["Certified - Refurbished", "Excellent - Refurbished", "Very Good - Refurbished",
+                    "Good - Refurbished", "Seller refurbished", "Remanufactured"],
+    "Open box": ["Open box"],
+    "For parts": ["For parts or not working"],
+}
+CONDITION_GROUP_OF = {condition: group for group, conditions in CONDITION_GROUPS.items() for condition in conditions}
+PRICE_BANDS = [
+    ("Under $10", 0, 10),
+    ("$10 to $25", 10, 25),
+    ("$25 to $50", 25, 50),
+    ("$50 to $100", 50, 100),
+    ("$100 and up", 100, None),
+]
+
+
+def facet_values(condition, charity_id, price):
+    values = []
+    if isinstance(condition, str) and condition:
+        values.append(('condition', CONDITION_GROUP_OF.get(condition, condition)[:100]))
+    if isinstance(charity_id, int):
+        values.append(('charity', str(charity_id)))
+    if isinstance(price, (int, float, Decimal)):
+        for label, low, high in PRICE_BANDS:
+            if price >= low and (high is None or price < high):
+                values.append(('price', label))
+                break
+    return values
+
+
+def backfill_facet_counts(apps, schema_editor):
+    Item = apps.get_model('ebay', 'Item')
+    FacetCount = apps.get_model('ebay', 'FacetCount')
+
+    counts = Counter()
+    rows = Item.objects.values_list('category_list', 'condition', 'charity_id', 'price').iterator(chunk_size=2000)
+    for category_list, condition, charity_id, price in rows:
+        names = set()
+        if isinstance(category_list, list):
+            names = {category['categoryName'] for category in category_list
+                     if isinstance(category, dict) and category.get('categoryName')}
+        values = facet_values(condition, charity_id, price)
+
+        # the '' scope covers every item; a category scope also counts the categories it shares items with
+        for scope in [''] + sorted(names):
+            for facet, value in values:
+                counts[(scope, facet, value)] += 1
+            if scope:
+                for name in names - {scope}:
+                    counts[(scope, 'category', name)] += 1
+
+    FacetCount.objects.bulk_create(
+        [FacetCount(scope=scope, facet=facet, value=value, count=count)
+         for (scope, facet, value), count in counts.items()], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ebay', '0027_categorycount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(blank=True, default='', max_length=100)),
+                ('facet', models.CharField(max_length=20)),
+                ('value', models.CharField(max_length=100)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('scope', 'facet', 'value'), name='ebay_facetcount_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_facet_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_charity_stats(apps, schema_editor):
+    Item = apps.get_model('ebay', 'Item')
+    CharityStats = apps.get_model('ebay', 'CharityStats')
+
+    CharityStats.objects.bulk_create(
+        [CharityStats(charity_id=row['charity_id'], item_count=row['item_count'], price_total=row['price_total'] or 0)
+         for row in Item.objects.values('charity_id').annotate(item_count=Count('id'), price_total=Sum('price'))],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ebay', '0028_facetcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CharityStats',
+            fields=[
+                ('charity', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='ebay.charity')),
+                ('item_count', models.IntegerField(default=0)),
+                ('price_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CharityDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('added', models.IntegerField(default=0)),
+                ('removed', models.IntegerField(default=0)),
+                ('charity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='ebay.charity')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('charity', 'day'), name='ebay_charitydailystats_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_charity_stats, migrations.RunPython.noop),
+    ]
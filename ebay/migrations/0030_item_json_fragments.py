@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ebay', '0029_charitystats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='card_json',
+            field=models.TextField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='detail_json',
+            field=models.TextField(editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='item',
+            name='ebay_id',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ebay', '0030_item_json_fragments'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='item',
+            name='ebay_item_condition_idx',
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['condition', 'id'], name='ebay_item_condition_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['price', 'id'], name='ebay_item_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['condition', 'price', 'id'], name='ebay_item_cond_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('shipping_price', 0)), fields=['price', 'id'], name='ebay_item_free_ship_price_idx'),
+        ),
+    ]
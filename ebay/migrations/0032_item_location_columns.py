@@ -0,0 +1,99 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:27
+
+import math
+from django.db import migrations, models
+
+BACKFILL_CHUNK_SIZE = 2000
+# copied from ebay.locations as of this migration
+LOCATION_FIELDS = ('location_country', 'location_postal_prefix', 'latitude', 'longitude')
+POSTAL_PREFIX_LENGTH = 3
+
+
+def postal_prefix(postal_code):
+    if not postal_code:
+        return None
+    cleaned = ''.join(char for char in str(postal_code).upper() if char.isalnum())
+    if len(cleaned) < POSTAL_PREFIX_LENGTH:
+        return None
+    return cleaned[:POSTAL_PREFIX_LENGTH]
+
+
+def coordinate(value, limit):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(value) or abs(value) > limit:
+        return None
+    return value
+
+
+def extract_location(item_location):
+    location = dict.fromkeys(LOCATION_FIELDS)
+    if not isinstance(item_location, dict):
+        return location
+
+    country = item_location.get('country')
+    if isinstance(country, str) and len(country.strip()) == 2:
+        location['location_country'] = country.strip().upper()
+    location['location_postal_prefix'] = postal_prefix(item_location.get('postalCode'))
+
+    latitude = coordinate(item_location.get('latitude'), 90)
+    longitude = coordinate(item_location.get('longitude'), 180)
+    if latitude is not None and longitude is not None:
+        location['latitude'], location['longitude'] = latitude, longitude
+    return location
+
+
+def backfill_locations(apps, schema_editor):
+    Item = apps.get_model('ebay', 'Item')
+
+    batch = []
+    for item in Item.objects.exclude(item_location=None).only('id', 'item_location').iterator(chunk_size=BACKFILL_CHUNK_SIZE):
+        for field, value in extract_location(item.item_location).items():
+            setattr(item, field, value)
+        batch.append(item)
+        if len(batch) == BACKFILL_CHUNK_SIZE:
+            Item.objects.bulk_update(batch, LOCATION_FIELDS)
+            batch = []
+    if batch:
+        Item.objects.bulk_update(batch, LOCATION_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ebay', '0031_item_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='latitude',
+            field=models.FloatField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='location_country',
+            field=models.CharField(editable=False, max_length=2, null=True),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='location_postal_prefix',
+            field=models.CharField(editable=False, max_length=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='longitude',
+            field=models.FloatField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['location_country', 'location_postal_prefix', 'id'], name='ebay_item_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('latitude__isnull', False)), fields=['latitude', 'longitude'], name='ebay_item_coordinates_idx'),
+        ),
+        migrations.RunPython(backfill_locations, migrations.RunPython.noop),
+    ]
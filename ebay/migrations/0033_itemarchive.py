@@ -0,0 +1,80 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:32
+
+from django.db import migrations, models
+
+# Postgres requires the partition key in the primary key, so the table is
+# created by hand there; Django only ever looks rows up by id.
+PARTITIONED_TABLE_SQL = [
+    """
+    CREATE TABLE ebay_itemarchive (
+        id bigserial NOT NULL,
+        item_id integer NOT NULL,
+        ebay_id varchar(100) NOT NULL,
+        name varchar(100) NOT NULL,
+        price numeric(10, 2) NOT NULL,
+        shipping_price numeric(10, 2) NULL,
+        charity_id integer NOT NULL,
+        category varchar(100) NULL,
+        condition varchar(30) NULL,
+        location_country varchar(2) NULL,
+        listed_at timestamp with time zone NOT NULL,
+        archived_at timestamp with time zone NOT NULL,
+        reason varchar(20) NOT NULL,
+        PRIMARY KEY (id, archived_at)
+    ) PARTITION BY RANGE (archived_at)
+    """,
+    "CREATE INDEX ebay_itemarchive_day_idx ON ebay_itemarchive (archived_at, charity_id)",
+    "CREATE INDEX ebay_itemarchive_ebay_id_idx ON ebay_itemarchive (ebay_id)",
+]
+
+
+def create_archive_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        schema_editor.create_model(apps.get_model('ebay', 'ItemArchive'))
+        return
+
+    for statement in PARTITIONED_TABLE_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_archive_table(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model('ebay', 'ItemArchive'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ebay', '0032_item_location_columns'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ItemArchive',
+                    fields=[
+                        ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                        ('item_id', models.IntegerField()),
+                        ('ebay_id', models.CharField(max_length=100)),
+                        ('name', models.CharField(max_length=100)),
+                        ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                        ('shipping_price', models.DecimalField(decimal_places=2, max_digits=10, null=True)),
+                        ('charity_id', models.IntegerField()),
+                        ('category', models.CharField(max_length=100, null=True)),
+                        ('condition', models.CharField(max_length=30, null=True)),
+                        ('location_country', models.CharField(max_length=2, null=True)),
+                        ('listed_at', models.DateTimeField()),
+                        ('archived_at', models.DateTimeField()),
+                        ('reason', models.CharField(max_length=20)),
+                    ],
+                    options={
+                        'indexes': [
+                            models.Index(fields=['archived_at', 'charity_id'], name='ebay_itemarchive_day_idx'),
+                            models.Index(fields=['ebay_id'], name='ebay_itemarchive_ebay_id_idx'),
+                        ],
+                    },
+                ),
+            ],
+        ),
+        migrations.RunPython(create_archive_table, drop_archive_table),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:34
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_items(apps, schema_editor):
+    """Keep the oldest row per ebay_id, moving favorites of the copies onto it."""
+    Item = apps.get_model('ebay', 'Item')
+    FavoriteItem = apps.get_model('ebay', 'FavoriteList').items.through
+
+    duplicates = list(Item.objects.values('ebay_id').annotate(keep=Min('id'), copies=Count('id')).filter(copies__gt=1))
+    removed = 0
+    for row in duplicates:
+        copies = list(Item.objects.filter(ebay_id=row['ebay_id']).exclude(id=row['keep']).values_list('id', flat=True))
+        favorited = set(FavoriteItem.objects.filter(item_id__in=copies).values_list('favoritelist_id', flat=True))
+        already = set(FavoriteItem.objects.filter(item_id=row['keep']).values_list('favoritelist_id', flat=True))
+        FavoriteItem.objects.bulk_create([FavoriteItem(favoritelist_id=favorite_list_id, item_id=row['keep'])
+                                          for favorite_list_id in favorited - already])
+        Item.objects.filter(id__in=copies).delete()
+        removed += len(copies)
+
+    if removed:
+        print(f"\n  Removed {removed} duplicate items; run rebuild_rollups to refresh counts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ebay', '0033_itemarchive'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_items, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='item',
+            name='ebay_id',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+    ]
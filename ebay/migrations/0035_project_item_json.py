@@ -0,0 +1,105 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:36
+
+from django.db import migrations, transaction
+
+CHUNK_SIZE = 2000
+# copied from ebay.projection as of this migration
+SELLER_KEYS = ('username', 'feedbackPercentage', 'feedbackScore')
+LOCATION_KEYS = ('postalCode', 'country', 'city', 'stateOrProvince', 'latitude', 'longitude')
+CATEGORY_KEYS = ('categoryId', 'categoryName')
+PROJECTED_FIELDS = ('seller', 'item_location', 'category_list')
+
+
+def pick(value, keys):
+    if not isinstance(value, dict):
+        return None
+    projected = {key: value[key] for key in keys if value.get(key) not in (None, '')}
+    return projected or None
+
+
+def project_categories(categories):
+    if not isinstance(categories, list):
+        return []
+    return [category for category in (pick(value, CATEGORY_KEYS) for value in categories) if category]
+
+
+def project_item(item):
+    projected = {
+        'seller': pick(item.seller, SELLER_KEYS),
+        'item_location': pick(item.item_location, LOCATION_KEYS),
+        'category_list': project_categories(item.category_list) if item.category_list is not None else None,
+    }
+    changed = any(getattr(item, field) != value for field, value in projected.items())
+    for field, value in projected.items():
+        setattr(item, field, value)
+    return changed
+
+
+def item_storage_stats(connection):
+    stats = {}
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                "SELECT pg_total_relation_size(c.oid), pg_relation_size(c.oid), "
+                "COALESCE(pg_total_relation_size(NULLIF(c.reltoastrelid, 0)), 0), pg_indexes_size(c.oid) "
+                "FROM pg_class c WHERE c.oid = %s::regclass", ['ebay_item']
+            )
+            stats.update(zip(('total_bytes', 'heap_bytes', 'toast_bytes', 'index_bytes'), cursor.fetchone()))
+            column_size = 'pg_column_size'
+        else:
+            column_size = 'length'
+
+        averages = ', '.join(f"avg({column_size}({field}))" for field in PROJECTED_FIELDS)
+        cursor.execute(f"SELECT count(*), {averages} FROM ebay_item")
+        row = cursor.fetchone()
+
+    stats['rows'] = row[0]
+    for field, size in zip(PROJECTED_FIELDS, row[1:]):
+        stats[f'avg_{field}_bytes'] = round(float(size or 0), 1)
+    return stats
+
+
+def format_storage_stats(stats):
+    return ', '.join(f"{key}={value}" for key, value in stats.items())
+
+
+def project_existing_items(apps, schema_editor):
+    """Rewrite rows in id-ordered chunks, each in its own transaction, so the table is never locked for long."""
+    Item = apps.get_model('ebay', 'Item')
+    connection = schema_editor.connection
+
+    print(f"\n  ebay_item before: {format_storage_stats(item_storage_stats(connection))}")
+    last_id = 0
+    rewritten = 0
+    while True:
+        chunk = list(Item.objects.filter(id__gt=last_id).order_by('id')
+                     .only('id', *PROJECTED_FIELDS)[:CHUNK_SIZE])
+        if not chunk:
+            break
+        last_id = chunk[-1].id
+
+        changed = [item for item in chunk if project_item(item)]
+        for item in changed:
+            # the pre-rendered detail JSON embeds the old blobs; it is re-rendered on next read
+            item.detail_json = None
+        if changed:
+            with transaction.atomic(using=connection.alias):
+                Item.objects.bulk_update(changed, [*PROJECTED_FIELDS, 'detail_json'])
+            rewritten += len(changed)
+
+    print(f"  rewrote {rewritten} rows")
+    print(f"  ebay_item after: {format_storage_stats(item_storage_stats(connection))}")
+    if connection.vendor == 'postgresql' and rewritten:
+        print("  run VACUUM (FULL) ebay_item or pg_repack to return the freed space to the OS")
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('ebay', '0034_item_ebay_id_unique'),
+    ]
+
+    operations = [
+        migrations.RunPython(project_existing_items, migrations.RunPython.noop, atomic=False),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ebay', '0035_project_item_json'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='charity',
+            name='is_hidden',
+            field=models.BooleanField(default=False),
+        ),
+    ]
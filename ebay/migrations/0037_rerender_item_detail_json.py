@@ -0,0 +1,31 @@
+from django.db import migrations, transaction
+
+CHUNK_SIZE = 5000
+
+
+def clear_detail_json(apps, schema_editor):
+    """Stored detail JSON still embeds updated_at, which is now spliced in at read time; re-render on next read."""
+    Item = apps.get_model('ebay', 'Item')
+    connection = schema_editor.connection
+
+    last_id = 0
+    while True:
+        ids = list(Item.objects.filter(id__gt=last_id, detail_json__isnull=False).order_by('id')
+                   .values_list('id', flat=True)[:CHUNK_SIZE])
+        if not ids:
+            break
+        last_id = ids[-1]
+        with transaction.atomic(using=connection.alias):
+            Item.objects.filter(id__in=ids).update(detail_json=None)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('ebay', '0036_charity_is_hidden'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_detail_json, migrations.RunPython.noop, atomic=False),
+    ]
@@ -7,6 +7,8 @@ class Charity(models.Model):
     description = models.TextField()
     donation_url = models.URLField(null=True)
     image_url = models.URLField(null=True)
+    # set while a background job deletes the charity's items
+    is_hidden = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -15,7 +17,7 @@ class Charity(models.Model):
 
 class Item(models.Model):
     id = models.AutoField(primary_key=True)
-    ebay_id = models.CharField(max_length=100)
+    ebay_id = models.CharField(max_length=100, unique=True)
     name = models.CharField(max_length=100)
     img_url = models.URLField(null=True, blank=True)
     additional_images = models.JSONField(null=True)
@@ -28,13 +30,107 @@ class Item(models.Model):
     item_location = models.JSONField(null=True)
     condition = models.CharField(max_length=30, null=True)
     seller = models.JSONField(null=True)
+    location_country = models.CharField(max_length=2, null=True, editable=False)
+    location_postal_prefix = models.CharField(max_length=10, null=True, editable=False)
+    latitude = models.FloatField(null=True, editable=False)
+    longitude = models.FloatField(null=True, editable=False)
+    card_json = models.TextField(null=True, editable=False)
+    detail_json = models.TextField(null=True, editable=False)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['condition', 'id'], name='ebay_item_condition_idx'),
+            models.Index(fields=['price', 'id'], name='ebay_item_price_idx'),
+            models.Index(fields=['condition', 'price', 'id'], name='ebay_item_cond_price_idx'),
+            models.Index(fields=['price', 'id'], name='ebay_item_free_ship_price_idx',
+                         condition=models.Q(shipping_price=0)),
+            models.Index(fields=['location_country', 'location_postal_prefix', 'id'], name='ebay_item_location_idx'),
+            models.Index(fields=['latitude', 'longitude'], name='ebay_item_coordinates_idx',
+                         condition=models.Q(latitude__isnull=False)),
+        ]
+
     def __str__(self):
         return self.name
     
+class CategoryCount(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.count}"
+
+class FacetCount(models.Model):
+    scope = models.CharField(max_length=100, blank=True, default='')
+    facet = models.CharField(max_length=20)
+    value = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'facet', 'value'], name='ebay_facetcount_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope or '*'} {self.facet}={self.value}: {self.count}"
+
+class CharityStats(models.Model):
+    charity = models.OneToOneField(Charity, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    item_count = models.IntegerField(default=0)
+    price_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.charity_id}: {self.item_count}"
+
+class CharityDailyStats(models.Model):
+    charity = models.ForeignKey(Charity, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    added = models.IntegerField(default=0)
+    removed = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['charity', 'day'], name='ebay_charitydailystats_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.charity_id} {self.day}: +{self.added} -{self.removed}"
+
+class ItemArchive(models.Model):
+    """Compact copy of an item removed from the live table.
+
+    On Postgres the table is range-partitioned by month on archived_at
+    (see ebay.archive), so old months can be detached or dropped whole.
+    """
+    REASON_DELISTED = 'delisted'
+    REASON_REFRESHED = 'refreshed'
+    REASON_DELETED = 'deleted'
+
+    id = models.BigAutoField(primary_key=True)
+    item_id = models.IntegerField()
+    ebay_id = models.CharField(max_length=100)
+    name = models.CharField(max_length=100)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    shipping_price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    charity_id = models.IntegerField()
+    category = models.CharField(max_length=100, null=True)
+    condition = models.CharField(max_length=30, null=True)
+    location_country = models.CharField(max_length=2, null=True)
+    listed_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+    reason = models.CharField(max_length=20)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['archived_at', 'charity_id'], name='ebay_itemarchive_day_idx'),
+            models.Index(fields=['ebay_id'], name='ebay_itemarchive_ebay_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.ebay_id} ({self.reason})"
+
 class FavoriteList(models.Model):
     id = models.AutoField(primary_key=True, )
     user=models.ForeignKey(User, on_delete=models.CASCADE)
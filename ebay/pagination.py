@@ -0,0 +1,196 @@
+import base64
+import binascii
+import json
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+ITEMS_PAGE_SIZE = 50
+
+
+class EstimatedPage(Page):
+    """A page whose next link comes from fetching one extra row rather than from num_pages."""
+
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+
+class CountedPaginator(Paginator):
+    """Paginator over a count supplied by the caller.
+
+    An estimated count (exact=False) is only reported, never used as a
+    bound: pages past the estimate are still served, and whether there is a
+    next page is decided by reading one extra row.
+    """
+
+    def __init__(self, object_list, per_page, count=None, exact=True, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.known_count = count
+        self.exact = exact
+
+    @cached_property
+    def count(self):
+        if self.known_count is not None:
+            return self.known_count
+        return super().count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if self.exact or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        if self.exact:
+            return super().page(number)
+
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return EstimatedPage(rows[:self.per_page], number, self, has_more=len(rows) > self.per_page)
+
+
+class ItemPageNumberPagination(PageNumberPagination):
+    page_size = ITEMS_PAGE_SIZE
+    known_count = None
+    count_exact = True
+
+    def cache_key(self, request):
+        return f"p{request.query_params.get(self.page_query_param, 1)}"
+
+    def django_paginator_class(self, object_list, per_page):
+        return CountedPaginator(object_list, per_page, count=self.known_count, exact=self.count_exact)
+
+    def paginate_queryset(self, queryset, request, view=None, count=None):
+        if count is not None:
+            self.known_count, self.count_exact = count
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.page.paginator.count,
+            'count_exact': self.count_exact,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class KeysetPagination():
+    """Cursor pagination over a stable (sort_field, id) order.
+
+    Each page is a range scan starting after the last row of the previous
+    page, so deep pages cost the same as the first one and no COUNT(*) is
+    needed.
+    """
+    page_size = ITEMS_PAGE_SIZE
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, sort_field='id', descending=True):
+        self.sort_field = sort_field
+        self.descending = descending
+
+    def cache_key(self, request):
+        return f"c{request.query_params.get(self.cursor_query_param, '')}"
+
+    def encode_cursor(self, row, reverse):
+        return replace_query_param(self.base_url, self.cursor_query_param, self.cursor_token(row, reverse))
+
+    def cursor_token(self, row, reverse):
+        position = {"id": value_of(row, 'id'), "r": reverse}
+        if self.sort_field != 'id':
+            value = value_of(row, self.sort_field)
+            position["v"] = value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+
+        try:
+            position = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            int(position["id"])
+            if self.sort_field != 'id':
+                position["v"]
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position
+
+    def position_filter(self, position, descending):
+        operator = 'lt' if descending else 'gt'
+
+        if self.sort_field == 'id':
+            return Q(**{f'id__{operator}': position["id"]})
+
+        return (Q(**{f'{self.sort_field}__{operator}': position["v"]}) |
+                Q(**{self.sort_field: position["v"], f'id__{operator}': position["id"]}))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = remove_query_param(request.build_absolute_uri(), 'page')
+        position = self.decode_cursor(request)
+        reverse = bool(position and position.get("r"))
+
+        descending = self.descending != reverse
+        if self.sort_field == 'id':
+            ordering = ['-id'] if descending else ['id']
+        else:
+            prefix = '-' if descending else ''
+            ordering = [f'{prefix}{self.sort_field}', f'{prefix}id']
+
+        if position is not None:
+            queryset = queryset.filter(self.position_filter(position, descending))
+
+        rows = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.rows = rows
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next or not self.rows:
+            return None
+        return self.encode_cursor(self.rows[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.rows:
+            return None
+        return self.encode_cursor(self.rows[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+def value_of(row, field):
+    if isinstance(row, dict):
+        return row[field]
+    return getattr(row, field)
+
+
+def wants_cursor_pagination(request):
+    return (request.query_params.get('pagination') == 'cursor' or
+            KeysetPagination.cursor_query_param in request.query_params)
@@ -0,0 +1,69 @@
+ITEM_TABLE = 'ebay_item'
+# the keys of eBay's payload that the API and search actually read
+SELLER_KEYS = ('username', 'feedbackPercentage', 'feedbackScore')
+LOCATION_KEYS = ('postalCode', 'country', 'city', 'stateOrProvince', 'latitude', 'longitude')
+CATEGORY_KEYS = ('categoryId', 'categoryName')
+PROJECTED_FIELDS = ('seller', 'item_location', 'category_list')
+
+
+def pick(value, keys):
+    if not isinstance(value, dict):
+        return None
+    projected = {key: value[key] for key in keys if value.get(key) not in (None, '')}
+    return projected or None
+
+
+def project_seller(seller):
+    return pick(seller, SELLER_KEYS)
+
+
+def project_location(item_location):
+    return pick(item_location, LOCATION_KEYS)
+
+
+def project_categories(categories):
+    if not isinstance(categories, list):
+        return []
+    return [category for category in (pick(value, CATEGORY_KEYS) for value in categories) if category]
+
+
+def project_item(item):
+    """Trim the JSON fields of an Item (or historical model instance) in place; True if anything changed."""
+    projected = {
+        'seller': project_seller(item.seller),
+        'item_location': project_location(item.item_location),
+        'category_list': project_categories(item.category_list) if item.category_list is not None else None,
+    }
+    changed = any(getattr(item, field) != value for field, value in projected.items())
+    for field, value in projected.items():
+        setattr(item, field, value)
+    return changed
+
+
+def item_storage_stats(connection):
+    """Row count, average stored size of each projected column and, on Postgres, relation sizes in bytes."""
+    stats = {}
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                "SELECT pg_total_relation_size(c.oid), pg_relation_size(c.oid), "
+                "COALESCE(pg_total_relation_size(NULLIF(c.reltoastrelid, 0)), 0), pg_indexes_size(c.oid) "
+                "FROM pg_class c WHERE c.oid = %s::regclass", [ITEM_TABLE]
+            )
+            stats.update(zip(('total_bytes', 'heap_bytes', 'toast_bytes', 'index_bytes'), cursor.fetchone()))
+            column_size = 'pg_column_size'
+        else:
+            column_size = 'length'
+
+        averages = ', '.join(f"avg({column_size}({field}))" for field in PROJECTED_FIELDS)
+        cursor.execute(f"SELECT count(*), {averages} FROM {ITEM_TABLE}")
+        row = cursor.fetchone()
+
+    stats['rows'] = row[0]
+    for field, size in zip(PROJECTED_FIELDS, row[1:]):
+        stats[f'avg_{field}_bytes'] = round(float(size or 0), 1)
+    return stats
+
+
+def format_storage_stats(stats):
+    return ', '.join(f"{key}={value}" for key, value in stats.items())
@@ -0,0 +1,155 @@
+import re
+from decimal import Decimal
+from ebay.constants import FILTER_OPTIONS, CONDITION_GROUPS, CONDITION_WORDS, CHEAP_PRICE
+from ebay.search_index import tokenize
+
+# a whole number, so "128gb" or "12.5.1" is never a price
+AMOUNT = r"(\d+(?:\.\d{1,2})?)(?![\w.])"
+MONEY = rf"\$?\s*{AMOUNT}"
+BETWEEN_RE = re.compile(rf"\bbetween\s+{MONEY}\s+and\s+{MONEY}", re.IGNORECASE)
+RANGE_RE = re.compile(rf"\${AMOUNT}\s*(?:-|to)\s*{MONEY}", re.IGNORECASE)
+# max/min/over/above/up to also turn up in product names ("iphone 12 pro max", "over 9000"), so they need a $
+MAX_PRICE_RE = re.compile(
+    rf"(?:(?:\b(?:under|below|less\s+than|cheaper\s+than)|<=?)\s*\$?|\b(?:max|up\s+to)\s*\$)\s*{AMOUNT}",
+    re.IGNORECASE
+)
+MIN_PRICE_RE = re.compile(
+    rf"(?:(?:\b(?:more\s+than|at\s+least)|>=?)\s*\$?|\b(?:over|above|min)\s*\$)\s*{AMOUNT}",
+    re.IGNORECASE
+)
+CHEAP_RE = re.compile(r"\b(?:cheap|cheapest|inexpensive|budget|bargain)\b", re.IGNORECASE)
+FREE_SHIPPING_RE = re.compile(r"\bfree\s+shipping\b", re.IGNORECASE)
+STOP_WORDS = {"a", "an", "and", "the", "for", "with", "in", "of", "on", "s"}
+MAX_PHRASE_LENGTH = 6
+
+
+def stem(token):
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def phrase_key(text):
+    return tuple(stem(token) for token in tokenize(text))
+
+
+FILTER_PHRASES = {phrase_key(option): option for option in FILTER_OPTIONS.keys()}
+CONDITION_PHRASES = {phrase_key(words): group for words, group in CONDITION_WORDS.items()}
+# "condition:new" and the like, for every group including ones with no other phrase
+CONDITION_PHRASES.update({('condition', *phrase_key(group)): group for group in CONDITION_GROUPS})
+
+
+class ParsedQuery():
+
+    def __init__(self, text='', category=None, condition=None, min_price=None, max_price=None, free_shipping=False):
+        self.text = text
+        self.category = category
+        self.condition = condition
+        self.min_price = min_price
+        self.max_price = max_price
+        self.free_shipping = free_shipping
+
+    def filters(self):
+        filters = {}
+
+        if self.condition is not None:
+            filters['condition__in'] = CONDITION_GROUPS[self.condition]
+        if self.min_price is not None:
+            filters['price__gte'] = self.min_price
+        if self.max_price is not None:
+            filters['price__lte'] = self.max_price
+        if self.free_shipping:
+            filters['shipping_price'] = 0
+
+        return filters
+
+    def __eq__(self, other):
+        return isinstance(other, ParsedQuery) and vars(self) == vars(other)
+
+    def __repr__(self):
+        return f"ParsedQuery({vars(self)})"
+
+
+def extract_prices(text, parsed):
+
+    def remove(match):
+        return ' ' * len(match.group(0))
+
+    for pattern in (BETWEEN_RE, RANGE_RE):
+        match = pattern.search(text)
+        if match:
+            low, high = sorted([Decimal(match.group(1)), Decimal(match.group(2))])
+            parsed.min_price, parsed.max_price = low, high
+            text = pattern.sub(remove, text, count=1)
+            break
+
+    match = MAX_PRICE_RE.search(text)
+    if match and parsed.max_price is None:
+        parsed.max_price = Decimal(match.group(1))
+        text = MAX_PRICE_RE.sub(remove, text, count=1)
+
+    match = MIN_PRICE_RE.search(text)
+    if match and parsed.min_price is None:
+        parsed.min_price = Decimal(match.group(1))
+        text = MIN_PRICE_RE.sub(remove, text, count=1)
+
+    if CHEAP_RE.search(text):
+        if parsed.max_price is None:
+            parsed.max_price = Decimal(CHEAP_PRICE)
+        text = CHEAP_RE.sub(remove, text)
+
+    if FREE_SHIPPING_RE.search(text):
+        parsed.free_shipping = True
+        text = FREE_SHIPPING_RE.sub(remove, text)
+
+    return text
+
+
+def match_phrases(tokens, consumed, parsed):
+    position = 0
+
+    while position < len(tokens):
+        matched = False
+
+        for length in range(min(MAX_PHRASE_LENGTH, len(tokens) - position), 0, -1):
+            key = tuple(stem(token) for token, _ in tokens[position:position + length])
+
+            if parsed.category is None and key in FILTER_PHRASES:
+                parsed.category = FILTER_PHRASES[key]
+            elif parsed.condition is None and key in CONDITION_PHRASES:
+                parsed.condition = CONDITION_PHRASES[key]
+            else:
+                continue
+
+            for index in range(position, position + length):
+                consumed[index] = True
+            position += length
+            matched = True
+            break
+
+        if not matched:
+            position += 1
+
+
+def parse_query(query):
+    parsed = ParsedQuery()
+    text = extract_prices(query or '', parsed)
+
+    words = text.split()
+    tokens = [(token, word_index) for word_index, word in enumerate(words) for token in tokenize(word)]
+    consumed = [False] * len(tokens)
+    match_phrases(tokens, consumed, parsed)
+
+    recognized = any(consumed) or parsed.filters()
+    remaining = []
+
+    for word_index, word in enumerate(words):
+        word_tokens = [index for index, (_, owner) in enumerate(tokens) if owner == word_index]
+        if word_tokens and all(consumed[index] for index in word_tokens):
+            continue
+        if recognized and all(tokens[index][0] in STOP_WORDS for index in word_tokens):
+            continue
+        remaining.append(word)
+
+    parsed.text = ' '.join(remaining)
+    return parsed
@@ -0,0 +1,21 @@
+import orjson
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+encoder = JSONEncoder()
+
+
+def dumps(data):
+    """orjson with DRF's encoder as the fallback for Decimal, lazy strings and the like."""
+    return orjson.dumps(data, default=encoder.default)
+
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return dumps(data)
@@ -0,0 +1,196 @@
+from collections import Counter
+from decimal import Decimal
+from django.db import connection, transaction
+from django.db.models import CharField, Count, Sum
+from django.db.models.functions import Cast
+from django.utils import timezone
+from ebay.constants import CONDITION_GROUPS, PRICE_BANDS
+
+ROLLUP_FIELDS = ('id', 'category_list', 'condition', 'charity_id', 'price')
+CONDITION_GROUP_OF = {condition: group for group, conditions in CONDITION_GROUPS.items() for condition in conditions}
+
+
+def item_row(item):
+    if isinstance(item, dict):
+        return item
+    return {field: getattr(item, field, None) for field in ROLLUP_FIELDS}
+
+
+def category_names(category_list):
+    if not isinstance(category_list, list):
+        return set()
+
+    return {category['categoryName'] for category in category_list
+            if isinstance(category, dict) and category.get('categoryName')}
+
+
+def category_deltas(items, sign):
+    deltas = Counter()
+    for item in items:
+        for name in category_names(item_row(item)['category_list']):
+            deltas[name] += sign
+    return deltas
+
+
+def condition_value(condition):
+    if not isinstance(condition, str) or not condition:
+        return None
+    return CONDITION_GROUP_OF.get(condition, condition)[:100]
+
+
+def price_band(price):
+    if not isinstance(price, (int, float, Decimal)):
+        return None
+
+    for label, low, high in PRICE_BANDS:
+        if price >= low and (high is None or price < high):
+            return label
+    return None
+
+
+def facet_values(row):
+    """(facet, value) pairs an item contributes to every scope it is counted in."""
+    values = [
+        ('condition', condition_value(row.get('condition'))),
+        ('charity', str(row['charity_id']) if isinstance(row.get('charity_id'), int) else None),
+        ('price', price_band(row.get('price'))),
+    ]
+    return [(facet, value) for facet, value in values if value is not None]
+
+
+def facet_deltas(items, sign):
+    """Counter keyed by (scope, facet, value).
+
+    The '' scope covers every item. Each category an item is listed under
+    gets its own scope, which also counts the other categories the item
+    shares so a category page can show its sub-categories.
+    """
+    deltas = Counter()
+    for item in items:
+        row = item_row(item)
+        names = category_names(row.get('category_list'))
+        values = facet_values(row)
+
+        for scope in [''] + sorted(names):
+            for facet, value in values:
+                deltas[(scope, facet, value)] += sign
+            if scope:
+                for name in names - {scope}:
+                    deltas[(scope, 'category', name)] += sign
+    return deltas
+
+
+def upsert_totals(model, key_columns, value_columns, rows):
+    """Add each row's values onto the stored ones, inserting missing keys."""
+    if not rows:
+        return
+
+    table = connection.ops.quote_name(model._meta.db_table)
+    keys = ', '.join(key_columns)
+    placeholders = ', '.join(['%s'] * (len(key_columns) + len(value_columns)))
+    updates = ', '.join(f"{column} = {table}.{column} + EXCLUDED.{column}" for column in value_columns)
+    # lock rows in key order so concurrent loaders touching the same keys can't deadlock
+    rows = sorted(rows, key=lambda row: row[:len(key_columns)])
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {table} ({keys}, {', '.join(value_columns)}) VALUES ({placeholders}) "
+            f"ON CONFLICT ({keys}) DO UPDATE SET {updates}",
+            rows
+        )
+
+
+def upsert_counts(model, key_columns, deltas):
+    upsert_totals(model, key_columns, ('count',), [(*key, delta) for key, delta in deltas.items() if delta])
+
+
+def apply_category_deltas(deltas):
+    from ebay.models import CategoryCount
+
+    upsert_counts(CategoryCount, ('name',), {(name,): delta for name, delta in deltas.items()})
+
+
+def apply_facet_deltas(deltas):
+    from ebay.models import FacetCount
+
+    upsert_counts(FacetCount, ('scope', 'facet', 'value'), deltas)
+
+
+def charity_deltas(items, sign):
+    """Per charity (item count, price total) deltas."""
+    deltas = {}
+    for item in items:
+        charity_id, price = item.get('charity_id'), item.get('price')
+        if not isinstance(charity_id, int) or not isinstance(price, (int, float, Decimal)):
+            continue
+        count, total = deltas.get(charity_id, (0, Decimal(0)))
+        deltas[charity_id] = (count + sign, total + sign * Decimal(price))
+    return deltas
+
+
+def apply_charity_deltas(deltas):
+    from ebay.models import CharityStats, CharityDailyStats
+
+    upsert_totals(CharityStats, ('charity_id',), ('item_count', 'price_total'),
+                  [(charity_id, count, total) for charity_id, (count, total) in deltas.items()])
+
+    today = timezone.localdate()
+    upsert_totals(CharityDailyStats, ('charity_id', 'day'), ('added', 'removed'),
+                  [(charity_id, today, max(count, 0), max(-count, 0)) for charity_id, (count, _) in deltas.items()])
+
+
+def hidden_charity_counts(scope=None):
+    """(scope, charity id as text, items) per scope for hidden charities, from their 'charity' FacetCount rows.
+
+    Rollups keep counting a deleted charity's items until its deletion job
+    removes them; this is what to subtract meanwhile.
+    """
+    from ebay.models import Charity, FacetCount
+
+    hidden = Charity.objects.filter(is_hidden=True).annotate(value=Cast('id', CharField())).values('value')
+    rows = FacetCount.objects.filter(facet='charity', value__in=hidden, count__gt=0)
+    if scope is not None:
+        rows = rows.filter(scope=scope)
+    return rows.values_list('scope', 'value', 'count')
+
+
+def record_items_added(items):
+    rows = [item_row(item) for item in items]
+    apply_category_deltas(category_deltas(rows, 1))
+    apply_facet_deltas(facet_deltas(rows, 1))
+    apply_charity_deltas(charity_deltas(rows, 1))
+
+
+def record_items_removed(items):
+    rows = [item_row(item) for item in items]
+    apply_category_deltas(category_deltas(rows, -1))
+    apply_facet_deltas(facet_deltas(rows, -1))
+    apply_charity_deltas(charity_deltas(rows, -1))
+
+
+def rebuild_rollups():
+    """Recompute the current totals. Daily added/removed history is left alone."""
+    from ebay.models import CategoryCount, CharityStats, FacetCount, Item
+
+    categories = Counter()
+    facets = Counter()
+    for row in Item.objects.values(*ROLLUP_FIELDS).iterator(chunk_size=2000):
+        categories.update(category_deltas([row], 1))
+        facets.update(facet_deltas([row], 1))
+
+    with transaction.atomic():
+        CategoryCount.objects.all().delete()
+        CategoryCount.objects.bulk_create(
+            [CategoryCount(name=name, count=count) for name, count in categories.items()], batch_size=1000
+        )
+        FacetCount.objects.all().delete()
+        FacetCount.objects.bulk_create(
+            [FacetCount(scope=scope, facet=facet, value=value, count=count)
+             for (scope, facet, value), count in facets.items()], batch_size=1000
+        )
+        CharityStats.objects.all().delete()
+        CharityStats.objects.bulk_create(
+            [CharityStats(charity_id=row['charity_id'], item_count=row['item_count'],
+                          price_total=row['price_total'] or 0)
+             for row in Item.objects.values('charity_id').annotate(item_count=Count('id'), price_total=Sum('price'))],
+            batch_size=1000
+        )
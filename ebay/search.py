@@ -1,11 +1,63 @@
-from ebay.models import Item
+from django.conf import settings
+from django.db.models import Case, When, IntegerField
 from ebay.constants import FILTER_OPTIONS
-from databasescripts.database_actions import getItemsByFilter
+from ebay import search_index
+from ebay.query_parser import parse_query
+from databasescripts.database_actions import getItemsByFilter, getItemsBySubCategory, visibleItems
 
 
-def search(query):
+# position of an item in the index's BM25 results, annotated on ranked searches
+RANK_FIELD = 'search_rank'
 
-    if query.title() in FILTER_OPTIONS.keys():
-        return getItemsByFilter(FILTER_OPTIONS[query.title()][0], FILTER_OPTIONS[query.title()][1])
-        
-    return Item.objects.filter(name__icontains=query)
\ No newline at end of file
+
+def search(query, backend=None):
+
+    parsed = parse_query(query)
+    backend = backend or settings.SEARCH_BACKEND
+    filters = parsed.filters()
+
+    if not parsed.text and parsed.category is None and not filters:
+        # nothing to search for; don't return the whole catalog
+        return visibleItems().none()
+
+    if parsed.text and backend != 'index':
+        filters['name__icontains'] = parsed.text
+
+    if parsed.category is not None:
+        items = category_items(parsed.category)
+        if filters:
+            items = items.filter(**filters)
+    else:
+        items = visibleItems().filter(**filters)
+
+    if parsed.text and backend == 'index':
+        items = index_search(items, parsed.text)
+
+    return items
+
+
+def is_ranked(query, backend=None):
+    """True when search() orders its results by relevance rather than by id."""
+    backend = backend or settings.SEARCH_BACKEND
+    return backend == 'index' and bool(parse_query(query).text)
+
+
+def category_items(option):
+
+    subcategory, filter = FILTER_OPTIONS[option]
+    if filter is None:
+        return getItemsBySubCategory(subcategory)
+    return getItemsByFilter(subcategory, filter)
+
+
+def index_search(items, text):
+
+    item_ids = search_index.search_item_ids(text)
+    if not item_ids:
+        return items.none()
+
+    ranking = Case(
+        *[When(id=item_id, then=position) for position, item_id in enumerate(item_ids)],
+        output_field=IntegerField()
+    )
+    return items.filter(id__in=item_ids).annotate(**{RANK_FIELD: ranking}).order_by(RANK_FIELD)
@@ -0,0 +1,538 @@
+import array
+import bisect
+import fcntl
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from django.conf import settings
+
+TOKEN_RE = re.compile(r"[^\W_]+")
+SEGMENT_MAGIC = b'CSIX0001'
+SEGMENT_HEADER = struct.Struct('<8sIIQQQ')
+MANIFEST_NAME = 'manifest.json'
+LOCK_NAME = 'write.lock'
+# segments per size tier (a power of MAX_SEGMENTS docs) before that tier is merged into one
+MAX_SEGMENTS = 8
+MAX_PREFIX_EXPANSIONS = 50
+MANIFEST_CHECK_INTERVAL = 1.0
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def index_enabled():
+    return getattr(settings, 'SEARCH_BACKEND', 'database') == 'index'
+
+
+def index_dir():
+    return getattr(settings, 'SEARCH_INDEX_DIR', os.path.join(settings.BASE_DIR, 'searchindex'))
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return TOKEN_RE.findall(str(text).lower())
+
+
+def item_tokens(item):
+    tokens = tokenize(item.name)
+    tokens += tokenize(item.category)
+
+    for category in item.category_list or []:
+        if isinstance(category, dict):
+            tokens += tokenize(category.get('categoryName'))
+
+    return tokens
+
+
+def encode_varints(values):
+    out = bytearray()
+    for value in values:
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def decode_varints(buffer):
+    values = []
+    value = shift = 0
+    for byte in buffer:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+    return values
+
+
+def write_segment(path, docs):
+    """Write docs, a list of (item_id, tokens), as one immutable segment file."""
+    docs = sorted(docs, key=lambda doc: doc[0])
+    doc_ids = array.array('q', (item_id for item_id, _ in docs))
+    doc_lengths = array.array('I', (len(tokens) for _, tokens in docs))
+
+    postings = {}
+    for ordinal, (_, tokens) in enumerate(docs):
+        for term, tf in Counter(tokens).items():
+            postings.setdefault(term, []).append((ordinal, tf))
+
+    terms = sorted(postings)
+    dfs = array.array('I')
+    offsets = array.array('Q', [0])
+    postings_blob = bytearray()
+
+    for term in terms:
+        previous = 0
+        values = []
+        for ordinal, tf in postings[term]:
+            values.append(ordinal - previous)
+            values.append(tf)
+            previous = ordinal
+        postings_blob += encode_varints(values)
+        dfs.append(len(postings[term]))
+        offsets.append(len(postings_blob))
+
+    terms_blob = '\x00'.join(terms).encode('utf-8')
+    terms_offset = SEGMENT_HEADER.size + len(doc_ids) * 8 + len(doc_lengths) * 4
+    postings_offset = terms_offset + len(terms_blob) + len(dfs) * 4 + len(offsets) * 8
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(SEGMENT_HEADER.pack(
+            SEGMENT_MAGIC, len(docs), len(terms), terms_offset, len(terms_blob), postings_offset
+        ))
+        file.write(doc_ids.tobytes())
+        file.write(doc_lengths.tobytes())
+        file.write(terms_blob)
+        file.write(dfs.tobytes())
+        file.write(offsets.tobytes())
+        file.write(postings_blob)
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(tmp_path, path)
+
+
+class Segment():
+
+    def __init__(self, path, seq):
+        self.path = path
+        self.seq = seq
+
+        with open(path, 'rb') as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, doc_count, term_count, terms_offset, terms_length, postings_offset = \
+            SEGMENT_HEADER.unpack_from(self.buffer, 0)
+
+        if magic != SEGMENT_MAGIC:
+            raise ValueError(f"{path} is not a search index segment")
+
+        position = SEGMENT_HEADER.size
+        self.doc_ids = array.array('q')
+        self.doc_ids.frombytes(self.buffer[position:position + doc_count * 8])
+        position += doc_count * 8
+
+        self.doc_lengths = array.array('I')
+        self.doc_lengths.frombytes(self.buffer[position:position + doc_count * 4])
+
+        terms_blob = self.buffer[terms_offset:terms_offset + terms_length]
+        self.terms = terms_blob.decode('utf-8').split('\x00') if term_count else []
+
+        position = terms_offset + terms_length
+        self.dfs = array.array('I')
+        self.dfs.frombytes(self.buffer[position:position + term_count * 4])
+        position += term_count * 4
+
+        self.offsets = array.array('Q')
+        self.offsets.frombytes(self.buffer[position:position + (term_count + 1) * 8])
+        self.postings_offset = postings_offset
+
+    def term_index(self, term):
+        index = bisect.bisect_left(self.terms, term)
+        if index < len(self.terms) and self.terms[index] == term:
+            return index
+        return None
+
+    def prefix_terms(self, prefix):
+        start = bisect.bisect_left(self.terms, prefix)
+        end = bisect.bisect_left(self.terms, prefix + '\uffff')
+        return self.terms[start:min(end, start + MAX_PREFIX_EXPANSIONS)]
+
+    def df(self, term):
+        index = self.term_index(term)
+        return 0 if index is None else self.dfs[index]
+
+    def postings(self, term):
+        index = self.term_index(term)
+        if index is None:
+            return []
+
+        start = self.postings_offset + self.offsets[index]
+        end = self.postings_offset + self.offsets[index + 1]
+        values = decode_varints(self.buffer[start:end])
+
+        result = []
+        ordinal = 0
+        for position in range(0, len(values), 2):
+            ordinal += values[position]
+            result.append((ordinal, values[position + 1]))
+        return result
+
+    def documents(self):
+        """Rebuild (item_id, tokens) pairs, used when merging segments."""
+        tokens = [[] for _ in self.doc_ids]
+        for term in self.terms:
+            for ordinal, tf in self.postings(term):
+                tokens[ordinal].extend([term] * tf)
+        return list(zip(self.doc_ids, tokens))
+
+    def close(self):
+        self.buffer.close()
+
+
+def read_manifest(directory):
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"version": 0, "next_seq": 1, "segments": [], "deletes": None}
+
+    with open(path) as file:
+        return json.load(file)
+
+
+def write_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST_NAME)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as file:
+        json.dump(manifest, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_deletes(directory, name):
+    if not name:
+        return {}
+
+    with open(os.path.join(directory, name), 'rb') as file:
+        data = array.array('q')
+        data.frombytes(file.read())
+
+    return dict(zip(data[0::2], data[1::2]))
+
+
+def write_deletes(directory, name, deletes):
+    data = array.array('q')
+    for item_id, seq in deletes.items():
+        data.append(item_id)
+        data.append(seq)
+
+    path = os.path.join(directory, name)
+    with open(f'{path}.tmp', 'wb') as file:
+        file.write(data.tobytes())
+    os.replace(f'{path}.tmp', path)
+
+
+def segment_doc_count(path):
+    with open(path, 'rb') as file:
+        return SEGMENT_HEADER.unpack(file.read(SEGMENT_HEADER.size))[1]
+
+
+def segment_tier(doc_count):
+    return int(math.log(max(doc_count, 1), MAX_SEGMENTS))
+
+
+def segment_path(directory, seq):
+    return os.path.join(directory, f'segment_{seq}.idx')
+
+
+@contextmanager
+def write_lock(directory):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, LOCK_NAME), 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def remove_files(directory, names):
+    for name in names:
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+
+
+class IndexWriter():
+
+    def __init__(self, directory=None):
+        self.directory = directory or index_dir()
+
+    def add_documents(self, docs):
+        if not docs:
+            return
+
+        with write_lock(self.directory):
+            manifest = read_manifest(self.directory)
+            seq = manifest['next_seq']
+            write_segment(segment_path(self.directory, seq), docs)
+
+            manifest['segments'].append(seq)
+            manifest['next_seq'] = seq + 1
+            manifest['version'] += 1
+
+            seqs = self.__full_tier(manifest)
+            if seqs:
+                self.__merge(manifest, seqs)
+            else:
+                write_manifest(self.directory, manifest)
+
+    def delete_documents(self, item_ids):
+        if not item_ids:
+            return
+
+        with write_lock(self.directory):
+            manifest = read_manifest(self.directory)
+            if not manifest['segments']:
+                return
+
+            deletes = read_deletes(self.directory, manifest['deletes'])
+            latest_seq = manifest['next_seq'] - 1
+            for item_id in item_ids:
+                deletes[int(item_id)] = latest_seq
+
+            old_deletes = manifest['deletes']
+            manifest['version'] += 1
+            manifest['deletes'] = f"deletes_{manifest['version']}.bin"
+            write_deletes(self.directory, manifest['deletes'], deletes)
+            write_manifest(self.directory, manifest)
+
+            if old_deletes:
+                remove_files(self.directory, [old_deletes])
+
+    def replace_all(self, docs):
+        with write_lock(self.directory):
+            old = read_manifest(self.directory)
+            seq = old['next_seq']
+            write_segment(segment_path(self.directory, seq), docs)
+
+            write_manifest(self.directory, {
+                "version": old['version'] + 1,
+                "next_seq": seq + 1,
+                "segments": [seq],
+                "deletes": None,
+            })
+            self.__remove_stale(old)
+
+    def __full_tier(self, manifest):
+        """Seqs of a size tier holding more than MAX_SEGMENTS segments, or None.
+
+        Merging only similar-sized segments rewrites each document once per
+        tier (logarithmic in the index size) instead of on every merge.
+        """
+        tiers = {}
+        for seq in manifest['segments']:
+            tier = segment_tier(segment_doc_count(segment_path(self.directory, seq)))
+            tiers.setdefault(tier, []).append(seq)
+        return next((seqs for _, seqs in sorted(tiers.items()) if len(seqs) > MAX_SEGMENTS), None)
+
+    def __merge(self, manifest, seqs):
+        deletes = read_deletes(self.directory, manifest['deletes'])
+        docs = []
+
+        for seq in seqs:
+            segment = Segment(segment_path(self.directory, seq), seq)
+            for item_id, tokens in segment.documents():
+                if deletes.get(item_id, -1) < seq:
+                    docs.append((item_id, tokens))
+            segment.close()
+
+        merged_seq = manifest['next_seq']
+        write_segment(segment_path(self.directory, merged_seq), docs)
+
+        remaining = [seq for seq in manifest['segments'] if seq not in seqs]
+        # deletes still apply to the segments left out of the merge
+        stale = {"segments": seqs, "deletes": None if remaining else manifest['deletes']}
+        manifest['segments'] = remaining + [merged_seq]
+        manifest['next_seq'] = merged_seq + 1
+        if not remaining:
+            manifest['deletes'] = None
+        write_manifest(self.directory, manifest)
+        self.__remove_stale(stale)
+
+        seqs = self.__full_tier(manifest)
+        if seqs:
+            self.__merge(manifest, seqs)
+
+    def __remove_stale(self, old_manifest):
+        stale = [os.path.basename(segment_path(self.directory, seq)) for seq in old_manifest['segments']]
+        if old_manifest['deletes']:
+            stale.append(old_manifest['deletes'])
+        remove_files(self.directory, stale)
+
+
+class SearchIndex():
+
+    def __init__(self, directory=None):
+        self.directory = directory or index_dir()
+        manifest = read_manifest(self.directory)
+        self.version = manifest['version']
+        self.deletes = read_deletes(self.directory, manifest['deletes'])
+        self.segments = [Segment(segment_path(self.directory, seq), seq) for seq in manifest['segments']]
+
+        self.doc_count = 0
+        total_length = 0
+        for segment in self.segments:
+            for item_id, length in zip(segment.doc_ids, segment.doc_lengths):
+                if not self.is_deleted(item_id, segment.seq):
+                    self.doc_count += 1
+                    total_length += length
+
+        self.average_length = total_length / self.doc_count if self.doc_count else 0
+        self.readers = 0
+        self.retired = False
+        self.readers_lock = threading.Lock()
+
+    def is_deleted(self, item_id, seq):
+        return self.deletes.get(item_id, -1) >= seq
+
+    def expand_terms(self, query):
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        groups = [[token] for token in tokens[:-1]]
+        last = set()
+        for segment in self.segments:
+            last.update(segment.prefix_terms(tokens[-1]))
+        groups.append(sorted(last) or [tokens[-1]])
+        return groups
+
+    def idf(self, term):
+        df = sum(segment.df(term) for segment in self.segments)
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+
+    def search(self, query, limit=None):
+        """Return [(item_id, score)] for items matching every query term, best first."""
+        groups = self.expand_terms(query)
+        if not groups or not self.doc_count:
+            return []
+
+        scores = None
+        for group in groups:
+            group_scores = {}
+            for term in group:
+                idf = self.idf(term)
+                for segment in self.segments:
+                    for ordinal, tf in segment.postings(term):
+                        item_id = segment.doc_ids[ordinal]
+                        if self.is_deleted(item_id, segment.seq):
+                            continue
+                        length = segment.doc_lengths[ordinal]
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / self.average_length)
+                        score = idf * tf * (BM25_K1 + 1) / (tf + norm)
+                        group_scores[item_id] = max(group_scores.get(item_id, 0), score)
+
+            if scores is None:
+                scores = group_scores
+            else:
+                scores = {item_id: score + group_scores[item_id]
+                          for item_id, score in scores.items() if item_id in group_scores}
+
+            if not scores:
+                return []
+
+        ranked = ((score, -item_id) for item_id, score in scores.items())
+        if limit is not None:
+            ranked = heapq.nlargest(limit, ranked)
+        else:
+            ranked = sorted(ranked, reverse=True)
+
+        return [(-negative_id, score) for score, negative_id in ranked]
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+
+
+_index = None
+_index_checked = 0
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index, _index_checked
+
+    now = time.monotonic()
+    if _index is not None and now - _index_checked < MANIFEST_CHECK_INTERVAL:
+        return _index
+
+    with _index_lock:
+        version = read_manifest(index_dir())['version']
+        if _index is None or _index.version != version:
+            previous = _index
+            try:
+                _index = SearchIndex()
+            except FileNotFoundError:
+                # a merge replaced the segments while we were opening them
+                _index = SearchIndex()
+            if previous is not None:
+                retire(previous)
+        _index_checked = now
+
+    return _index
+
+
+def retire(index):
+    # searches already running on the old index keep its mmaps until they finish
+    with index.readers_lock:
+        index.retired = True
+        if not index.readers:
+            index.close()
+
+
+@contextmanager
+def open_index():
+    while True:
+        index = get_index()
+        with index.readers_lock:
+            if not index.retired:
+                index.readers += 1
+                break
+    try:
+        yield index
+    finally:
+        with index.readers_lock:
+            index.readers -= 1
+            if index.retired and not index.readers:
+                index.close()
+
+
+def search_item_ids(query, limit=None):
+    limit = limit or getattr(settings, 'SEARCH_INDEX_MAX_RESULTS', 1000)
+    with open_index() as index:
+        return [item_id for item_id, _ in index.search(query, limit)]
+
+
+def add_items(items):
+    IndexWriter().add_documents([(item.id, item_tokens(item)) for item in items])
+
+
+def remove_items(item_ids):
+    IndexWriter().delete_documents(list(item_ids))
+
+
+def rebuild(items):
+    IndexWriter().replace_all([(item.id, item_tokens(item)) for item in items])
@@ -2,16 +2,26 @@ from rest_framework import serializers
 from .models import Charity, Item, FavoriteList
 from django.contrib.auth.models import User
 from rest_framework_simplejwt.tokens import RefreshToken
+from .fieldsets import DynamicFieldsMixin
 
-class CharitySerializer(serializers.ModelSerializer):
+class CharitySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Charity
-        fields = '__all__'
+        exclude = ['is_hidden']
 
-class ItemSerializer(serializers.ModelSerializer):
+class ItemSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Item
-        fields = '__all__'
+        exclude = ['card_json', 'detail_json', 'location_country', 'location_postal_prefix', 'latitude', 'longitude']
+        # the loader already skips known ebay_ids per page and the unique index backs it up,
+        # so the UniqueValidator's SELECT per item is pure overhead
+        extra_kwargs = {'ebay_id': {'validators': []}}
+
+class ItemListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """Card-sized item for search and category pages; the detail route keeps ItemSerializer."""
+    class Meta:
+        model = Item
+        fields = ['id', 'ebay_id', 'name', 'img_url', 'web_url', 'price', 'shipping_price', 'charity', 'condition']
 
 class FavoriteListSerializer(serializers.ModelSerializer):
 
@@ -22,6 +32,16 @@ class FavoriteListSerializer(serializers.ModelSerializer):
         model = FavoriteList
         fields = '__all__'
 
+    def __init__(self, *args, item_fields=None, charity_fields=None, include_items=True, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if not include_items:
+            self.fields.pop('items')
+        elif item_fields is not None:
+            self.fields['items'] = ItemSerializer(many=True, read_only=True, fields=item_fields)
+        if charity_fields is not None:
+            self.fields['charities'] = CharitySerializer(many=True, read_only=True, fields=charity_fields)
+
 class UserSerializer(serializers.ModelSerializer):
 
     name = serializers.SerializerMethodField(read_only=True)
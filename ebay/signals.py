@@ -1,6 +1,8 @@
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import pre_save, post_save, m2m_changed
 from django.contrib.auth.models import User
-from .models import Charity
+from .models import Charity, FavoriteList, Item
+from .locations import apply_location
+from .favorites_cache import invalidate_users
 from django.core.mail import send_mail
 from django.conf import settings
 from django.db import close_old_connections
@@ -15,6 +17,12 @@ def updateUser(sender, instance, **kwargs):
 
 pre_save.connect(updateUser, sender=User)
 
+def itemLocationChanged(sender, instance, **kwargs):
+    if 'item_location' not in instance.get_deferred_fields():
+        apply_location(instance)
+
+pre_save.connect(itemLocationChanged, sender=Item)
+
 def loadDatabase(sender, instance, **kwargs):
 
     if settings.TESTING:
@@ -43,4 +51,17 @@ def registeredUser(sender, instance, created, **kwargs):
         except Exception as e:
             print(f"Error sending email: {e}") 
 
-post_save.connect(registeredUser, sender=User)
\ No newline at end of file
+post_save.connect(registeredUser, sender=User)
+
+def favoritesChanged(sender, instance, action, reverse, pk_set, **kwargs):
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        invalidate_users([instance.user_id])
+    elif pk_set:
+        invalidate_users(FavoriteList.objects.filter(id__in=pk_set).values_list('user_id', flat=True))
+
+m2m_changed.connect(favoritesChanged, sender=FavoriteList.items.through)
+m2m_changed.connect(favoritesChanged, sender=FavoriteList.charities.through)
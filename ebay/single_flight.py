@@ -0,0 +1,155 @@
+import contextvars
+import hashlib
+import logging
+import threading
+import time
+from django.db import connections
+from redis.exceptions import LockError
+from ebay.db_routing import primary_reads
+from ebay.worker import get_redis
+
+logger = logging.getLogger(__name__)
+# long enough for a cold category query; a crashed leader only blocks others this long
+LOCK_LEASE = 15
+WAIT_TIMEOUT = 3
+POLL_INTERVAL = 0.1
+# after a failed revalidation the stale entry is served this long before anyone retries
+REVALIDATE_BACKOFF = 30
+
+_client = None
+
+
+def lock_client():
+    global _client
+    if _client is None:
+        _client = get_redis()
+    return _client
+
+
+def backoff_key(key):
+    return f'{key}_backoff'
+
+
+def lock_name(key):
+    return 'fill_lock_' + hashlib.sha1(key.encode()).hexdigest()
+
+
+def take_lock(key):
+    """The fill lock for key if this request got it, or None if another request holds it."""
+    lock = lock_client().lock(lock_name(key), timeout=LOCK_LEASE, blocking=False)
+    return lock if lock.acquire() else None
+
+
+def release(lock):
+    try:
+        lock.release()
+    except LockError:
+        # the lease ran out and another request may hold the lock now
+        pass
+    except Exception as e:
+        logger.error(f"Error releasing cache fill lock: {e}")
+
+
+def store(cache, key, value, timeout, stale_timeout):
+    # entries carry their soft expiry; the cache itself drops them at the hard one
+    cache.set(key, (time.time() + timeout, value), timeout + stale_timeout)
+
+
+def wait_for(cache, key):
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if isinstance(entry, tuple):
+            return entry[1]
+    return None
+
+
+def fill(cache, key, compute, timeout, stale_timeout=0):
+    """Cache compute() under key, letting only one request at a time across processes run it.
+
+    Requests that find the fill lock taken poll the cache for up to
+    WAIT_TIMEOUT seconds and only compute themselves if the leader hasn't
+    finished by then. Without Redis every request computes, as before.
+    """
+    try:
+        lock = take_lock(key)
+        leader = lock is not None
+    except Exception as e:
+        logger.error(f"Error taking cache fill lock: {e}")
+        lock, leader = None, True
+
+    if not leader:
+        value = wait_for(cache, key)
+        if value is not None:
+            return value
+        logger.warning(f"Gave up waiting for cache fill of {key}")
+
+    try:
+        if lock is not None:
+            # the previous leader may have stored it between our cache miss and taking the lock
+            entry = cache.get(key)
+            if isinstance(entry, tuple):
+                return entry[1]
+
+        with primary_reads():
+            value = compute()
+        store(cache, key, value, timeout, stale_timeout)
+        return value
+    finally:
+        if lock is not None:
+            release(lock)
+
+
+def refresh(cache, key, compute, timeout, stale_timeout, lock):
+    try:
+        with primary_reads():
+            value = compute()
+        store(cache, key, value, timeout, stale_timeout)
+    except Exception as e:
+        logger.error(f"Error revalidating {key}: {e}")
+        try:
+            cache.set(backoff_key(key), True, REVALIDATE_BACKOFF)
+        except Exception as e:
+            logger.error(f"Error recording revalidation backoff for {key}: {e}")
+    finally:
+        release(lock)
+        # this thread's own database connections
+        connections.close_all()
+
+
+def revalidate(cache, key, compute, timeout, stale_timeout):
+    """Recompute a stale entry in a background thread unless another request already is."""
+    try:
+        if cache.get(backoff_key(key)):
+            return
+        lock = take_lock(key)
+    except Exception as e:
+        logger.error(f"Error taking cache fill lock: {e}")
+        return
+    if lock is None:
+        return
+
+    # copy the context so the refresh reads from the same database as the request
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(refresh, cache, key, compute, timeout, stale_timeout, lock),
+                     name='cache-revalidate', daemon=True).start()
+
+
+def get_or_fill(cache, key, compute, timeout, stale_timeout):
+    """Stale-while-revalidate on top of fill().
+
+    Entries are fresh for `timeout` seconds and then served stale for up to
+    `stale_timeout` more while one request recomputes them in the
+    background; only a missing (or hard-expired) entry makes a request wait
+    on the query. A failed recompute is retried after REVALIDATE_BACKOFF
+    seconds, not on the next request.
+    """
+    entry = cache.get(key)
+    if not isinstance(entry, tuple):
+        return fill(cache, key, compute, timeout, stale_timeout)
+
+    fresh_until, value = entry
+    if time.time() >= fresh_until:
+        revalidate(cache, key, compute, timeout, stale_timeout)
+    return value
@@ -0,0 +1,143 @@
+import bisect
+import heapq
+import threading
+import time
+import uuid
+from collections import Counter
+from django.core.cache import caches
+from ebay.constants import FILTER_OPTIONS
+from ebay.search_index import tokenize
+import logging
+
+logger = logging.getLogger(__name__)
+
+SUGGEST_CACHE_KEY = 'suggest_entries'
+SUGGEST_VERSION_KEY = 'suggest_version'
+VERSION_CHECK_INTERVAL = 30
+PRECOMPUTED_PREFIX_LENGTH = 3
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+MAX_NGRAM_SIZE = 2
+MIN_NGRAM_COUNT = 3
+FILTER_OPTION_WEIGHT = 10 ** 6
+CATEGORY_WEIGHT = 10 ** 3
+
+
+def normalize(text):
+    return ' '.join(tokenize(text))
+
+
+def build_entries(items=()):
+    """Build sorted (key, display, weight) entries from (name, category_list) pairs."""
+    entries = {}
+
+    def add(display, weight):
+        key = normalize(display)
+        if key and weight > entries.get(key, ('', 0))[1]:
+            entries[key] = (display, weight)
+
+    for option in FILTER_OPTIONS.keys():
+        add(option, FILTER_OPTION_WEIGHT)
+
+    category_counts = Counter()
+    ngram_counts = Counter()
+    for name, category_list in items:
+        tokens = tokenize(name)
+        for size in range(1, MAX_NGRAM_SIZE + 1):
+            for start in range(len(tokens) - size + 1):
+                ngram_counts[' '.join(tokens[start:start + size])] += 1
+
+        for category in category_list or []:
+            if isinstance(category, dict) and category.get('categoryName'):
+                category_counts[category['categoryName']] += 1
+
+    for category, count in category_counts.items():
+        add(category, CATEGORY_WEIGHT + count)
+
+    for ngram, count in ngram_counts.items():
+        if count >= MIN_NGRAM_COUNT and len(ngram) > 1:
+            add(ngram, count)
+
+    return sorted((key, display, weight) for key, (display, weight) in entries.items())
+
+
+class Suggester():
+
+    def __init__(self, entries, version=None):
+        self.version = version
+        self.keys = [key for key, _, _ in entries]
+        self.displays = [display for _, display, _ in entries]
+        self.weights = [weight for _, _, weight in entries]
+
+        prefixes = {}
+        for position, key in enumerate(self.keys):
+            for length in range(1, min(len(key), PRECOMPUTED_PREFIX_LENGTH) + 1):
+                prefixes.setdefault(key[:length], []).append(position)
+
+        self.top = {
+            prefix: heapq.nlargest(MAX_LIMIT, positions, key=self.__rank)
+            for prefix, positions in prefixes.items()
+        }
+
+    def __rank(self, position):
+        return (self.weights[position], -len(self.keys[position]))
+
+    def suggest(self, text, limit=DEFAULT_LIMIT):
+        prefix = normalize(text)
+        if not prefix:
+            return []
+
+        limit = max(1, min(limit, MAX_LIMIT))
+
+        if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH:
+            positions = self.top.get(prefix, [])[:limit]
+        else:
+            start = bisect.bisect_left(self.keys, prefix)
+            end = bisect.bisect_left(self.keys, prefix + '\uffff')
+            positions = heapq.nlargest(limit, range(start, end), key=self.__rank)
+
+        return [self.displays[position] for position in positions]
+
+
+def rebuild_suggestions():
+    from ebay.models import Item
+
+    items = Item.objects.filter(charity__is_hidden=False).values_list('name', 'category_list').iterator(chunk_size=2000)
+    entries = build_entries(items)
+
+    version = uuid.uuid4().hex
+    cache = caches['default']
+    cache.set(SUGGEST_CACHE_KEY, {"version": version, "entries": entries}, None)
+    cache.set(SUGGEST_VERSION_KEY, version, None)
+    return len(entries)
+
+
+_suggester = None
+_suggester_checked = 0
+_suggester_lock = threading.Lock()
+
+
+def get_suggester():
+    global _suggester, _suggester_checked
+
+    now = time.monotonic()
+    if _suggester is not None and now - _suggester_checked < VERSION_CHECK_INTERVAL:
+        return _suggester
+
+    with _suggester_lock:
+        cache = caches['default']
+        try:
+            version = cache.get(SUGGEST_VERSION_KEY)
+            if _suggester is None or (version is not None and version != _suggester.version):
+                data = cache.get(SUGGEST_CACHE_KEY) if version is not None else None
+                if data is not None:
+                    _suggester = Suggester(data['entries'], data['version'])
+        except Exception as e:
+            logger.error(f"Error loading suggestions from cache: {e}")
+
+        if _suggester is None:
+            _suggester = Suggester(build_entries())
+
+        _suggester_checked = now
+
+    return _suggester
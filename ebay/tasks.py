@@ -11,5 +11,8 @@ def update_database(charity_id):
         loader.load_items_to_db()
         print("loader finished")
 
+        from .suggest import rebuild_suggestions
+        rebuild_suggestions()
+
     except Exception as e:
         print(f"Error updating database for charity {charity_id}: {e}")
\ No newline at end of file
@@ -0,0 +1,34 @@
+import datetime
+from unittest.mock import patch
+from django.test import TestCase
+from ebay import archive
+from ebay.archive import ensure_partition, month_bounds
+
+
+@patch('ebay.archive.connections')
+class TestEnsurePartition(TestCase):
+
+    def setUp(self):
+        self.moment = datetime.datetime(2026, 3, 15, tzinfo=datetime.timezone.utc)
+        self.key = ('default', month_bounds(self.moment)[0])
+        archive._partitions.discard(self.key)
+        self.addCleanup(archive._partitions.discard, self.key)
+
+    def test_partition_is_remembered_once_committed(self, mock_connections):
+        mock_connections.__getitem__.return_value.vendor = 'postgresql'
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ensure_partition(self.moment)
+
+        self.assertIn(self.key, archive._partitions)
+
+    def test_rolled_back_partition_is_created_again(self, mock_connections):
+        mock_connections.__getitem__.return_value.vendor = 'postgresql'
+        cursor = mock_connections.__getitem__.return_value.cursor.return_value.__enter__.return_value
+
+        with self.captureOnCommitCallbacks(execute=False):
+            ensure_partition(self.moment)
+        ensure_partition(self.moment)
+
+        self.assertNotIn(self.key, archive._partitions)
+        self.assertEqual(cursor.execute.call_count, 2)
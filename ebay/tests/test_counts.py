@@ -0,0 +1,161 @@
+import unittest
+from unittest.mock import patch, Mock
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from ebay.models import Charity, Item, CategoryCount
+from ebay.generations import bump, charity_scope
+from ebay.counts import category_count, queryset_count
+from ebay.pagination import ItemPageNumberPagination
+from ebay.rollups import rebuild_rollups
+from databasescripts.database_actions import deleteItems
+
+
+def categories(*names):
+    return [{"categoryId": str(index), "categoryName": name} for index, name in enumerate(names)]
+
+
+class TestCategoryRollups(TestCase):
+
+    def setUp(self):
+        self.charity = Charity.objects.create(id=1234, name="Test Charity", description="test charity")
+
+    def create_item(self, ebay_id, *names):
+        return Item.objects.create(ebay_id=ebay_id, name=ebay_id, price=1, web_url="https://ebay.com",
+                                   charity=self.charity, category_list=categories(*names))
+
+    def counts(self):
+        return dict(CategoryCount.objects.values_list('name', 'count'))
+
+    def test_rebuild_counts_each_category_once_per_item(self):
+        self.create_item("A", "Books", "Fiction", "Books")
+        self.create_item("B", "Books", "Comics")
+
+        rebuild_rollups()
+
+        self.assertEqual(self.counts(), {"Books": 2, "Fiction": 1, "Comics": 1})
+
+    def test_delete_items_decrements_counts(self):
+        self.create_item("A", "Books", "Fiction")
+        self.create_item("B", "Books")
+        rebuild_rollups()
+
+        deleted = deleteItems(Item.objects.filter(ebay_id="A"))
+
+        self.assertEqual(deleted, 1)
+        self.assertEqual(self.counts(), {"Books": 1, "Fiction": 0})
+        self.assertEqual(category_count("Books"), (1, True))
+
+    def test_rebuild_recomputes_charity_stats(self):
+        from ebay.models import CharityStats
+
+        self.create_item("A", "Books")
+        self.create_item("B", "Books")
+
+        rebuild_rollups()
+
+        stats = CharityStats.objects.get(charity=self.charity)
+        self.assertEqual((stats.item_count, stats.price_total), (2, 2))
+
+    def test_category_count_leaves_out_hidden_charities(self):
+        other = Charity.objects.create(id=99, name="Other Charity", description="other charity", is_hidden=True)
+        self.create_item("A", "Books")
+        Item.objects.create(ebay_id="B", name="B", price=1, web_url="https://ebay.com", charity=other,
+                            category_list=categories("Books"))
+        rebuild_rollups()
+
+        self.assertEqual(category_count("Books"), (1, True))
+
+    def test_missing_category_counts_zero(self):
+        self.assertEqual(category_count("Nothing"), (0, True))
+
+    def test_loader_batch_increments_counts(self):
+        from ebay.rollups import record_items_added
+
+        record_items_added([self.create_item("A", "Books"), self.create_item("B", "Books", "Maps")])
+        record_items_added([{"id": 3, "category_list": categories("Maps")}])
+
+        self.assertEqual(self.counts(), {"Books": 2, "Maps": 2})
+
+    def test_upserts_run_in_key_order(self):
+        from ebay.rollups import upsert_counts
+
+        with patch('ebay.rollups.connection') as mock_connection:
+            mock_connection.ops.quote_name.side_effect = lambda name: name
+            upsert_counts(CategoryCount, ('name',), {("Maps",): 1, ("Books",): 2, ("Comics",): -1})
+
+        cursor = mock_connection.cursor.return_value.__enter__.return_value
+        self.assertEqual(cursor.executemany.call_args[0][1], [("Books", 2), ("Comics", -1), ("Maps", 1)])
+
+
+class TestQuerysetCount(TestCase):
+
+    def setUp(self):
+        charity = Charity.objects.create(id=1234, name="Test Charity", description="test charity")
+        for index in range(3):
+            Item.objects.create(ebay_id=f"ITEM{index}", name=f"Item {index}", price=1,
+                                web_url="https://ebay.com", charity=charity)
+
+    @patch('ebay.counts.cache')
+    def test_counts_exactly_and_caches(self, mock_cache):
+        mock_cache.get.return_value = None
+
+        self.assertEqual(queryset_count(Item.objects.all()), (3, True))
+        mock_cache.set.assert_called_once()
+
+    @patch('ebay.counts.cache')
+    def test_cached_count_skips_query(self, mock_cache):
+        mock_cache.get.return_value = [120000, False]
+
+        with self.assertNumQueries(0):
+            self.assertEqual(queryset_count(Item.objects.all()), (120000, False))
+
+    @patch('ebay.generations.cache', LocMemCache('generations', {}))
+    @patch('ebay.counts.cache')
+    def test_count_key_moves_with_the_scope_generation(self, mock_cache):
+        mock_cache.get.return_value = None
+
+        queryset_count(Item.objects.all(), charity_scope(1234))
+        before = mock_cache.set.call_args[0][0]
+        bump([charity_scope(1234)])
+        queryset_count(Item.objects.all(), charity_scope(1234))
+
+        self.assertNotEqual(mock_cache.set.call_args[0][0], before)
+
+
+class TestItemPageNumberPagination(unittest.TestCase):
+
+    def test_known_count_is_reported_without_counting(self):
+        queryset = Mock()
+        queryset.__getitem__ = Mock(return_value=[])
+        request = Request(APIRequestFactory().get('/items/', {'page': 2}))
+        paginator = ItemPageNumberPagination()
+
+        paginator.paginate_queryset(queryset, request, count=(120, False))
+        response = paginator.get_paginated_response([])
+
+        queryset.count.assert_not_called()
+        self.assertEqual(response.data['count'], 120)
+        self.assertFalse(response.data['count_exact'])
+
+    def test_low_estimate_does_not_hide_trailing_pages(self):
+        rows = list(range(120))
+        paginator = ItemPageNumberPagination()
+
+        page = paginator.paginate_queryset(rows, Request(APIRequestFactory().get('/items/', {'page': 2})),
+                                           count=(10, False))
+        self.assertEqual(page, rows[50:100])
+        self.assertIsNotNone(paginator.get_paginated_response([]).data['next'])
+
+        page = paginator.paginate_queryset(rows, Request(APIRequestFactory().get('/items/', {'page': 3})),
+                                           count=(10, False))
+        self.assertEqual(page, rows[100:])
+        self.assertIsNone(paginator.get_paginated_response([]).data['next'])
+
+    def test_exact_count_still_bounds_pages(self):
+        with self.assertRaises(NotFound):
+            ItemPageNumberPagination().paginate_queryset(
+                list(range(10)), Request(APIRequestFactory().get('/items/', {'page': 2})), count=(10, True)
+            )
@@ -0,0 +1,146 @@
+import unittest
+from unittest.mock import patch
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from ebay import db_routing, single_flight
+from ebay.db_routing import (ReplicaMiddleware, ReplicaRouter, pin_key, primary_reads, replica_reads,
+                              request_user_id)
+from ebay.models import Item
+from ebay.views.favorite_list import FavoriteListView
+from ebay.views.charity_views import EbayCharity
+from ebay.views.item_views import EbayCharityItems
+
+
+@patch('ebay.db_routing.replica_enabled', return_value=True)
+@override_settings(REPLICA_PIN_SECONDS=15)
+class TestReplicaRouting(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = ReplicaRouter()
+        self.user = User(id=42, username="fan")
+        cache_patcher = patch.object(db_routing, 'cache', LocMemCache('replica_pins', {}))
+        self.pins = cache_patcher.start()
+        self.pins.clear()
+        self.addCleanup(cache_patcher.stop)
+
+    def run_view(self, request, view_class, status=200, user=None):
+        """Mimic the handler: process_view, then the view, recording where an Item read would go."""
+        seen = {}
+        request.user = AnonymousUser()
+
+        def get_response(request):
+            middleware.process_view(request, view_class.as_view(), (), {})
+            seen['item'] = self.router.db_for_read(Item)
+            seen['user'] = self.router.db_for_read(User)
+            # what DRF's authentication does for JWT requests
+            if user is not None:
+                request.user = user
+            return HttpResponse(status=status)
+
+        middleware = ReplicaMiddleware(get_response)
+        response = middleware(request)
+        return response, seen
+
+    def jwt_get(self, path):
+        return self.factory.get(path, HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def test_public_reads_use_replica_but_auth_stays_on_primary(self, mock_enabled):
+        response, seen = self.run_view(self.factory.get('/api/ebaycharityitems/1'), EbayCharityItems)
+
+        self.assertEqual(seen, {'item': 'replica', 'user': 'default'})
+        self.assertFalse(replica_reads.get())
+
+    def test_unmarked_views_read_from_primary(self, mock_enabled):
+        _, seen = self.run_view(self.factory.get('/api/favorites/'), FavoriteListView)
+
+        self.assertEqual(seen['item'], 'default')
+
+    def test_successful_write_pins_user_to_primary(self, mock_enabled):
+        self.run_view(self.factory.post('/api/favorites/'), FavoriteListView, user=self.user)
+
+        self.assertIsNotNone(self.pins.get(pin_key(42)))
+        _, seen = self.run_view(self.jwt_get('/api/ebaycharityitems/1'), EbayCharityItems)
+        self.assertEqual(seen['item'], 'default')
+
+    def test_failed_write_does_not_pin(self, mock_enabled):
+        self.run_view(self.factory.post('/api/favorites/'), FavoriteListView, status=400, user=self.user)
+
+        self.assertIsNone(self.pins.get(pin_key(42)))
+
+    def test_other_users_keep_reading_from_replica(self, mock_enabled):
+        self.pins.set(pin_key(7), 1)
+
+        _, seen = self.run_view(self.jwt_get('/api/ebaycharityitems/1'), EbayCharityItems)
+
+        self.assertEqual(seen['item'], 'replica')
+
+    def test_writes_and_migrations_always_target_primary(self, mock_enabled):
+        token = replica_reads.set(True)
+        try:
+            self.assertEqual(self.router.db_for_write(Item), 'default')
+        finally:
+            replica_reads.reset(token)
+        self.assertFalse(self.router.allow_migrate('replica', 'ebay'))
+
+
+class TestRequestUserId(SimpleTestCase):
+
+    def test_reads_user_id_from_bearer_token(self):
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(User(id=42))}')
+
+        self.assertEqual(str(request_user_id(request)), '42')
+
+    def test_invalid_or_missing_token_is_anonymous(self):
+        self.assertIsNone(request_user_id(RequestFactory().get('/', HTTP_AUTHORIZATION='Bearer nope')))
+        self.assertIsNone(request_user_id(RequestFactory().get('/')))
+
+
+class TestReplicaDisabled(unittest.TestCase):
+
+    def test_reads_use_primary_without_replica_configured(self):
+        token = replica_reads.set(True)
+        try:
+            self.assertEqual(ReplicaRouter().db_for_read(Item), 'default')
+        finally:
+            replica_reads.reset(token)
+
+
+@patch('ebay.db_routing.replica_enabled', return_value=True)
+class TestCharityListRouting(SimpleTestCase):
+
+    def test_charity_list_reads_primary_so_invalidation_refills_fresh_rows(self, mock_enabled):
+        request = RequestFactory().get('/api/charities/')
+        middleware = ReplicaMiddleware(lambda request: HttpResponse())
+
+        middleware.process_view(request, EbayCharity.as_view(), (), {})
+
+        self.assertEqual(ReplicaRouter().db_for_read(Item), 'default')
+
+
+@patch('ebay.db_routing.replica_enabled', return_value=True)
+class TestCacheFillsReadPrimary(SimpleTestCase):
+
+    def setUp(self):
+        token = replica_reads.set(True)
+        self.addCleanup(replica_reads.reset, token)
+
+    def test_primary_reads_overrides_replica_request(self, mock_enabled):
+        with primary_reads():
+            self.assertEqual(ReplicaRouter().db_for_read(Item), 'default')
+        self.assertEqual(ReplicaRouter().db_for_read(Item), 'replica')
+
+    def test_single_flight_fill_computes_on_primary(self, mock_enabled):
+        seen = []
+
+        def compute():
+            seen.append(ReplicaRouter().db_for_read(Item))
+            return b'{}'
+
+        with patch.object(single_flight, 'lock_client', side_effect=ConnectionError):
+            single_flight.fill(LocMemCache('fills', {}), 'page', compute, 60)
+
+        self.assertEqual(seen, ['default'])
@@ -0,0 +1,151 @@
+import unittest
+from decimal import Decimal
+from unittest.mock import patch
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+from ebay.facets import get_facets, queryset_facets, rollup_scope
+from ebay.search import search
+from ebay.models import Charity, Item
+from ebay.rollups import facet_deltas, price_band, rebuild_rollups
+from ebay.views.facet_view import ItemFacetView
+from databasescripts.database_actions import deleteItems
+
+
+def categories(*names):
+    return [{"categoryId": str(index), "categoryName": name} for index, name in enumerate(names)]
+
+
+def values(facet_list):
+    return {entry["value"]: entry["count"] for entry in facet_list}
+
+
+class TestFacetDeltas(unittest.TestCase):
+
+    def test_item_counts_in_global_and_each_category_scope(self):
+        row = {"id": 1, "category_list": categories("Books", "Fiction"), "condition": "Brand New",
+               "charity_id": 7, "price": Decimal("12.50")}
+
+        deltas = facet_deltas([row], 1)
+
+        self.assertEqual(deltas[('', 'condition', 'New')], 1)
+        self.assertEqual(deltas[('Books', 'charity', '7')], 1)
+        self.assertEqual(deltas[('Fiction', 'price', '$10 to $25')], 1)
+        self.assertEqual(deltas[('Books', 'category', 'Fiction')], 1)
+        self.assertNotIn(('Books', 'category', 'Books'), deltas)
+        self.assertNotIn(('', 'category', 'Books'), deltas)
+
+    def test_unknown_condition_is_kept_verbatim(self):
+        deltas = facet_deltas([{"id": 1, "category_list": [], "condition": "Graded",
+                                "charity_id": None, "price": None}], 1)
+
+        self.assertEqual(dict(deltas), {('', 'condition', 'Graded'): 1})
+
+    def test_price_band_edges(self):
+        self.assertEqual(price_band(Decimal("9.99")), "Under $10")
+        self.assertEqual(price_band(Decimal("10")), "$10 to $25")
+        self.assertEqual(price_band(Decimal("250")), "$100 and up")
+        self.assertIsNone(price_band(None))
+
+
+class TestRollupScope(unittest.TestCase):
+
+    def test_empty_query_is_global(self):
+        self.assertEqual(rollup_scope(''), '')
+
+    def test_free_text_needs_fallback(self):
+        self.assertIsNone(rollup_scope('halo'))
+
+
+class TestGetFacets(TestCase):
+
+    def setUp(self):
+        self.charity = Charity.objects.create(id=1234, name="Test Charity", description="test charity")
+        self.other = Charity.objects.create(id=99, name="Other Charity", description="other charity")
+        self.create_item("A", self.charity, 5, "Used", "Books", "Fiction")
+        self.create_item("B", self.charity, 30, "New", "Books")
+        self.create_item("C", self.other, 150, "Used", "Toys")
+        rebuild_rollups()
+
+    def create_item(self, ebay_id, charity, price, condition, *names):
+        return Item.objects.create(ebay_id=ebay_id, name=f"Halo {ebay_id}", price=price, condition=condition,
+                                   web_url="https://ebay.com", charity=charity, category_list=categories(*names))
+
+    def test_global_facets_come_from_rollups(self):
+        with self.assertNumQueries(4):
+            facets = get_facets()
+
+        self.assertEqual(values(facets['category']), {"Books": 2, "Fiction": 1, "Toys": 1})
+        self.assertEqual(values(facets['condition']), {"Used": 2, "New": 1})
+        self.assertEqual(facets['charity'][0], {"value": "1234", "count": 2, "label": "Test Charity"})
+        self.assertEqual([entry["value"] for entry in facets['price']], ["Under $10", "$25 to $50", "$100 and up"])
+
+    def test_category_scope(self):
+        facets = get_facets(category="Books")
+
+        self.assertEqual(values(facets['category']), {"Fiction": 1})
+        self.assertEqual(values(facets['charity']), {"1234": 2})
+
+    def test_deletes_are_reflected(self):
+        deleteItems(Item.objects.filter(ebay_id="B"))
+
+        facets = get_facets(category="Books")
+
+        self.assertEqual(values(facets['condition']), {"Used": 1})
+
+    def test_hidden_charity_is_left_out_of_rollups(self):
+        Charity.objects.filter(id=99).update(is_hidden=True)
+
+        facets = get_facets()
+
+        self.assertEqual(values(facets['category']), {"Books": 2, "Fiction": 1})
+        self.assertEqual(values(facets['charity']), {"1234": 2})
+
+    def test_hidden_charity_is_left_out_of_category_scope(self):
+        Charity.objects.filter(id=1234).update(is_hidden=True)
+
+        with self.assertNumQueries(2):
+            facets = get_facets(category="Books")
+
+        self.assertEqual(values(facets['charity']), {})
+
+    @patch('ebay.facets.cache')
+    def test_free_text_search_aggregates_matching_items(self, mock_cache):
+        mock_cache.get.return_value = None
+
+        facets = get_facets(query="halo a")
+
+        self.assertEqual(values(facets['category']), {"Books": 1, "Fiction": 1})
+        mock_cache.set.assert_called_once()
+
+    @patch('ebay.facets.cache')
+    def test_search_facets_are_counted_by_the_database(self, mock_cache):
+        mock_cache.get.return_value = None
+
+        with self.assertNumQueries(4):
+            counts = queryset_facets(search("halo"))
+
+        self.assertEqual(dict(counts['category']), {"Books": 2, "Fiction": 1, "Toys": 1})
+        self.assertEqual(dict(counts['condition']), {"Used": 2, "New": 1})
+        self.assertEqual(dict(counts['charity']), {"1234": 2, "99": 1})
+        self.assertEqual(dict(counts['price']), {"Under $10": 1, "$25 to $50": 1, "$100 and up": 1})
+
+
+class TestItemFacetView(unittest.TestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.view = ItemFacetView.as_view()
+
+    @patch('ebay.views.facet_view.get_facets')
+    def test_passes_query_and_category(self, mock_get_facets):
+        mock_get_facets.return_value = {}
+
+        response = self.view(self.factory.get('/items/facets/', {'q': ' halo ', 'category': 'Books'}))
+
+        self.assertEqual(response.status_code, 200)
+        mock_get_facets.assert_called_once_with(query='halo', category='Books', filter=None)
+
+    def test_filter_without_category_is_rejected(self):
+        response = self.view(self.factory.get('/items/facets/', {'filter': 'halo'}))
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,208 @@
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+from ebay.models import Charity, FavoriteList, Item
+from ebay.pagination import ItemPageNumberPagination
+from django.core.cache.backends.locmem import LocMemCache
+from ebay import favorites_cache
+from databasescripts.database_actions import deleteItems
+from ebay.views.favorite_list import FavoriteListView, FavoriteBatchView, MAX_FAVORITES_BATCH
+
+
+class FavoritesCacheTestCase(TestCase):
+
+    def setUp(self):
+        cache_patcher = patch.object(favorites_cache, 'cache', LocMemCache('favorites', {}))
+        self.cache = cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+
+
+class TestFavoriteListFieldsets(FavoritesCacheTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="fan", password="secret")
+        charity = Charity.objects.create(id=1234, name="Test Charity", description="test charity")
+        item = Item.objects.create(ebay_id="ITEM1", name="Halo", price=5, web_url="https://ebay.com", charity=charity)
+        favorite_list = FavoriteList.objects.create(user=self.user)
+        favorite_list.items.add(item)
+        favorite_list.charities.add(charity)
+
+    def test_fields_narrow_items_and_charities(self):
+        request = APIRequestFactory().get('/favorites/', {'fields': 'ebay_id', 'charity_fields': 'name'})
+        force_authenticate(request, user=self.user)
+
+        response = FavoriteListView.as_view()(request)
+
+        self.assertEqual(response.data['items'], [{"ebay_id": "ITEM1"}])
+        self.assertEqual(response.data['charities'], [{"name": "Test Charity"}])
+
+
+class TestFavoriteListView(FavoritesCacheTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="fan", password="secret")
+        self.charity = Charity.objects.create(id=1234, name="Test Charity", description="test charity")
+        self.favorite_list = FavoriteList.objects.create(user=self.user)
+        for index in range(3):
+            self.favorite_list.items.add(Item.objects.create(
+                ebay_id=f"ITEM{index}", name=f"Item {index}", price=5, web_url="https://ebay.com", charity=self.charity
+            ))
+        self.favorite_list.charities.add(self.charity)
+        self.view = FavoriteListView.as_view()
+
+    def get(self, params=None):
+        request = APIRequestFactory(HTTP_HOST='localhost').get('/favorites/', params or {})
+        force_authenticate(request, user=self.user)
+        return self.view(request)
+
+    def test_full_list_uses_fixed_number_of_queries(self):
+        with self.assertNumQueries(3):
+            response = self.get()
+
+        self.assertEqual(len(response.data['items']), 3)
+        self.assertNotIn('detail_json', response.data['items'][0])
+        self.assertEqual(response.data['charities'][0]['name'], "Test Charity")
+
+    def test_ids_only(self):
+        with self.assertNumQueries(2):
+            response = self.get({'ids_only': '1'})
+
+        self.assertEqual(sorted(response.data['items']), ["ITEM0", "ITEM1", "ITEM2"])
+        self.assertEqual(response.data['charities'], [1234])
+
+    def test_items_are_paginated_when_page_is_given(self):
+        with patch.object(ItemPageNumberPagination, 'page_size', 2):
+            response = self.get({'page': 1})
+
+        items = response.data['items']
+        self.assertEqual(items['count'], 3)
+        self.assertEqual([item['ebay_id'] for item in items['results']], ["ITEM2", "ITEM1"])
+        self.assertIsNotNone(items['next'])
+
+
+class TestFavoriteBatchView(FavoritesCacheTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="fan", password="secret")
+        self.charity = Charity.objects.create(id=1234, name="Test Charity", description="test charity")
+        self.other_charity = Charity.objects.create(id=99, name="Other Charity", description="other")
+        self.items = [
+            Item.objects.create(ebay_id=f"ITEM{index}", name=f"Item {index}", price=5, web_url="https://ebay.com",
+                                charity=self.charity)
+            for index in range(3)
+        ]
+        self.favorite_list = FavoriteList.objects.create(user=self.user)
+        self.favorite_list.items.add(self.items[0])
+        self.favorite_list.charities.add(self.charity)
+        self.view = FavoriteBatchView.as_view()
+
+    def post(self, body, user=None):
+        request = APIRequestFactory().post('/favorites/batch/', body, format='json')
+        force_authenticate(request, user=user or self.user)
+        return self.view(request)
+
+    def test_adds_and_removes_in_bulk_and_returns_diff(self):
+        response = self.post({
+            "add": {"items": ["ITEM0", "ITEM1", "ITEM2", "NOPE"], "charities": [99]},
+            "remove": {"charities": [1234, 5]},
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            "added": {"items": ["ITEM1", "ITEM2"], "charities": [99]},
+            "removed": {"items": [], "charities": [1234]},
+            "missing": {"items": ["NOPE"], "charities": [5]},
+        })
+        self.assertEqual(set(self.favorite_list.items.values_list('ebay_id', flat=True)), {"ITEM0", "ITEM1", "ITEM2"})
+        self.assertEqual(list(self.favorite_list.charities.values_list('id', flat=True)), [99])
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        with CaptureQueriesContext(connection) as small:
+            self.post({"add": {"items": ["ITEM1"], "charities": [99]}, "remove": {"items": ["ITEM0"], "charities": [1234]}})
+
+        with CaptureQueriesContext(connection) as large:
+            self.post({"add": {"items": ["ITEM0", "ITEM2"], "charities": [1234]},
+                       "remove": {"items": ["ITEM1"], "charities": [99]}})
+
+        self.assertEqual(len(small), len(large))
+
+    def test_repeated_add_is_a_no_op(self):
+        response = self.post({"add": {"items": ["ITEM0"], "charities": [1234]}})
+
+        self.assertEqual(response.data["added"], {"items": [], "charities": []})
+
+    def test_rejects_malformed_body(self):
+        self.assertEqual(self.post({"add": {"items": "ITEM0"}}).status_code, 400)
+        self.assertEqual(self.post({"add": {"charities": ["abc"]}}).status_code, 400)
+
+    def test_rejects_oversized_batch(self):
+        response = self.post({"add": {"items": [f"ITEM{index}" for index in range(MAX_FAVORITES_BATCH + 1)]}})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_authentication(self):
+        request = APIRequestFactory().post('/favorites/batch/', {}, format='json')
+
+        self.assertIn(self.view(request).status_code, [401, 403])
+
+
+class TestFavoritesCache(FavoritesCacheTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="fan", password="secret")
+        self.charity = Charity.objects.create(id=1234, name="Test Charity", description="test charity")
+        self.item = Item.objects.create(ebay_id="ITEM0", name="Item 0", price=5, web_url="https://ebay.com",
+                                        charity=self.charity)
+        self.favorite_list = FavoriteList.objects.create(user=self.user)
+        self.favorite_list.items.add(self.item)
+
+    def get(self, params=None):
+        request = APIRequestFactory().get('/favorites/', params or {})
+        force_authenticate(request, user=self.user)
+        return FavoriteListView.as_view()(request)
+
+    def test_repeat_loads_are_served_from_cache(self):
+        self.get()
+        self.get({'ids_only': '1'})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.get().data['items']), 1)
+            self.assertEqual(self.get({'ids_only': '1'}).data['items'], ["ITEM0"])
+
+    def test_m2m_changes_invalidate(self):
+        self.get({'ids_only': '1'})
+
+        self.favorite_list.charities.add(self.charity)
+
+        self.assertEqual(self.get({'ids_only': '1'}).data['charities'], [1234])
+
+    def test_batch_changes_invalidate(self):
+        self.get({'ids_only': '1'})
+        request = APIRequestFactory().post('/favorites/batch/', {"remove": {"items": ["ITEM0"]}}, format='json')
+        force_authenticate(request, user=self.user)
+
+        FavoriteBatchView.as_view()(request)
+
+        self.assertEqual(self.get({'ids_only': '1'}).data['items'], [])
+
+    def test_deleting_a_favorited_item_invalidates(self):
+        self.get()
+
+        deleteItems(Item.objects.filter(ebay_id="ITEM0"))
+
+        self.assertEqual(self.get().data['items'], [])
+
+    def test_unrelated_users_are_untouched(self):
+        other = User.objects.create_user(username="other", password="secret")
+        self.cache.set(favorites_cache.ids_key(other.id), {"items": ["X"], "charities": []})
+
+        deleteItems(Item.objects.filter(ebay_id="ITEM0"))
+
+        self.assertIsNotNone(self.cache.get(favorites_cache.ids_key(other.id)))
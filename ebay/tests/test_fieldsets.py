@@ -0,0 +1,131 @@
+import unittest
+from unittest.mock import patch
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from ebay import generations
+from ebay.fieldsets import requested_fields, model_columns, fieldset_key
+from ebay.generations import namespace
+from ebay.models import Charity, Item
+from ebay.serializers import CharitySerializer, ItemSerializer, ItemListSerializer
+from ebay.views.charity_views import EbayCharity
+from ebay.views.item_views import EbayCharityItems
+
+
+def request_with(params):
+    return Request(APIRequestFactory().get('/', params))
+
+
+class TestRequestedFields(unittest.TestCase):
+
+    def test_no_params_means_default_representation(self):
+        self.assertIsNone(requested_fields(request_with({}), ItemSerializer))
+
+    def test_fields_keep_serializer_order(self):
+        fields = requested_fields(request_with({'fields': 'price, name'}), ItemSerializer)
+
+        self.assertEqual(fields, ('name', 'price'))
+
+    def test_exclude_applies_to_default_fields(self):
+        fields = requested_fields(request_with({'exclude': 'web_url,condition'}), ItemSerializer,
+                                  default_fields=ItemListSerializer.Meta.fields)
+
+        self.assertEqual(fields, ('id', 'ebay_id', 'name', 'img_url', 'price', 'shipping_price', 'charity'))
+
+    def test_unknown_field_is_rejected(self):
+        with self.assertRaises(ValidationError):
+            requested_fields(request_with({'fields': 'name,password'}), ItemSerializer)
+
+    def test_prefixed_params(self):
+        fields = requested_fields(request_with({'charity_fields': 'name'}), CharitySerializer, prefix='charity_')
+
+        self.assertEqual(fields, ('name',))
+
+    def test_model_columns_always_keep_primary_key(self):
+        self.assertEqual(model_columns(Item, ('name', 'price')), ['id', 'name', 'price'])
+
+    def test_fieldset_key(self):
+        self.assertEqual(fieldset_key(None), '')
+        self.assertEqual(fieldset_key(('name',)), fieldset_key(('name',)))
+        self.assertNotEqual(fieldset_key(('name',)), fieldset_key(('price',)))
+
+
+class TestItemFieldsets(TestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory(HTTP_HOST='localhost')
+        self.view = EbayCharityItems.as_view()
+        charity = Charity.objects.create(id=1234, name="Test Charity", description="test charity")
+        Item.objects.create(ebay_id="ITEM1", name="Halo", price=5, web_url="https://ebay.com", charity=charity,
+                            seller={"username": "shop"})
+        self.cache_patcher = patch('ebay.views.item_views.cache')
+        self.mock_cache = self.cache_patcher.start()
+        self.mock_cache.get.return_value = None
+        self.count_cache_patcher = patch('ebay.counts.cache')
+        self.count_cache_patcher.start().get.return_value = None
+
+    def tearDown(self):
+        self.cache_patcher.stop()
+        self.count_cache_patcher.stop()
+
+    def test_search_projects_selected_fields(self):
+        with self.assertNumQueries(2):
+            response = self.view(self.factory.get('/items/search/halo', {'fields': 'name,seller'}),
+                                 search_text='halo')
+
+        self.assertEqual(response.data['results'], [{"name": "Halo", "seller": {"username": "shop"}}])
+        self.assertTrue(self.mock_cache.set.call_args[0][0].startswith('items_search_halo_p1_fs'))
+
+    def test_detail_projects_selected_fields(self):
+        response = self.view(self.factory.get('/items/ITEM1', {'fields': 'price'}), item_id='ITEM1')
+
+        self.assertEqual(response.data, {"price": "5.00"})
+        self.assertEqual(self.mock_cache.set.call_args[0][0], f"item_ITEM1{fieldset_key(('price',))}")
+
+    def test_unknown_field_returns_400(self):
+        response = self.view(self.factory.get('/items/ITEM1', {'fields': 'bogus'}), item_id='ITEM1')
+
+        self.assertEqual(response.status_code, 400)
+
+
+class TestCharityFieldsets(TestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.view = EbayCharity.as_view()
+        Charity.objects.create(id=1234, name="Test Charity", description="test charity")
+        self.cache_patcher = patch('ebay.views.charity_views.cache')
+        self.mock_cache = self.cache_patcher.start()
+        self.mock_cache.get.return_value = None
+        self.generations_patcher = patch.object(generations, 'cache', LocMemCache('generations', {}))
+        self.generations_patcher.start()
+
+    def tearDown(self):
+        self.cache_patcher.stop()
+        self.generations_patcher.stop()
+
+    def test_fieldset_is_cached_under_its_own_versioned_key(self):
+        response = self.view(self.factory.get('/charities/', {'fields': 'id,name'}))
+
+        self.assertEqual(response.data, [{"id": 1234, "name": "Test Charity"}])
+        key, _, _ = self.mock_cache.set.call_args[0]
+        self.assertEqual(key, f"charities_list{fieldset_key(('id', 'name'))}{namespace('charities')}")
+
+    def test_hidden_charities_are_not_listed(self):
+        Charity.objects.create(id=99, name="Leaving", description="being deleted", is_hidden=True)
+
+        response = self.view(self.factory.get('/charities/', {'fields': 'id'}))
+
+        self.assertEqual(response.data, [{"id": 1234}])
+
+    @patch('databasescripts.database_actions.Queue')
+    @patch('databasescripts.database_actions.get_redis')
+    def test_changes_invalidate_fieldset_variants(self, mock_get_redis, mock_queue):
+        before = namespace('charities')
+
+        self.view(self.factory.delete('/charities/1234'), charity_id=1234)
+
+        self.mock_cache.delete.assert_any_call('charities_list')
+        self.assertNotEqual(namespace('charities'), before)
@@ -0,0 +1,72 @@
+import datetime
+import json
+import unittest
+from decimal import Decimal
+from django.test import TestCase
+from ebay.fragments import card_fragments, detail_fragment, splice_results, store_fragments
+from ebay.models import Charity, Item
+from ebay.renderers import ORJSONRenderer
+from ebay.serializers import ItemSerializer, ItemListSerializer
+
+
+class TestSpliceResults(unittest.TestCase):
+
+    def test_results_are_appended_to_envelope(self):
+        body = splice_results({"count": 2, "next": None, "results": []}, [b'{"id":1}', b'{"id":2}'])
+
+        self.assertEqual(json.loads(body), {"count": 2, "next": None, "results": [{"id": 1}, {"id": 2}]})
+
+    def test_empty_envelope(self):
+        self.assertEqual(splice_results({}, []), b'{"results":[]}')
+
+
+class TestORJSONRenderer(unittest.TestCase):
+
+    def test_falls_back_to_drf_encoder(self):
+        self.assertEqual(ORJSONRenderer().render({"price": Decimal("1.50")}), b'{"price":1.5}')
+
+    def test_none_renders_empty_body(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+
+class TestFragments(TestCase):
+
+    def setUp(self):
+        charity = Charity.objects.create(id=1234, name="Test Charity", description="test charity")
+        self.item = Item.objects.create(ebay_id="ITEM1", name="Halo", price=5, web_url="https://ebay.com",
+                                        charity=charity, seller={"username": "shop"})
+
+    def test_fragments_match_serializer_output(self):
+        store_fragments([self.item])
+        self.item.refresh_from_db()
+
+        self.assertEqual(json.loads(self.item.card_json), json.loads(json.dumps(ItemListSerializer(self.item).data)))
+        detail = json.loads(json.dumps(ItemSerializer(self.item).data))
+        detail.pop('updated_at')
+        self.assertEqual(json.loads(self.item.detail_json), detail)
+        self.assertNotIn('card_json', json.loads(self.item.detail_json))
+
+    def test_detail_fragment_reads_updated_at_live(self):
+        detail_fragment("ITEM1")
+        Item.objects.filter(id=self.item.id).update(updated_at=datetime.datetime(2030, 1, 2, tzinfo=datetime.timezone.utc))
+
+        body = json.loads(detail_fragment("ITEM1"))
+
+        self.assertEqual(body['updated_at'], ItemSerializer(Item.objects.get(id=self.item.id)).data['updated_at'])
+        self.assertTrue(body['updated_at'].startswith('2030-01-02'))
+
+    def test_detail_fragment_is_rendered_on_first_read(self):
+        body = detail_fragment("ITEM1")
+
+        self.assertEqual(json.loads(body)['seller'], {"username": "shop"})
+        self.assertIsNotNone(Item.objects.get(id=self.item.id).detail_json)
+
+    def test_detail_fragment_missing_item(self):
+        self.assertIsNone(detail_fragment("MISSING"))
+
+    def test_card_fragments_read_stored_json(self):
+        Item.objects.filter(id=self.item.id).update(card_json='{"id":1,"name":"stored"}')
+        rows = list(Item.objects.only('id', 'card_json'))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(card_fragments(rows), [b'{"id":1,"name":"stored"}'])
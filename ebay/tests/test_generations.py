@@ -0,0 +1,106 @@
+import json
+from unittest.mock import patch
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIRequestFactory
+from ebay import generations
+from ebay.generations import GLOBAL_SCOPE, bump_once, category_scope, charity_scope, is_current, namespace, stamp
+from ebay.models import Charity, Item
+from ebay.views.item_views import EbayCharityItems
+from databasescripts.database_actions import deleteItems
+
+
+class GenerationsCacheMixin:
+
+    def setUp(self):
+        cache_patcher = patch.object(generations, 'cache', LocMemCache('generations', {}))
+        self.cache = cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+
+
+class TestGenerations(GenerationsCacheMixin, SimpleTestCase):
+
+    def test_bump_only_changes_that_scope(self):
+        books, charity = namespace(category_scope('Books')), namespace(charity_scope(1))
+
+        generations.bump([category_scope('Books')])
+
+        self.assertNotEqual(namespace(category_scope('Books')), books)
+        self.assertEqual(namespace(charity_scope(1)), charity)
+
+    def test_stamp_goes_stale_after_bump(self):
+        stamped = stamp(charity_scope(1))
+        self.assertTrue(is_current(stamped))
+
+        generations.bump([charity_scope(1)])
+
+        self.assertFalse(is_current(stamped))
+
+    def test_counters_do_not_restart_after_flush(self):
+        before = namespace(GLOBAL_SCOPE)
+        self.cache.clear()
+
+        self.assertNotEqual(namespace(GLOBAL_SCOPE), before)
+
+    def test_unavailable_cache_falls_back_to_unversioned_keys(self):
+        with patch.object(self.cache, 'get_many', side_effect=ConnectionError):
+            self.assertEqual(namespace(GLOBAL_SCOPE), '')
+            self.assertIsNone(stamp(charity_scope(1)))
+            self.assertTrue(is_current(((charity_scope(1), 1),)))
+
+    def test_item_scopes(self):
+        rows = [{'charity_id': 7, 'category_list': [{'categoryName': 'Books'}, {'categoryName': 'Comics'}]}]
+
+        self.assertEqual(generations.item_scopes(rows),
+                         {GLOBAL_SCOPE, charity_scope(7), category_scope('Books'), category_scope('Comics')})
+
+
+class TestItemChangesBumpGenerations(GenerationsCacheMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.charity = Charity.objects.create(id=1234, name="Test Charity", description="test charity")
+        self.other = Charity.objects.create(id=5678, name="Other Charity", description="other charity")
+        self.item = Item.objects.create(ebay_id="ITEM1", name="Halo", price=5, web_url="https://ebay.com",
+                                        charity=self.charity, category_list=[{"categoryName": "Books"}])
+
+    def test_delete_leaves_unrelated_generations_alone(self):
+        scopes = [GLOBAL_SCOPE, charity_scope(1234), category_scope('Books'),
+                  charity_scope(5678), category_scope('Games')]
+        before = {scope: namespace(scope) for scope in scopes}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            deleteItems(Item.objects.filter(id=self.item.id))
+
+        changed = {scope for scope in scopes if namespace(scope) != before[scope]}
+        self.assertEqual(changed, {GLOBAL_SCOPE, charity_scope(1234), category_scope('Books')})
+
+    def test_bump_once_bumps_after_the_last_batch(self):
+        before = namespace(GLOBAL_SCOPE)
+
+        with patch.object(generations, 'bump', wraps=generations.bump) as mock_bump, bump_once():
+            for batch in range(3):
+                with self.captureOnCommitCallbacks(execute=True):
+                    Item.objects.filter(id=self.item.id).update(name=f"Halo {batch}")
+                    generations.items_changed([self.item])
+            self.assertEqual(namespace(GLOBAL_SCOPE), before)
+
+        mock_bump.assert_called_once()
+        self.assertEqual(mock_bump.call_args[0][0], {GLOBAL_SCOPE, charity_scope(1234), category_scope('Books')})
+        self.assertNotEqual(namespace(GLOBAL_SCOPE), before)
+
+    @patch('ebay.views.item_views.cache', new_callable=lambda: LocMemCache('pages', {}))
+    def test_cached_detail_page_is_dropped_when_its_charity_changes(self, mock_cache):
+        view = EbayCharityItems.as_view()
+        factory = APIRequestFactory()
+
+        view(factory.get('/items/ITEM1'), item_id='ITEM1')
+        Item.objects.filter(id=self.item.id).update(detail_json=json.dumps({"name": "stale"}))
+        cached = view(factory.get('/items/ITEM1'), item_id='ITEM1')
+        self.assertEqual(json.loads(cached.content)['name'], 'Halo')
+
+        generations.bump([charity_scope(5678)])
+        self.assertEqual(json.loads(view(factory.get('/items/ITEM1'), item_id='ITEM1').content)['name'], 'Halo')
+
+        generations.bump([charity_scope(1234)])
+        self.assertEqual(json.loads(view(factory.get('/items/ITEM1'), item_id='ITEM1').content)['name'], 'stale')
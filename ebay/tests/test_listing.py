@@ -0,0 +1,147 @@
+import json
+import unittest
+from urllib.parse import parse_qs, urlparse
+from decimal import Decimal
+from unittest.mock import patch
+from django.test import TestCase
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from ebay.listing import listing_options
+from ebay.locations import bounding_box, extract_location
+from ebay.models import Charity, Item
+from ebay.views.item_views import EbayCharityItems
+
+
+def options_for(params):
+    return listing_options(Request(APIRequestFactory().get('/items/category/Books', params)))
+
+
+class TestListingOptions(unittest.TestCase):
+
+    def test_no_params_is_default_with_empty_cache_key(self):
+        options = options_for({})
+
+        self.assertTrue(options.is_default())
+        self.assertEqual(options.cache_key(), '')
+        self.assertEqual(options.keyset_order(), ('id', True))
+        self.assertEqual(options.keyset_order('search_rank'), ('search_rank', False))
+        self.assertEqual(options_for({'sort': 'price_asc'}).keyset_order('search_rank'), ('price', False))
+
+    def test_params_become_filters_and_cache_key(self):
+        options = options_for({'min_price': '5', 'max_price': '20', 'condition': 'used',
+                               'free_shipping': 'true', 'sort': 'price_asc'})
+
+        self.assertEqual(options.filters()['price__gte'], Decimal('5'))
+        self.assertEqual(options.filters()['price__lte'], Decimal('20'))
+        self.assertEqual(options.filters()['shipping_price'], 0)
+        self.assertIn('Pre-owned', options.filters()['condition__in'])
+        self.assertEqual(options.ordering(), ['price', 'id'])
+        self.assertEqual(options.cache_key(), '_sprice_asc_min5_max20_cUsed_fs')
+
+    def test_invalid_params_are_rejected(self):
+        for params in ({'min_price': 'abc'}, {'max_price': '-1'}, {'min_price': 'NaN'},
+                       {'min_price': '10', 'max_price': '5'}, {'condition': 'Mint'}, {'sort': 'name'}):
+            with self.subTest(params=params), self.assertRaises(ValidationError):
+                options_for(params)
+
+
+class TestLocations(unittest.TestCase):
+
+    def test_extract_location_masks_postal_code_and_reads_coordinates(self):
+        location = extract_location({"postalCode": "945**", "country": "us", "latitude": "37.8", "longitude": -122.3})
+
+        self.assertEqual(location, {"location_country": "US", "location_postal_prefix": "945",
+                                    "latitude": 37.8, "longitude": -122.3})
+
+    def test_extract_location_ignores_missing_or_bad_values(self):
+        self.assertEqual(extract_location(None)["location_country"], None)
+        location = extract_location({"postalCode": "9*", "country": "USA", "latitude": 95, "longitude": 10})
+        self.assertEqual(set(location.values()), {None})
+
+    def test_bounding_box_widens_longitude_away_from_equator(self):
+        min_lat, max_lat, min_lng, max_lng = bounding_box(60, 10, 111.32)
+
+        self.assertAlmostEqual(max_lat - min_lat, 2)
+        self.assertAlmostEqual(max_lng - min_lng, 4)
+
+    def test_distance_sort_requires_near(self):
+        with self.assertRaises(ValidationError):
+            options_for({'sort': 'distance'})
+
+
+@patch('ebay.views.item_views.cache')
+class TestListingEndpoint(TestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory(HTTP_HOST='localhost')
+        self.view = EbayCharityItems.as_view()
+        charity = Charity.objects.create(id=1234, name="Test Charity", description="test charity")
+        for ebay_id, price, shipping, condition, location in (
+                ("A", 30, 0, "New", {"country": "US", "postalCode": "941**", "latitude": 37.77, "longitude": -122.42}),
+                ("B", 10, 5, "Used", {"country": "US", "postalCode": "100**", "latitude": 40.71, "longitude": -74.0}),
+                ("C", 20, 0, "Pre-owned", {"country": "US", "postalCode": "946**", "latitude": 37.8, "longitude": -122.27}),
+                ("D", 40, 0, "Used", {"country": "GB", "postalCode": "SW1A"})):
+            Item.objects.create(ebay_id=ebay_id, name=ebay_id, price=price, shipping_price=shipping,
+                                condition=condition, item_location=location, web_url="https://ebay.com",
+                                charity=charity)
+        patcher = patch('ebay.views.item_views.getItemsBySubCategory', side_effect=lambda category: Item.objects.all())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, params):
+        response = self.view(self.factory.get('/items/category/Books', params), category_id='Books')
+        if hasattr(response, 'render'):
+            response.render()
+        return response, json.loads(response.content)
+
+    def test_filters_and_sort_are_applied(self, mock_cache):
+        mock_cache.get.return_value = None
+
+        response, body = self.get({'condition': 'Used', 'free_shipping': '1', 'sort': 'price_desc'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body['count'], 2)
+        self.assertEqual([result['ebay_id'] for result in body['results']], ["D", "C"])
+        self.assertEqual(mock_cache.set.call_args[0][0], 'items_cat_Books_sprice_desc_cUsed_fs_p1')
+
+    def test_price_range_with_cursor_pagination(self, mock_cache):
+        mock_cache.get.return_value = None
+
+        response, body = self.get({'min_price': '15', 'max_price': '35', 'sort': 'price_asc', 'cursor': ''})
+
+        self.assertEqual([result['ebay_id'] for result in body['results']], ["C", "A"])
+
+    def test_country_and_postal_code_filters(self, mock_cache):
+        mock_cache.get.return_value = None
+
+        _, body = self.get({'country': 'us', 'postal_code': '94105'})
+
+        self.assertEqual([result['ebay_id'] for result in body['results']], ["A"])
+        self.assertEqual(mock_cache.set.call_args[0][0], 'items_cat_Books_coUS_pc941_p1')
+
+    def test_near_filters_by_radius_and_sorts_by_distance(self, mock_cache):
+        mock_cache.get.return_value = None
+
+        _, body = self.get({'near': '37.79,-122.28', 'radius': '30', 'sort': 'distance'})
+
+        self.assertEqual(body['count'], 2)
+        self.assertEqual([result['ebay_id'] for result in body['results']], ["C", "A"])
+
+    def test_distance_sort_with_cursor_pagination(self, mock_cache):
+        mock_cache.get.return_value = None
+
+        with patch('ebay.views.item_views.KeysetPagination.page_size', 1):
+            _, first = self.get({'near': '37.79,-122.28', 'sort': 'distance', 'cursor': ''})
+            cursor = parse_qs(urlparse(first['next']).query)['cursor'][0]
+            _, second = self.get({'near': '37.79,-122.28', 'sort': 'distance', 'cursor': cursor})
+
+        self.assertEqual([result['ebay_id'] for result in first['results'] + second['results']], ["C", "A"])
+
+    def test_invalid_sort_is_a_bad_request(self, mock_cache):
+        mock_cache.get.return_value = None
+
+        response = self.view(self.factory.get('/items/category/Books', {'sort': 'name'}), category_id='Books')
+
+        self.assertEqual(response.status_code, 400)
+        mock_cache.set.assert_not_called()
@@ -1,6 +1,7 @@
-from ..load_data_to_db import DatabaseLoader, WORD_FILTER
+from ..load_data_to_db import DatabaseLoader, WORD_FILTER, STAGING_COLUMNS
 import unittest
 from unittest.mock import patch, Mock
+from django.test import TestCase
 
 class TestDatabaseLoaderInit(unittest.TestCase):
 
@@ -174,6 +175,15 @@ class TestProcessItem(unittest.TestCase):
         result = self.method(self.sample_item)   
         self.assertEqual(result["item_location"], {"city": "New York", "country": "US"})
 
+    def test_drops_unused_json_keys(self):
+        self.sample_item["seller"] = {"username": "seller123", "feedbackScore": 10, "sellerAccountType": "BUSINESS"}
+        self.sample_item["categories"][0]["categoryTreeNodeLevel"] = 1
+
+        result = self.method(self.sample_item)
+
+        self.assertEqual(result["seller"], {"username": "seller123", "feedbackScore": 10})
+        self.assertEqual(result["category_list"][0], {"categoryId": "1", "categoryName": "Books"})
+
 class TestGetExistingEbayIds(unittest.TestCase):
 
     @patch('ebay.load_data_to_db.EbayClient')
@@ -279,7 +289,8 @@ class TestSaveItemsBatch(unittest.TestCase):
         
         self.method([{"ebay_id": "id1"}])
         
-        mock_transaction.atomic.assert_called_once()
+        # the batch, plus a savepoint around each save
+        self.assertEqual(mock_transaction.atomic.call_count, 2)
 
 class TestLoadItemsToDb(unittest.TestCase):
 
@@ -532,4 +543,164 @@ class TestIntegration(unittest.TestCase):
         self.assertEqual(result, "success")
         self.assertEqual(loader.items_processed, 3)
         self.assertEqual(loader.items_skipped, 2)
-        self.assertEqual(mock_serializer.save.call_count, 1)
\ No newline at end of file
+        self.assertEqual(mock_serializer.save.call_count, 1)
+
+class TestBootstrapLoader(unittest.TestCase):
+
+    @patch('ebay.load_data_to_db.EbayClient')
+    def setUp(self, mock_client_class):
+        self.mock_client = Mock()
+        mock_client_class.return_value = self.mock_client
+        self.loader = DatabaseLoader(7)
+
+    @patch('ebay.load_data_to_db.connection')
+    def test_bootstrap_needs_postgres(self, mock_connection):
+        mock_connection.vendor = 'sqlite'
+        self.loader.bootstrap = True
+
+        self.assertFalse(self.loader.use_bootstrap())
+
+    @patch('ebay.models.Item')
+    @patch('ebay.load_data_to_db.connection')
+    def test_bootstrap_is_automatic_on_first_load(self, mock_connection, mock_item):
+        mock_connection.vendor = 'postgresql'
+        mock_item.objects.filter.return_value.exists.return_value = False
+
+        self.assertTrue(self.loader.use_bootstrap())
+        mock_item.objects.filter.assert_called_once_with(charity_id=7)
+
+        mock_item.objects.filter.return_value.exists.return_value = True
+        self.assertFalse(self.loader.use_bootstrap())
+
+    @patch('ebay.serializers.ItemSerializer')
+    def test_staging_row_serializes_json_and_location(self, mock_serializer_class):
+        mock_serializer_class.return_value.is_valid.return_value = True
+        mock_serializer_class.return_value.validated_data = {
+            "ebay_id": "v1|1|0", "name": "Lamp", "price": 5, "web_url": "https://ebay.com", "charity": Mock(id=7),
+            "category_list": [{"categoryName": "Home"}], "item_location": {"country": "US", "postalCode": "945**"},
+        }
+
+        row = dict(zip(STAGING_COLUMNS, self.loader._DatabaseLoader__staging_row({"ebay_id": "v1|1|0"})))
+
+        self.assertEqual(row['charity_id'], 7)
+        self.assertEqual(row['category_list'], '[{"categoryName": "Home"}]')
+        self.assertEqual((row['location_country'], row['location_postal_prefix']), ("US", "945"))
+        self.assertIsNone(row['seller'])
+
+    @patch.object(DatabaseLoader, '_DatabaseLoader__after_merge')
+    @patch('ebay.load_data_to_db.record_items_added')
+    @patch('ebay.models.Item')
+    @patch('ebay.load_data_to_db.transaction')
+    @patch('ebay.load_data_to_db.connection')
+    def test_merge_copies_rows_then_inserts_on_conflict(self, mock_connection, mock_transaction, mock_item,
+                                                        mock_record, mock_after_merge):
+        mock_item._meta.db_table = 'ebay_item'
+        cursor = mock_connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [(11,), (12,)]
+        copy = cursor.copy.return_value.__enter__.return_value
+        self.loader.staged_rows = [["a"], ["b"]]
+
+        item_ids = self.loader._DatabaseLoader__merge_staged_items()
+
+        self.assertEqual(item_ids, [11, 12])
+        self.assertEqual(copy.write_row.call_count, 2)
+        self.assertIn("COPY ebay_item_staging", cursor.copy.call_args[0][0])
+        self.assertIn("ON CONFLICT (ebay_id) DO NOTHING", cursor.execute.call_args_list[-1][0][0])
+        self.assertEqual(self.loader.staged_rows, [])
+        mock_after_merge.assert_called_once_with([11, 12])
+
+    @patch('ebay.load_data_to_db.close_old_connections')
+    @patch('ebay.load_data_to_db.connection')
+    def test_load_stages_pages_and_merges_once(self, mock_connection, mock_close):
+        self.mock_client.getItems.return_value = {"itemSummaries": [{"itemId": "1"}, {"itemId": "2"}]}
+
+        with patch.object(DatabaseLoader, 'use_bootstrap', return_value=True), \
+                patch.object(DatabaseLoader, '_DatabaseLoader__get_existing_ebay_ids', return_value=set()), \
+                patch.object(DatabaseLoader, '_DatabaseLoader__process_item', side_effect=lambda item: item), \
+                patch.object(DatabaseLoader, '_DatabaseLoader__stage_items', return_value=2) as mock_stage, \
+                patch.object(DatabaseLoader, '_DatabaseLoader__save_items_batch') as mock_save, \
+                patch.object(DatabaseLoader, '_DatabaseLoader__merge_staged_items', return_value=[1, 2]):
+            result = self.loader.load_items_to_db()
+
+        self.assertEqual(result, "success")
+        mock_stage.assert_called_once()
+        mock_save.assert_not_called()
+        self.assertEqual(self.loader.items_saved, 2)
+
+    @patch('ebay.load_data_to_db.time.sleep')
+    @patch('ebay.load_data_to_db.close_old_connections')
+    @patch('ebay.load_data_to_db.connection')
+    def test_failed_load_merges_rows_already_staged(self, mock_connection, mock_close, mock_sleep):
+        self.mock_client.getItems.side_effect = [
+            {"itemSummaries": [{"itemId": "1"}], "next": "page2"},
+            ConnectionError("connection reset"),
+        ]
+
+        def stage(items):
+            self.loader.staged_rows.extend(items)
+            return len(items)
+
+        with patch.object(DatabaseLoader, 'use_bootstrap', return_value=True), \
+                patch.object(DatabaseLoader, '_DatabaseLoader__get_existing_ebay_ids', return_value=set()), \
+                patch.object(DatabaseLoader, '_DatabaseLoader__process_item', side_effect=lambda item: item), \
+                patch.object(DatabaseLoader, '_DatabaseLoader__stage_items', side_effect=stage), \
+                patch.object(DatabaseLoader, '_DatabaseLoader__merge_staged_items', return_value=[1]) as mock_merge:
+            result = self.loader.load_items_to_db()
+
+        self.assertEqual(result, "connection reset")
+        mock_merge.assert_called_once()
+        self.assertEqual(self.loader.items_saved, 1)
+
+
+class TestItemValidation(TestCase):
+
+    def test_validating_an_item_does_not_query_ebay_id_uniqueness(self):
+        from ebay.models import Charity
+        from ebay.serializers import ItemSerializer
+
+        Charity.objects.create(id=7, name="Test Charity", description="test charity")
+        serializer = ItemSerializer(data={"ebay_id": "v1|1|0", "name": "Lamp", "price": "5.00",
+                                          "web_url": "https://ebay.com", "charity": 7})
+
+        # only the charity lookup
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+
+
+def summary(item_id):
+    return {"itemId": item_id, "title": f"Lamp {item_id}", "price": {"value": "5.00"},
+            "itemWebUrl": "https://ebay.com", "categories": [{"categoryName": "Home"}, {"categoryName": "Lamps"}]}
+
+
+class TestDuplicateListings(TestCase):
+
+    def setUp(self):
+        from ebay.models import Charity
+
+        Charity.objects.create(id=7, name="Test Charity", description="test charity")
+
+    @patch('ebay.load_data_to_db.EbayClient')
+    def test_item_listed_twice_in_a_page_is_saved_once(self, mock_client):
+        from ebay.models import Item
+
+        mock_client.return_value.getItems.return_value = {"itemSummaries": [summary("A"), summary("B"), summary("A")]}
+
+        result = DatabaseLoader(7).load_items_to_db()
+
+        self.assertEqual(result, "success")
+        self.assertEqual(sorted(Item.objects.values_list('ebay_id', flat=True)), ["A", "B"])
+
+    @patch('ebay.load_data_to_db.EbayClient')
+    def test_item_saved_by_a_concurrent_load_is_skipped(self, mock_client):
+        from ebay.models import Item
+
+        Item.objects.create(ebay_id="A", name="Lamp A", price=5, web_url="https://ebay.com", charity_id=7)
+        mock_client.return_value.getItems.return_value = {"itemSummaries": [summary("A"), summary("B")]}
+
+        with patch.object(DatabaseLoader, '_DatabaseLoader__get_existing_ebay_ids', return_value=set()):
+            loader = DatabaseLoader(7)
+            result = loader.load_items_to_db()
+
+        self.assertEqual(result, "success")
+        self.assertEqual(loader.items_saved, 1)
+        self.assertEqual(sorted(Item.objects.values_list('ebay_id', flat=True)), ["A", "B"])
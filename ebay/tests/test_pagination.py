@@ -0,0 +1,206 @@
+import json
+import time
+import unittest
+from unittest.mock import ANY, patch
+from django.test import TestCase
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from ebay.models import Charity, Item
+from ebay.search import RANK_FIELD, index_search
+from ebay.pagination import KeysetPagination, ItemPageNumberPagination, wants_cursor_pagination
+from ebay.views.item_views import EbayCharityItems
+
+
+def cursor_from(link):
+    return link.split('cursor=')[1]
+
+
+class TestKeysetPagination(TestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory(HTTP_HOST='localhost')
+        self.charity = Charity.objects.create(id=1234, name="Test Charity", description="test charity")
+        prices = [5, 1, 3, 3, 3, 9, 7]
+        self.items = [
+            Item.objects.create(ebay_id=f"ITEM{index}", name=f"Item {index}", price=price,
+                                web_url="https://ebay.com", charity=self.charity)
+            for index, price in enumerate(prices)
+        ]
+
+    def paginate(self, paginator, params=None):
+        request = Request(self.factory.get('/items/', params or {}))
+        rows = paginator.paginate_queryset(Item.objects.all(), request)
+        return [row.ebay_id for row in rows], paginator
+
+    def walk(self, make_paginator):
+        seen = []
+        rows, paginator = self.paginate(make_paginator())
+        seen += rows
+        while paginator.get_next_link():
+            rows, paginator = self.paginate(make_paginator(), {'cursor': cursor_from(paginator.get_next_link())})
+            seen += rows
+        return seen, paginator
+
+    def small_paginator(self, **kwargs):
+        paginator = KeysetPagination(**kwargs)
+        paginator.page_size = 3
+        return paginator
+
+    def test_first_page_is_newest_by_default(self):
+        rows, paginator = self.paginate(self.small_paginator())
+
+        self.assertEqual(rows, ["ITEM6", "ITEM5", "ITEM4"])
+        self.assertIsNotNone(paginator.get_next_link())
+        self.assertIsNone(paginator.get_previous_link())
+
+    def test_walks_every_item_exactly_once(self):
+        seen, paginator = self.walk(self.small_paginator)
+
+        self.assertEqual(seen, [f"ITEM{index}" for index in range(6, -1, -1)])
+        self.assertIsNone(paginator.get_next_link())
+
+    def test_ties_on_sort_field_are_broken_by_id(self):
+        seen, _ = self.walk(lambda: self.small_paginator(sort_field='price', descending=False))
+
+        self.assertEqual(seen, ["ITEM1", "ITEM2", "ITEM3", "ITEM4", "ITEM0", "ITEM6", "ITEM5"])
+
+    @patch('ebay.search.search_index.search_item_ids')
+    def test_ranked_search_pages_keep_relevance_order(self, mock_search_item_ids):
+        ranked = [self.items[index].id for index in (2, 6, 0, 4, 1)]
+        mock_search_item_ids.return_value = ranked
+        seen = []
+        params = {}
+        while True:
+            paginator = self.small_paginator(sort_field=RANK_FIELD, descending=False)
+            request = Request(self.factory.get('/items/', params))
+            seen += [row.id for row in paginator.paginate_queryset(index_search(Item.objects.all(), "item"), request)]
+            if not paginator.get_next_link():
+                break
+            params = {'cursor': cursor_from(paginator.get_next_link())}
+
+        self.assertEqual(seen, ranked)
+
+    def test_previous_link_returns_previous_page(self):
+        first, paginator = self.paginate(self.small_paginator(sort_field='price', descending=False))
+        second, paginator = self.paginate(
+            self.small_paginator(sort_field='price', descending=False),
+            {'cursor': cursor_from(paginator.get_next_link())}
+        )
+        back, paginator = self.paginate(
+            self.small_paginator(sort_field='price', descending=False),
+            {'cursor': cursor_from(paginator.get_previous_link())}
+        )
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(back, first)
+        self.assertIsNone(paginator.get_previous_link())
+
+    def test_invalid_cursor_raises_not_found(self):
+        with self.assertRaises(NotFound):
+            self.paginate(self.small_paginator(), {'cursor': 'not-a-cursor'})
+
+    def test_next_link_drops_page_param(self):
+        _, paginator = self.paginate(self.small_paginator(), {'page': 3, 'pagination': 'cursor'})
+
+        self.assertNotIn('page=3', paginator.get_next_link())
+        self.assertIn('pagination=cursor', paginator.get_next_link())
+
+    def test_response_has_no_count(self):
+        _, paginator = self.paginate(self.small_paginator())
+
+        response = paginator.get_paginated_response([])
+
+        self.assertEqual(set(response.data.keys()), {'next', 'previous', 'results'})
+
+
+class TestWantsCursorPagination(unittest.TestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def test_page_number_is_default(self):
+        self.assertFalse(wants_cursor_pagination(Request(self.factory.get('/items/', {'page': 2}))))
+
+    def test_pagination_param_opts_in(self):
+        self.assertTrue(wants_cursor_pagination(Request(self.factory.get('/items/', {'pagination': 'cursor'}))))
+
+    def test_cursor_param_opts_in(self):
+        self.assertTrue(wants_cursor_pagination(Request(self.factory.get('/items/', {'cursor': 'abc'}))))
+
+
+class TestEbayCharityItemsPagination(unittest.TestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.view = EbayCharityItems.as_view()
+        self.cache_patcher = patch('ebay.views.item_views.cache')
+        self.mock_cache = self.cache_patcher.start()
+        self.mock_cache.get.return_value = None
+
+    def tearDown(self):
+        self.cache_patcher.stop()
+
+    @patch('ebay.views.item_views.card_fragments', return_value=[])
+    @patch('ebay.views.item_views.search')
+    @patch('ebay.views.item_views.KeysetPagination')
+    def test_cursor_mode_uses_keyset_paginator_and_cursor_cache_key(self, mock_keyset, mock_search, mock_fragments):
+        mock_keyset.return_value.cache_key.return_value = 'cabc'
+        mock_keyset.return_value.get_paginated_response.return_value = Response({'results': []})
+
+        self.view(self.factory.get('/items/search/halo', {'cursor': 'abc'}), search_text='halo')
+
+        mock_keyset.return_value.paginate_queryset.assert_called_once()
+        self.mock_cache.set.assert_called_once_with('items_search_halo_cabc', (ANY, b'{"results":[]}'), 60 * 60)
+
+    @patch('ebay.views.item_views.card_fragments', return_value=[b'{"id":1}'])
+    @patch('ebay.views.item_views.getItemsBySubCategory')
+    def test_page_number_mode_keeps_existing_cache_key(self, mock_get_items, mock_fragments):
+        with patch.object(ItemPageNumberPagination, 'paginate_queryset', return_value=[]), \
+                patch.object(ItemPageNumberPagination, 'get_paginated_response',
+                             return_value=Response({'count': 0})):
+            self.view(self.factory.get('/items/category/Books', {'page': 2}), category_id='Books')
+
+        self.mock_cache.set.assert_called_once_with(
+            'items_cat_Books_p2', (ANY, b'{"count":0,"results":[{"id":1}]}'), 60 * 1440 * 2
+        )
+
+    def test_cached_fragment_page_is_returned_as_is(self):
+        self.mock_cache.get.return_value = (time.time() + 60, b'{"count":0,"results":[]}')
+
+        response = self.view(self.factory.get('/items/category/Books'), category_id='Books')
+
+        self.assertEqual(response.content, b'{"count":0,"results":[]}')
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+
+class TestItemListRepresentation(TestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory(HTTP_HOST='localhost')
+        self.view = EbayCharityItems.as_view()
+        charity = Charity.objects.create(id=1234, name="Test Charity", description="test charity")
+        Item.objects.create(ebay_id="ITEM1", name="Halo", price=5, web_url="https://ebay.com", charity=charity,
+                            seller={"username": "shop"}, item_location={"country": "US"},
+                            category_list=[{"categoryId": "1", "categoryName": "Games"}],
+                            additional_images={"additionalImages": [{"imageUrl": "https://img"}]})
+
+    @patch('ebay.views.item_views.cache')
+    def test_search_results_omit_detail_blobs(self, mock_cache):
+        mock_cache.get.return_value = None
+
+        response = self.view(self.factory.get('/items/search/halo'), search_text='halo')
+
+        result = json.loads(response.content)['results'][0]
+        self.assertEqual(result['ebay_id'], "ITEM1")
+        for field in ('seller', 'item_location', 'category_list', 'additional_images'):
+            self.assertNotIn(field, result)
+
+    @patch('ebay.views.item_views.cache')
+    def test_detail_keeps_full_representation(self, mock_cache):
+        mock_cache.get.return_value = None
+
+        response = self.view(self.factory.get('/items/ITEM1'), item_id='ITEM1')
+
+        self.assertEqual(json.loads(response.content)['seller'], {"username": "shop"})
@@ -0,0 +1,39 @@
+import unittest
+from types import SimpleNamespace
+from django.db import connection
+from django.test import TestCase
+from ebay.models import Charity, Item
+from ebay.projection import item_storage_stats, project_categories, project_item, project_location
+
+
+class TestProjection(unittest.TestCase):
+
+    def test_location_keeps_known_keys_and_drops_empty_values(self):
+        self.assertEqual(project_location({"country": "US", "postalCode": "", "addressLine1": "1 Main St"}),
+                         {"country": "US"})
+        self.assertIsNone(project_location({"addressLine1": "1 Main St"}))
+
+    def test_categories_skip_non_dict_entries(self):
+        self.assertEqual(project_categories([{"categoryId": "1", "categoryName": "Books", "level": 2}, "junk"]),
+                         [{"categoryId": "1", "categoryName": "Books"}])
+
+    def test_project_item_reports_whether_anything_changed(self):
+        item = SimpleNamespace(seller={"username": "u", "sellerAccountType": "B"}, item_location=None,
+                               category_list=[{"categoryId": "1", "categoryName": "Books"}])
+
+        self.assertTrue(project_item(item))
+        self.assertEqual(item.seller, {"username": "u"})
+        self.assertFalse(project_item(item))
+
+
+class TestItemStorageStats(TestCase):
+
+    def test_reports_rows_and_average_column_sizes(self):
+        charity = Charity.objects.create(id=1, name="Charity", description="d")
+        Item.objects.create(ebay_id="A", name="A", price=1, web_url="https://ebay.com", charity=charity,
+                            seller={"username": "u"})
+
+        stats = item_storage_stats(connection)
+
+        self.assertEqual(stats['rows'], 1)
+        self.assertGreater(stats['avg_seller_bytes'], 0)
@@ -0,0 +1,167 @@
+import unittest
+from decimal import Decimal
+from unittest.mock import patch
+from ..query_parser import ParsedQuery, parse_query, stem
+from ..constants import CONDITION_GROUPS
+from ..search import search
+
+
+class TestParseQuery(unittest.TestCase):
+
+    def test_plain_text_is_left_untouched(self):
+        self.assertEqual(parse_query("halo reach"), ParsedQuery(text="halo reach"))
+
+    def test_exact_filter_option(self):
+        self.assertEqual(parse_query("Xbox Games"), ParsedQuery(category="Xbox Games"))
+
+    def test_filter_option_with_extra_words(self):
+        parsed = parse_query("xbox games cheap")
+
+        self.assertEqual(parsed.category, "Xbox Games")
+        self.assertEqual(parsed.max_price, Decimal(10))
+        self.assertEqual(parsed.text, "")
+
+    def test_singular_phrase_and_condition(self):
+        parsed = parse_query("used nintendo console")
+
+        self.assertEqual(parsed.category, "Nintendo Consoles")
+        self.assertEqual(parsed.condition, "Used")
+        self.assertEqual(parsed.text, "")
+
+    def test_residual_text_is_kept(self):
+        parsed = parse_query("harry potter books")
+
+        self.assertEqual(parsed.category, "Books")
+        self.assertEqual(parsed.text, "harry potter")
+
+    def test_stop_words_dropped_once_something_is_recognised(self):
+        parsed = parse_query("lego star wars for the kids under $30")
+
+        self.assertEqual(parsed.category, "Star Wars")
+        self.assertEqual(parsed.max_price, Decimal(30))
+        self.assertEqual(parsed.text, "lego kids")
+
+    def test_longest_phrase_wins(self):
+        self.assertEqual(parse_query("men's clothing").category, "Men's Clothing")
+
+    def test_multi_word_condition(self):
+        parsed = parse_query("open box headsets")
+
+        self.assertEqual(parsed.condition, "Open box")
+        self.assertEqual(parsed.category, "Headsets")
+
+    def test_bare_new_is_part_of_the_text(self):
+        parsed = parse_query("new balance shoes")
+
+        self.assertIsNone(parsed.condition)
+        self.assertEqual(parsed.text, "new balance shoes")
+
+    def test_explicit_new_condition(self):
+        self.assertEqual(parse_query("brand new lego").condition, "New")
+        self.assertEqual(parse_query("condition:new lego"), ParsedQuery(text="lego", condition="New"))
+        self.assertEqual(parse_query("condition:open box headsets").condition, "Open box")
+
+    def test_under_price(self):
+        parsed = parse_query("zelda under 20")
+
+        self.assertEqual(parsed.max_price, Decimal(20))
+        self.assertEqual(parsed.text, "zelda")
+
+    def test_over_price(self):
+        self.assertEqual(parse_query("watches over $100.50").min_price, Decimal("100.50"))
+
+    def test_price_range(self):
+        parsed = parse_query("rings $10-$30")
+
+        self.assertEqual((parsed.min_price, parsed.max_price), (Decimal(10), Decimal(30)))
+        self.assertEqual(parsed.category, "Rings")
+
+    def test_between_range_is_sorted(self):
+        parsed = parse_query("puzzles between 40 and 15")
+
+        self.assertEqual((parsed.min_price, parsed.max_price), (Decimal(15), Decimal(40)))
+
+    def test_explicit_price_beats_cheap(self):
+        self.assertEqual(parse_query("cheap comics under 5").max_price, Decimal(5))
+
+    def test_free_shipping(self):
+        parsed = parse_query("dvd free shipping")
+
+        self.assertTrue(parsed.free_shipping)
+        self.assertEqual(parsed.category, "DVD")
+
+    def test_ambiguous_price_words_in_titles_are_not_prices(self):
+        for query in ("iphone 12 max 128gb", "star wars over 9000", "funko pop up to 5", "nintendo 3ds min 2"):
+            parsed = parse_query(query)
+            self.assertEqual((parsed.min_price, parsed.max_price), (None, None), query)
+            self.assertTrue(parsed.text.endswith(query.split()[-1]), query)
+
+    def test_ambiguous_price_words_with_dollar_sign(self):
+        self.assertEqual(parse_query("lego up to $25").max_price, Decimal(25))
+        self.assertEqual(parse_query("comics over $5").min_price, Decimal(5))
+
+    def test_price_must_be_a_whole_number(self):
+        parsed = parse_query("ipod under 128gb")
+
+        self.assertIsNone(parsed.max_price)
+        self.assertEqual(parsed.text, "ipod under 128gb")
+
+    def test_numbers_in_titles_are_not_prices(self):
+        self.assertEqual(parse_query("xbox 360").text, "xbox 360")
+
+    def test_empty_query(self):
+        self.assertEqual(parse_query(""), ParsedQuery())
+
+    def test_stem(self):
+        self.assertEqual(stem("games"), "game")
+        self.assertEqual(stem("glass"), "glass")
+        self.assertEqual(stem("tvs"), "tvs")
+
+
+class TestParsedQueryFilters(unittest.TestCase):
+
+    def test_no_filters(self):
+        self.assertEqual(ParsedQuery(text="halo").filters(), {})
+
+    def test_all_filters(self):
+        parsed = ParsedQuery(condition="Used", min_price=Decimal(1), max_price=Decimal(9), free_shipping=True)
+
+        self.assertEqual(parsed.filters(), {
+            "condition__in": CONDITION_GROUPS["Used"],
+            "price__gte": Decimal(1),
+            "price__lte": Decimal(9),
+            "shipping_price": 0,
+        })
+
+
+class TestSearchWithParsedQuery(unittest.TestCase):
+
+    @patch('ebay.search.getItemsByFilter')
+    def test_category_and_structured_filters(self, mock_get_items_by_filter):
+        search("used xbox games under 20 halo", backend="database")
+
+        mock_get_items_by_filter.assert_called_once_with("Video Games", "xbox")
+        mock_get_items_by_filter.return_value.filter.assert_called_once_with(
+            condition__in=CONDITION_GROUPS["Used"],
+            price__lte=Decimal(20),
+            name__icontains="halo",
+        )
+
+    @patch('ebay.search.getItemsBySubCategory')
+    def test_category_without_filter_uses_subcategory(self, mock_get_items_by_subcategory):
+        result = search("books", backend="database")
+
+        mock_get_items_by_subcategory.assert_called_once_with("Books")
+        self.assertEqual(result, mock_get_items_by_subcategory.return_value)
+
+    @patch('ebay.search.visibleItems')
+    def test_query_with_nothing_to_search_for_is_empty(self, mock_visible_items):
+        for query in ("", "   ", "\t\n"):
+            self.assertEqual(search(query, backend="database"), mock_visible_items.return_value.none.return_value)
+            mock_visible_items.return_value.filter.assert_not_called()
+
+    @patch('ebay.search.visibleItems')
+    def test_structured_filters_without_category(self, mock_visible_items):
+        search("zelda under 20", backend="database")
+
+        mock_visible_items.return_value.filter.assert_called_once_with(price__lte=Decimal(20), name__icontains="zelda")
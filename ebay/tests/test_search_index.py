@@ -0,0 +1,280 @@
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch, Mock
+from .. import search_index
+from ..search import search, index_search
+from ..search_index import (
+    IndexWriter,
+    SearchIndex,
+    Segment,
+    decode_varints,
+    encode_varints,
+    item_tokens,
+    segment_path,
+    tokenize,
+    write_segment,
+    MAX_SEGMENTS,
+)
+
+
+def make_item(item_id, name, category="Books", categories=None):
+    return SimpleNamespace(
+        id=item_id,
+        name=name,
+        category=category,
+        category_list=[{"categoryName": name} for name in (categories or [])],
+    )
+
+
+class TestTokenize(unittest.TestCase):
+
+    def test_lowercases_and_splits_on_punctuation(self):
+        self.assertEqual(tokenize("Xbox 360 - Halo: Reach!"), ["xbox", "360", "halo", "reach"])
+
+    def test_keeps_accented_characters(self):
+        self.assertEqual(tokenize("Wall Décor"), ["wall", "décor"])
+
+    def test_empty_text(self):
+        self.assertEqual(tokenize(None), [])
+        self.assertEqual(tokenize(""), [])
+
+    def test_item_tokens_include_categories(self):
+        item = make_item(1, "Halo Reach", "Video Games", ["Video Games & Consoles"])
+        self.assertEqual(
+            item_tokens(item),
+            ["halo", "reach", "video", "games", "video", "games", "consoles"]
+        )
+
+
+class TestVarints(unittest.TestCase):
+
+    def test_round_trip(self):
+        values = [0, 1, 127, 128, 300, 2 ** 40]
+        self.assertEqual(decode_varints(encode_varints(values)), values)
+
+    def test_small_values_use_one_byte(self):
+        self.assertEqual(len(encode_varints([1, 2, 3])), 3)
+
+
+class SearchIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.writer = IndexWriter(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def add(self, *items):
+        self.writer.add_documents([(item.id, item_tokens(item)) for item in items])
+
+    def search(self, query, limit=None):
+        index = SearchIndex(self.directory)
+        try:
+            return [item_id for item_id, _ in index.search(query, limit)]
+        finally:
+            index.close()
+
+
+class TestSegment(SearchIndexTestCase):
+
+    def test_segment_round_trips_postings(self):
+        path = segment_path(self.directory, 1)
+        write_segment(path, [(7, ["halo", "reach", "halo"]), (3, ["halo"])])
+
+        segment = Segment(path, 1)
+        self.assertEqual(list(segment.doc_ids), [3, 7])
+        self.assertEqual(list(segment.doc_lengths), [1, 3])
+        self.assertEqual(segment.postings("halo"), [(0, 1), (1, 2)])
+        self.assertEqual(segment.df("reach"), 1)
+        self.assertEqual(segment.postings("missing"), [])
+        segment.close()
+
+    def test_prefix_terms(self):
+        path = segment_path(self.directory, 1)
+        write_segment(path, [(1, ["nintendo", "nine", "xbox"])])
+
+        segment = Segment(path, 1)
+        self.assertEqual(segment.prefix_terms("nin"), ["nine", "nintendo"])
+        segment.close()
+
+
+class TestSearchIndex(SearchIndexTestCase):
+
+    def test_empty_index_returns_no_results(self):
+        self.assertEqual(self.search("halo"), [])
+
+    def test_finds_items_by_name(self):
+        self.add(make_item(1, "Halo Reach Xbox 360"), make_item(2, "Harry Potter Book"))
+
+        self.assertEqual(self.search("halo"), [1])
+        self.assertEqual(self.search("potter"), [2])
+
+    def test_requires_every_term(self):
+        self.add(make_item(1, "Halo Reach Xbox"), make_item(2, "Forza Xbox"))
+
+        self.assertEqual(self.search("xbox halo"), [1])
+
+    def test_last_term_matches_prefix(self):
+        self.add(make_item(1, "Nintendo Switch Console"), make_item(2, "Xbox Console"))
+
+        self.assertEqual(self.search("ninte"), [1])
+
+    def test_matches_category_names(self):
+        self.add(make_item(1, "Halo Reach", "Video Games", ["Video Games & Consoles"]))
+
+        self.assertEqual(self.search("consoles"), [1])
+
+    def test_bm25_ranks_shorter_and_denser_documents_higher(self):
+        self.add(
+            make_item(1, "Lego Star Wars Millennium Falcon Complete Set With Box"),
+            make_item(2, "Lego Lego Bricks"),
+        )
+
+        self.assertEqual(self.search("lego"), [2, 1])
+
+    def test_limit_returns_best_results(self):
+        self.add(*[make_item(item_id, f"Book {item_id}") for item_id in range(1, 11)])
+
+        self.assertEqual(len(self.search("book", limit=3)), 3)
+
+    def test_deleted_items_are_not_returned(self):
+        self.add(make_item(1, "Halo Reach"), make_item(2, "Halo 3"))
+        self.writer.delete_documents([1])
+
+        self.assertEqual(self.search("halo"), [2])
+
+    def test_readded_item_is_live_again(self):
+        self.add(make_item(1, "Halo Reach"))
+        self.writer.delete_documents([1])
+        self.add(make_item(1, "Halo Reach"))
+
+        self.assertEqual(self.search("halo"), [1])
+
+    def test_merges_segments_and_drops_deleted_documents(self):
+        for item_id in range(1, MAX_SEGMENTS + 1):
+            self.add(make_item(item_id, f"Halo {item_id}"))
+        self.writer.delete_documents([1])
+        self.add(make_item(100, "Halo Anniversary"))
+
+        index = SearchIndex(self.directory)
+        self.assertEqual(len(index.segments), 1)
+        self.assertEqual(index.deletes, {})
+        self.assertEqual(index.doc_count, MAX_SEGMENTS)
+        index.close()
+        self.assertNotIn(1, self.search("halo"))
+
+    def test_merge_removes_old_segment_files(self):
+        for item_id in range(1, MAX_SEGMENTS + 2):
+            self.add(make_item(item_id, f"Halo {item_id}"))
+
+        segment_files = [name for name in os.listdir(self.directory) if name.startswith("segment_")]
+        self.assertEqual(len(segment_files), 1)
+
+    def test_merged_segments_are_not_rewritten_by_small_merges(self):
+        for item_id in range(1, 2 * (MAX_SEGMENTS + 1) + 1):
+            self.add(make_item(item_id, f"Halo {item_id}"))
+
+        index = SearchIndex(self.directory)
+        self.assertEqual([len(segment.doc_ids) for segment in index.segments],
+                         [MAX_SEGMENTS + 1, MAX_SEGMENTS + 1])
+        index.close()
+
+    def test_partial_merge_keeps_deletes_for_other_segments(self):
+        for item_id in range(1, MAX_SEGMENTS + 2):
+            self.add(make_item(item_id, f"Halo {item_id}"))
+        self.writer.delete_documents([1, 2])
+        for item_id in range(100, 100 + MAX_SEGMENTS + 1):
+            self.add(make_item(item_id, f"Halo {item_id}"))
+
+        index = SearchIndex(self.directory)
+        self.assertEqual(len(index.segments), 2)
+        self.assertEqual(index.doc_count, 2 * (MAX_SEGMENTS + 1) - 2)
+        index.close()
+        self.assertNotIn(1, self.search("halo"))
+
+    def test_replace_all_rebuilds_index(self):
+        self.add(make_item(1, "Halo Reach"))
+        self.writer.delete_documents([1])
+        self.writer.replace_all([(2, ["forza"])])
+
+        self.assertEqual(self.search("halo"), [])
+        self.assertEqual(self.search("forza"), [2])
+
+    def test_persisted_index_is_reloaded_by_new_reader(self):
+        self.add(make_item(1, "Halo Reach"))
+
+        self.assertEqual(SearchIndex(self.directory).version, 1)
+        self.assertEqual(self.search("reach"), [1])
+
+
+class TestSearchBackend(unittest.TestCase):
+
+    @patch('ebay.search.visibleItems')
+    def test_database_backend_uses_icontains(self, mock_visible_items):
+        search("halo", backend="database")
+
+        mock_visible_items.return_value.filter.assert_called_once_with(name__icontains="halo")
+
+    @patch('ebay.search.visibleItems')
+    @patch('ebay.search.index_search')
+    def test_index_backend_uses_search_index(self, mock_index_search, mock_visible_items):
+        search("halo", backend="index")
+
+        mock_visible_items.return_value.filter.assert_called_once_with()
+        mock_index_search.assert_called_once_with(mock_visible_items.return_value.filter.return_value, "halo")
+
+    @patch('ebay.search.getItemsByFilter')
+    def test_filter_options_take_priority_over_backend(self, mock_get_items_by_filter):
+        search("xbox games", backend="index")
+
+        mock_get_items_by_filter.assert_called_once_with("Video Games", "xbox")
+
+    @patch('ebay.search.search_index.search_item_ids')
+    def test_index_search_returns_empty_queryset_without_matches(self, mock_search_item_ids):
+        mock_items = Mock()
+        mock_search_item_ids.return_value = []
+
+        result = index_search(mock_items, "halo")
+
+        self.assertEqual(result, mock_items.none.return_value)
+
+
+class TestGetIndex(SearchIndexTestCase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = patch('ebay.search_index.index_dir', return_value=self.directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(setattr, search_index, '_index', None)
+        search_index._index = None
+
+    def reload(self):
+        search_index._index_checked = 0
+        return search_index.get_index()
+
+    def test_new_version_closes_previous_index(self):
+        self.add(make_item(1, "Halo Reach"))
+        first = self.reload()
+        self.add(make_item(2, "Halo 3"))
+
+        second = self.reload()
+
+        self.assertIsNot(second, first)
+        self.assertTrue(first.segments[0].buffer.closed)
+        self.assertEqual(sorted(search_index.search_item_ids("halo")), [1, 2])
+        second.close()
+
+    def test_index_in_use_is_closed_when_its_search_finishes(self):
+        self.add(make_item(1, "Halo Reach"))
+
+        with search_index.open_index() as first:
+            self.add(make_item(2, "Halo 3"))
+            self.reload()
+            self.assertFalse(first.segments[0].buffer.closed)
+        self.assertTrue(first.segments[0].buffer.closed)
+        search_index._index.close()
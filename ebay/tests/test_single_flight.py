@@ -0,0 +1,165 @@
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+from django.core.cache.backends.locmem import LocMemCache
+from redis.exceptions import LockError
+from ebay import single_flight
+from ebay.single_flight import fill, get_or_fill
+
+
+class FakeLock:
+    """Enough of redis-py's non-blocking Lock to share one lease between threads."""
+    held = set()
+    guard = threading.Lock()
+
+    def __init__(self, name, timeout=None, blocking=True):
+        self.name = name
+
+    def acquire(self):
+        with self.guard:
+            if self.name in self.held:
+                return False
+            self.held.add(self.name)
+            return True
+
+    def release(self):
+        with self.guard:
+            if self.name not in self.held:
+                raise LockError("not held")
+            self.held.discard(self.name)
+
+
+@patch.object(single_flight, 'POLL_INTERVAL', 0.01)
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = LocMemCache('single_flight', {})
+        self.cache.clear()
+        client = Mock(lock=FakeLock)
+        client_patcher = patch.object(single_flight, 'lock_client', return_value=client)
+        client_patcher.start()
+        self.addCleanup(client_patcher.stop)
+
+    def test_concurrent_misses_compute_once(self):
+        started, finish = threading.Event(), threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            finish.wait(1)
+            return b'{"results":[]}'
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(fill(self.cache, 'page', compute, 60)))
+        leader.start()
+        started.wait(1)
+        followers = [threading.Thread(target=lambda: results.append(fill(self.cache, 'page', compute, 60)))
+                     for _ in range(3)]
+        for follower in followers:
+            follower.start()
+        finish.set()
+        for thread in [leader, *followers]:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [b'{"results":[]}'] * 4)
+        self.assertEqual(FakeLock.held, set())
+
+    @patch.object(single_flight, 'WAIT_TIMEOUT', 0.05)
+    def test_follower_computes_when_leader_is_too_slow(self):
+        FakeLock(single_flight.lock_name('page')).acquire()
+        self.addCleanup(FakeLock.held.clear)
+
+        self.assertEqual(fill(self.cache, 'page', lambda: b'{}', 60), b'{}')
+        self.assertEqual(self.cache.get('page')[1], b'{}')
+
+    def test_leader_uses_entry_stored_before_it_took_the_lock(self):
+        single_flight.store(self.cache, 'page', b'filled', 60, 0)
+        compute = Mock(return_value=b'{}')
+
+        self.assertEqual(fill(self.cache, 'page', compute, 60), b'filled')
+        compute.assert_not_called()
+        self.assertEqual(FakeLock.held, set())
+
+    def test_lock_is_released_when_compute_fails(self):
+        def compute():
+            raise ValueError("bad page")
+
+        with self.assertRaises(ValueError):
+            fill(self.cache, 'page', compute, 60)
+        self.assertEqual(FakeLock.held, set())
+
+    def test_computes_without_redis(self):
+        with patch.object(single_flight, 'lock_client', side_effect=ConnectionError):
+            self.assertEqual(fill(self.cache, 'page', lambda: b'{}', 60), b'{}')
+
+
+class TestStaleWhileRevalidate(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = LocMemCache('stale_while_revalidate', {})
+        self.cache.clear()
+        client_patcher = patch.object(single_flight, 'lock_client', return_value=Mock(lock=FakeLock))
+        client_patcher.start()
+        self.addCleanup(client_patcher.stop)
+        self.addCleanup(FakeLock.held.clear)
+
+    def test_missing_entry_is_filled_with_soft_and_hard_expiry(self):
+        with patch.object(self.cache, 'set', wraps=self.cache.set) as mock_set:
+            self.assertEqual(get_or_fill(self.cache, 'page', lambda: b'new', 60, 600), b'new')
+
+        (key, (fresh_until, value), timeout), _ = mock_set.call_args
+        self.assertEqual((key, value, timeout), ('page', b'new', 660))
+        self.assertAlmostEqual(fresh_until, time.time() + 60, delta=5)
+
+    def test_fresh_entry_is_served_without_recomputing(self):
+        self.cache.set('page', (time.time() + 60, b'old'), 600)
+        compute = Mock(return_value=b'new')
+
+        self.assertEqual(get_or_fill(self.cache, 'page', compute, 60, 600), b'old')
+        compute.assert_not_called()
+
+    @patch('ebay.single_flight.threading.Thread')
+    def test_stale_entry_is_served_while_one_request_revalidates(self, mock_thread):
+        self.cache.set('page', (time.time() - 1, b'old'), 600)
+        compute = Mock(return_value=b'new')
+
+        served = [get_or_fill(self.cache, 'page', compute, 60, 600) for _ in range(3)]
+
+        self.assertEqual(served, [b'old'] * 3)
+        mock_thread.assert_called_once()
+        target, args = mock_thread.call_args[1]['target'], mock_thread.call_args[1]['args']
+        target(*args)
+        compute.assert_called_once()
+        self.assertEqual(self.cache.get('page')[1], b'new')
+        self.assertEqual(FakeLock.held, set())
+
+    @patch('ebay.single_flight.threading.Thread')
+    def test_failed_revalidation_keeps_stale_entry(self, mock_thread):
+        self.cache.set('page', (time.time() - 1, b'old'), 600)
+
+        get_or_fill(self.cache, 'page', Mock(side_effect=ValueError), 60, 600)
+        target, args = mock_thread.call_args[1]['target'], mock_thread.call_args[1]['args']
+        target(*args)
+
+        self.assertEqual(self.cache.get('page')[1], b'old')
+        self.assertEqual(FakeLock.held, set())
+
+    @patch('ebay.single_flight.threading.Thread')
+    def test_failed_revalidation_backs_off_before_retrying(self, mock_thread):
+        self.cache.set('page', (time.time() - 1, b'old'), 600)
+        compute = Mock(side_effect=ValueError)
+
+        get_or_fill(self.cache, 'page', compute, 60, 600)
+        target, args = mock_thread.call_args[1]['target'], mock_thread.call_args[1]['args']
+        target(*args)
+        served = [get_or_fill(self.cache, 'page', compute, 60, 600) for _ in range(3)]
+
+        self.assertEqual(served, [b'old'] * 3)
+        mock_thread.assert_called_once()
+
+        self.cache.delete(single_flight.backoff_key('page'))
+        get_or_fill(self.cache, 'page', compute, 60, 600)
+        self.assertEqual(mock_thread.call_count, 2)
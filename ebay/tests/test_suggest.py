@@ -0,0 +1,150 @@
+import unittest
+from unittest.mock import patch, Mock
+from rest_framework.test import APIRequestFactory
+from ebay import suggest
+from ebay.suggest import Suggester, build_entries, normalize, MAX_LIMIT
+from ebay.views.suggest_view import ItemSuggestView
+
+
+class TestBuildEntries(unittest.TestCase):
+
+    def test_includes_filter_options(self):
+        keys = [key for key, _, _ in build_entries()]
+
+        self.assertIn("xbox games", keys)
+        self.assertIn("nintendo consoles", keys)
+
+    def test_includes_category_names_weighted_by_item_count(self):
+        items = [
+            ("Halo", [{"categoryName": "Retro Games"}]),
+            ("Zelda", [{"categoryName": "Retro Games"}]),
+        ]
+        entries = {key: (display, weight) for key, display, weight in build_entries(items)}
+
+        self.assertEqual(entries["retro games"][0], "Retro Games")
+        self.assertEqual(entries["retro games"][1], suggest.CATEGORY_WEIGHT + 2)
+
+    def test_includes_frequent_title_ngrams_only(self):
+        items = [("Halo Reach Xbox", []) for _ in range(3)] + [("Rare Title", [])]
+        keys = [key for key, _, _ in build_entries(items)]
+
+        self.assertIn("halo reach", keys)
+        self.assertIn("halo", keys)
+        self.assertNotIn("rare title", keys)
+
+    def test_entries_are_sorted_by_key(self):
+        keys = [key for key, _, _ in build_entries()]
+
+        self.assertEqual(keys, sorted(keys))
+
+
+class TestSuggester(unittest.TestCase):
+
+    def setUp(self):
+        self.suggester = Suggester(sorted([
+            ("halo", "halo", 5),
+            ("halo reach", "halo reach", 10),
+            ("handbags", "Handbags", 1),
+            ("xbox consoles", "Xbox Consoles", 100),
+            ("xbox games", "Xbox Games", 200),
+        ]))
+
+    def test_short_prefix_uses_precomputed_top_list(self):
+        self.assertEqual(self.suggester.suggest("ha"), ["halo reach", "halo", "Handbags"])
+
+    def test_long_prefix_uses_sorted_range(self):
+        self.assertEqual(self.suggester.suggest("halo r"), ["halo reach"])
+        self.assertEqual(self.suggester.suggest("xbox"), ["Xbox Games", "Xbox Consoles"])
+
+    def test_respects_limit(self):
+        self.assertEqual(self.suggester.suggest("x", limit=1), ["Xbox Games"])
+
+    def test_limit_is_capped(self):
+        self.assertEqual(len(self.suggester.suggest("x", limit=MAX_LIMIT * 10)), 2)
+
+    def test_prefix_is_normalized(self):
+        self.assertEqual(self.suggester.suggest("  XBOX   G"), ["Xbox Games"])
+        self.assertEqual(normalize("Kids' Crafts"), "kids crafts")
+
+    def test_empty_or_unknown_prefix(self):
+        self.assertEqual(self.suggester.suggest(""), [])
+        self.assertEqual(self.suggester.suggest("zzz"), [])
+
+
+class TestGetSuggester(unittest.TestCase):
+
+    def setUp(self):
+        suggest._suggester = None
+        suggest._suggester_checked = 0
+
+    def tearDown(self):
+        suggest._suggester = None
+
+    @patch('ebay.suggest.caches')
+    def test_loads_entries_published_by_worker(self, mock_caches):
+        mock_cache = Mock()
+        mock_cache.get.side_effect = lambda key: {
+            suggest.SUGGEST_VERSION_KEY: "v1",
+            suggest.SUGGEST_CACHE_KEY: {"version": "v1", "entries": [("halo", "halo", 1)]},
+        }[key]
+        mock_caches.__getitem__.return_value = mock_cache
+
+        suggester = suggest.get_suggester()
+
+        self.assertEqual(suggester.version, "v1")
+        self.assertEqual(suggester.suggest("hal"), ["halo"])
+
+    @patch('ebay.suggest.caches')
+    def test_falls_back_to_filter_options_when_nothing_published(self, mock_caches):
+        mock_cache = Mock()
+        mock_cache.get.return_value = None
+        mock_caches.__getitem__.return_value = mock_cache
+
+        suggester = suggest.get_suggester()
+
+        self.assertIn("Xbox Games", suggester.suggest("xbox"))
+
+    @patch('ebay.suggest.caches')
+    def test_falls_back_when_cache_unavailable(self, mock_caches):
+        mock_cache = Mock()
+        mock_cache.get.side_effect = Exception("connection refused")
+        mock_caches.__getitem__.return_value = mock_cache
+
+        suggester = suggest.get_suggester()
+
+        self.assertIsNone(suggester.version)
+
+    @patch('ebay.suggest.caches')
+    def test_reuses_suggester_between_version_checks(self, mock_caches):
+        mock_cache = Mock()
+        mock_cache.get.return_value = None
+        mock_caches.__getitem__.return_value = mock_cache
+
+        first = suggest.get_suggester()
+        second = suggest.get_suggester()
+
+        self.assertIs(first, second)
+        self.assertEqual(mock_cache.get.call_count, 1)
+
+
+class TestItemSuggestView(unittest.TestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.view = ItemSuggestView.as_view()
+
+    @patch('ebay.views.suggest_view.get_suggester')
+    def test_returns_suggestions(self, mock_get_suggester):
+        mock_get_suggester.return_value.suggest.return_value = ["Xbox Games"]
+
+        response = self.view(self.factory.get('/api/items/suggest/', {'q': 'xb', 'limit': '5'}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"query": "xb", "suggestions": ["Xbox Games"]})
+        mock_get_suggester.return_value.suggest.assert_called_once_with('xb', 5)
+
+    @patch('ebay.views.suggest_view.get_suggester')
+    def test_invalid_limit_returns_400(self, mock_get_suggester):
+        response = self.view(self.factory.get('/api/items/suggest/', {'q': 'xb', 'limit': 'abc'}))
+
+        self.assertEqual(response.status_code, 400)
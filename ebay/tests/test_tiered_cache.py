@@ -0,0 +1,111 @@
+import json
+import uuid
+from unittest.mock import PropertyMock, patch
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+from ebay.tiered_cache import LocalLRU, TieredCache, tier_stats
+
+
+class TestTieredCache(SimpleTestCase):
+
+    def setUp(self):
+        self.shared = LocMemCache(uuid.uuid4().hex, {})
+        shared_patcher = patch.object(TieredCache, 'shared', new_callable=PropertyMock, return_value=self.shared)
+        shared_patcher.start()
+        self.addCleanup(shared_patcher.stop)
+        self.cache = self.tiered()
+
+    def tiered(self, **options):
+        # a fresh key prefix gives each test its own process-wide local tier
+        return TieredCache(None, {'KEY_PREFIX': uuid.uuid4().hex, 'OPTIONS': options})
+
+    def test_set_is_served_from_local_tier(self):
+        self.cache.set('page', b'{}', 60)
+        self.shared.clear()
+
+        self.assertEqual(self.cache.get('page'), b'{}')
+        self.assertEqual(self.cache.tier.counts['local'], 1)
+
+    def test_shared_hit_fills_local_tier(self):
+        self.assertIsNone(self.cache.get('page'))
+        self.shared.set('page', b'{}', 60)
+        self.assertEqual(self.cache.get('page'), b'{}')
+        self.assertEqual(self.cache.get('page'), b'{}')
+        self.assertEqual(dict(self.cache.tier.counts), {'miss': 1, 'shared': 1, 'local': 1})
+
+    def test_threads_share_the_process_tier(self):
+        self.cache.set('page', b'{}', 60)
+        same_process = TieredCache(None, {'KEY_PREFIX': self.cache.key_prefix, 'OPTIONS': {}})
+
+        self.assertIs(same_process.tier, self.cache.tier)
+
+    def test_invalidation_from_another_process_drops_local_copy(self):
+        self.cache.set('page', b'{}', 60)
+        local_key = self.cache.local_key('page', None)
+
+        self.cache.apply_invalidation(json.dumps({'origin': self.cache.tier.instance_id, 'keys': [local_key]}))
+        self.assertEqual(self.cache.local.get(local_key), b'{}')
+
+        self.cache.apply_invalidation(json.dumps({'origin': 'other', 'keys': [local_key]}))
+        self.assertIsNone(self.cache.local.get(local_key))
+
+    def test_delete_publishes_local_keys(self):
+        cache = self.tiered(CHANNEL='invalidation')
+
+        with patch.object(cache, 'redis') as mock_redis, patch.object(cache, 'ensure_listener'):
+            cache.set('page', b'{}', 60)
+            cache.delete('page')
+
+        channel, message = mock_redis.return_value.publish.call_args[0]
+        self.assertEqual(channel, 'invalidation')
+        self.assertEqual(json.loads(message)['keys'], [cache.local_key('page', None)])
+        self.assertIsNone(self.shared.get('page'))
+
+    def test_set_publishes_local_key(self):
+        cache = self.tiered(CHANNEL='invalidation')
+        other_process = self.tiered()
+        other_process.local.set(cache.local_key('page', None), b'old', 60)
+
+        with patch.object(cache, 'redis') as mock_redis, patch.object(cache, 'ensure_listener'):
+            cache.set('page', b'new', 60)
+
+        channel, message = mock_redis.return_value.publish.call_args[0]
+        self.assertEqual(channel, 'invalidation')
+        other_process.apply_invalidation(message)
+        cache.apply_invalidation(message)
+        self.assertIsNone(other_process.local.get(cache.local_key('page', None)))
+        self.assertEqual(cache.local.get(cache.local_key('page', None)), b'new')
+
+    def test_shared_outage_degrades_to_local_tier(self):
+        with patch.object(self.shared, 'get', side_effect=ConnectionError), \
+                patch.object(self.shared, 'set', side_effect=ConnectionError):
+            self.assertIsNone(self.cache.get('page'))
+            self.cache.set('page', b'{}', 60)
+            self.assertEqual(self.cache.get('page'), b'{}')
+
+    def test_stats_report_ratio_per_tier(self):
+        self.cache.flush_stats({'local': 6, 'shared': 3, 'miss': 1})
+        self.cache.flush_stats({'local': 2})
+
+        stats = tier_stats(self.shared)
+
+        self.assertEqual(stats['local'], {'count': 8, 'ratio': round(8 / 12, 4)})
+        self.assertEqual(stats['miss'], {'count': 1, 'ratio': round(1 / 12, 4)})
+
+
+class TestLocalLRU(SimpleTestCase):
+
+    def test_evicts_least_recently_used(self):
+        lru = LocalLRU(2)
+        lru.set('a', 1, 60)
+        lru.set('b', 2, 60)
+        lru.get('a')
+        lru.set('c', 3, 60)
+
+        self.assertEqual((lru.get('a'), lru.get('b'), lru.get('c')), (1, None, 3))
+
+    def test_entries_expire(self):
+        lru = LocalLRU(2)
+        lru.set('a', 1, 0)
+
+        self.assertIsNone(lru.get('a'))
@@ -3,11 +3,12 @@ from unittest.mock import Mock, patch
 from django.test import TestCase
 from rest_framework.test import APIRequestFactory, force_authenticate
 from rest_framework import status
-from ..views.charity_views import EbayCharity
+from ..views.charity_views import EbayCharity, CharityDeletionStatus
 from ebay.views.report_view import EbayReportView
 from django.contrib.auth.models import User as DjangoUser
 from django.db import IntegrityError
 import smtplib
+from django.utils import timezone
 from ebay.views.user_views import (
     GetUserProfile,
     UpdateUserProfile,
@@ -22,12 +23,12 @@ class TestEbayCharityGet(unittest.TestCase):
     def setUp(self):
         self.factory = APIRequestFactory()
         self.view = EbayCharity.as_view()
-        self.disk_patcher = patch('ebay.views.charity_views.disk')
-        self.mock_disk = self.disk_patcher.start()
-        self.mock_disk.get.return_value = None
+        self.cache_patcher = patch('ebay.views.charity_views.cache')
+        self.mock_cache = self.cache_patcher.start()
+        self.mock_cache.get.return_value = None
 
     def tearDown(self):
-        self.disk_patcher.stop()
+        self.cache_patcher.stop()
 
     @patch('ebay.views.charity_views.CharitySerializer')
     @patch('ebay.views.charity_views.Charity')
@@ -37,7 +38,7 @@ class TestEbayCharityGet(unittest.TestCase):
             Mock(id=1, name="Charity 1"),
             Mock(id=2, name="Charity 2")
         ]
-        mock_charity_model.objects.all.return_value = mock_charities
+        mock_charity_model.objects.filter.return_value = mock_charities
 
         mock_serializer_instance = Mock()
         mock_serializer_instance.data = [
@@ -52,13 +53,13 @@ class TestEbayCharityGet(unittest.TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 2)
-        mock_charity_model.objects.all.assert_called_once()
+        mock_charity_model.objects.filter.assert_called_once_with(is_hidden=False)
         mock_serializer.assert_called_once_with(mock_charities, many=True)
 
     @patch('ebay.views.charity_views.CharitySerializer')
     @patch('ebay.views.charity_views.Charity')
     def test_get_returns_empty_list_when_no_charities(self, mock_charity_model, mock_serializer):
-        mock_charity_model.objects.all.return_value = []
+        mock_charity_model.objects.filter.return_value = []
 
         mock_serializer_instance = Mock()
         mock_serializer_instance.data = []
@@ -83,7 +84,7 @@ class TestEbayCharityGet(unittest.TestCase):
             }
         ]
 
-        mock_charity_model.objects.all.return_value = [Mock()]
+        mock_charity_model.objects.filter.return_value = [Mock()]
         mock_serializer_instance = Mock()
         mock_serializer_instance.data = expected_data
         mock_serializer.return_value = mock_serializer_instance
@@ -99,11 +100,11 @@ class TestEbayCharityPost(unittest.TestCase):
     def setUp(self):
         self.factory = APIRequestFactory()
         self.view = EbayCharity.as_view()
-        self.disk_patcher = patch('ebay.views.charity_views.disk')
-        self.mock_disk = self.disk_patcher.start()
+        self.cache_patcher = patch('ebay.views.charity_views.cache')
+        self.mock_cache = self.cache_patcher.start()
 
     def tearDown(self):
-        self.disk_patcher.stop()
+        self.cache_patcher.stop()
 
     @patch('ebay.views.charity_views.addCharity')
     def test_post_success_returns_201(self, mock_add_charity):
@@ -171,20 +172,21 @@ class TestEbayCharityDelete(unittest.TestCase):
     def setUp(self):
         self.factory = APIRequestFactory()
         self.view = EbayCharity.as_view()
-        self.disk_patcher = patch('ebay.views.charity_views.disk')
-        self.mock_disk = self.disk_patcher.start()
+        self.cache_patcher = patch('ebay.views.charity_views.cache')
+        self.mock_cache = self.cache_patcher.start()
 
     def tearDown(self):
-        self.disk_patcher.stop()
+        self.cache_patcher.stop()
 
     @patch('ebay.views.charity_views.deleteCharity')
-    def test_delete_success_returns_204(self, mock_delete_charity):
+    def test_delete_success_returns_202_with_job(self, mock_delete_charity):
         mock_delete_charity.return_value = "Success"
 
         request = self.factory.delete('/api/charity/1/')
         response = self.view(request, charity_id=1)
 
-        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data, {"job_id": "delete_charity_1"})
         mock_delete_charity.assert_called_once_with(1)
 
     @patch('ebay.views.charity_views.deleteCharity')
@@ -216,17 +218,30 @@ class TestEbayCharityDelete(unittest.TestCase):
 
         mock_delete_charity.assert_called_once_with(42)
 
+    @patch('ebay.views.charity_views.get_redis')
+    @patch('ebay.views.charity_views.Job')
+    def test_deletion_status_reports_job_progress(self, mock_job, mock_get_redis):
+        mock_job.fetch.return_value.get_status.return_value = "started"
+        mock_job.fetch.return_value.meta = {"deleted": 2000, "total": 5000}
+        request = self.factory.get('/api/charity/deleteCharity/42/status')
+        force_authenticate(request, user=make_admin_user())
+
+        response = CharityDeletionStatus.as_view()(request, charity_id=42)
+
+        self.assertEqual(response.data, {"status": "started", "deleted": 2000, "total": 5000})
+        self.assertEqual(mock_job.fetch.call_args[0][0], "delete_charity_42")
+
 
 class TestEbayCharityPut(unittest.TestCase):
 
     def setUp(self):
         self.factory = APIRequestFactory()
         self.view = EbayCharity.as_view()
-        self.disk_patcher = patch('ebay.views.charity_views.disk')
-        self.mock_disk = self.disk_patcher.start()
+        self.cache_patcher = patch('ebay.views.charity_views.cache')
+        self.mock_cache = self.cache_patcher.start()
 
     def tearDown(self):
-        self.disk_patcher.stop()
+        self.cache_patcher.stop()
 
     @patch('ebay.views.charity_views.Charity')
     def test_put_success_returns_204(self, mock_charity_model):
@@ -335,7 +350,7 @@ class TestEbayCharityPut(unittest.TestCase):
 class TestEbayCharityInit(unittest.TestCase):
 
     def test_init_creates_instance(self):
-        with patch('ebay.views.charity_views.disk'):
+        with patch('ebay.views.charity_views.cache'):
             view = EbayCharity()
             self.assertIsInstance(view, EbayCharity)
 
@@ -345,12 +360,12 @@ class TestEbayCharityIntegration(TestCase):
     def setUp(self):
         self.factory = APIRequestFactory()
         self.view = EbayCharity.as_view()
-        self.disk_patcher = patch('ebay.views.charity_views.disk')
-        self.mock_disk = self.disk_patcher.start()
-        self.mock_disk.get.return_value = None
+        self.cache_patcher = patch('ebay.views.charity_views.cache')
+        self.mock_cache = self.cache_patcher.start()
+        self.mock_cache.get.return_value = None
 
     def tearDown(self):
-        self.disk_patcher.stop()
+        self.cache_patcher.stop()
 
     @patch('ebay.views.charity_views.addCharity')
     @patch('ebay.views.charity_views.deleteCharity')
@@ -369,7 +384,7 @@ class TestEbayCharityIntegration(TestCase):
         response = self.view(request)
         self.assertEqual(response.status_code, 201)
 
-        mock_charity_model.objects.all.return_value = []
+        mock_charity_model.objects.filter.return_value = []
         mock_serializer_instance = Mock()
         mock_serializer_instance.data = [post_data]
         mock_serializer.return_value = mock_serializer_instance
@@ -394,7 +409,7 @@ class TestEbayCharityIntegration(TestCase):
         mock_delete.return_value = "Success"
         request = self.factory.delete('/api/charity/1/')
         response = self.view(request, charity_id=1)
-        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response.status_code, 202)
 
 
 ############################# Charity Cache Tests ##################################
@@ -404,29 +419,29 @@ class TestEbayCharityCaching(unittest.TestCase):
     def setUp(self):
         self.factory = APIRequestFactory()
         self.view = EbayCharity.as_view()
-        self.disk_patcher = patch('ebay.views.charity_views.disk')
-        self.mock_disk = self.disk_patcher.start()
+        self.cache_patcher = patch('ebay.views.charity_views.cache')
+        self.mock_cache = self.cache_patcher.start()
 
     def tearDown(self):
-        self.disk_patcher.stop()
+        self.cache_patcher.stop()
 
     def test_get_returns_cached_data_on_cache_hit(self):
         cached_data = [{"id": 1, "name": "Cached Charity"}]
-        self.mock_disk.get.return_value = cached_data
+        self.mock_cache.get.return_value = cached_data
 
         request = self.factory.get('/api/charity/')
         response = self.view(request)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, cached_data)
-        self.mock_disk.get.assert_called_once_with('charities_list')
+        self.mock_cache.get.assert_called_once_with('charities_list')
 
     @patch('ebay.views.charity_views.CharitySerializer')
     @patch('ebay.views.charity_views.Charity')
     def test_get_queries_db_on_cache_miss(self, mock_charity_model, mock_serializer):
-        self.mock_disk.get.return_value = None
+        self.mock_cache.get.return_value = None
 
-        mock_charity_model.objects.all.return_value = [Mock()]
+        mock_charity_model.objects.filter.return_value = [Mock()]
         mock_serializer_instance = Mock()
         mock_serializer_instance.data = [{"id": 1}]
         mock_serializer.return_value = mock_serializer_instance
@@ -434,15 +449,15 @@ class TestEbayCharityCaching(unittest.TestCase):
         request = self.factory.get('/api/charity/')
         self.view(request)
 
-        mock_charity_model.objects.all.assert_called_once()
+        mock_charity_model.objects.filter.assert_called_once_with(is_hidden=False)
 
     @patch('ebay.views.charity_views.CharitySerializer')
     @patch('ebay.views.charity_views.Charity')
     def test_get_sets_cache_on_cache_miss(self, mock_charity_model, mock_serializer):
-        self.mock_disk.get.return_value = None
+        self.mock_cache.get.return_value = None
 
         expected_data = [{"id": 1, "name": "Charity 1"}]
-        mock_charity_model.objects.all.return_value = [Mock()]
+        mock_charity_model.objects.filter.return_value = [Mock()]
         mock_serializer_instance = Mock()
         mock_serializer_instance.data = expected_data
         mock_serializer.return_value = mock_serializer_instance
@@ -450,15 +465,15 @@ class TestEbayCharityCaching(unittest.TestCase):
         request = self.factory.get('/api/charity/')
         self.view(request)
 
-        self.mock_disk.set.assert_called_once_with('charities_list', expected_data, 60 * 60)
+        self.mock_cache.set.assert_called_once_with('charities_list', expected_data, 60 * 60)
 
     def test_get_does_not_query_db_on_cache_hit(self):
-        self.mock_disk.get.return_value = [{"id": 1}]
+        self.mock_cache.get.return_value = [{"id": 1}]
 
         with patch('ebay.views.charity_views.Charity') as mock_charity_model:
             request = self.factory.get('/api/charity/')
             self.view(request)
-            mock_charity_model.objects.all.assert_not_called()
+            mock_charity_model.objects.filter.assert_not_called()
 
     @patch('ebay.views.charity_views.addCharity')
     def test_post_success_invalidates_charities_cache(self, mock_add_charity):
@@ -467,7 +482,7 @@ class TestEbayCharityCaching(unittest.TestCase):
         request = self.factory.post('/api/charity/', {"name": "Test"}, format='json')
         self.view(request)
 
-        self.mock_disk.delete.assert_any_call('charities_list')
+        self.mock_cache.delete.assert_any_call('charities_list')
 
     @patch('ebay.views.charity_views.addCharity')
     def test_post_failure_does_not_invalidate_cache(self, mock_add_charity):
@@ -476,7 +491,7 @@ class TestEbayCharityCaching(unittest.TestCase):
         request = self.factory.post('/api/charity/', {}, format='json')
         self.view(request)
 
-        self.mock_disk.delete.assert_not_called()
+        self.mock_cache.delete.assert_not_called()
 
     @patch('ebay.views.charity_views.deleteCharity')
     def test_delete_success_invalidates_charities_cache(self, mock_delete_charity):
@@ -485,7 +500,7 @@ class TestEbayCharityCaching(unittest.TestCase):
         request = self.factory.delete('/api/charity/1/')
         self.view(request, charity_id=1)
 
-        self.mock_disk.delete.assert_any_call('charities_list')
+        self.mock_cache.delete.assert_any_call('charities_list')
 
     @patch('ebay.views.charity_views.deleteCharity')
     def test_delete_failure_does_not_invalidate_cache(self, mock_delete_charity):
@@ -494,7 +509,7 @@ class TestEbayCharityCaching(unittest.TestCase):
         request = self.factory.delete('/api/charity/1/')
         self.view(request, charity_id=1)
 
-        self.mock_disk.delete.assert_not_called()
+        self.mock_cache.delete.assert_not_called()
 
     @patch('ebay.views.charity_views.Charity')
     def test_put_success_invalidates_charities_cache(self, mock_charity_model):
@@ -508,7 +523,7 @@ class TestEbayCharityCaching(unittest.TestCase):
         request = self.factory.put('/api/charity/1/', request_data, format='json')
         self.view(request, charity_id=1)
 
-        self.mock_disk.delete.assert_any_call('charities_list')
+        self.mock_cache.delete.assert_any_call('charities_list')
 
     @patch('ebay.views.charity_views.Charity')
     def test_put_failure_does_not_invalidate_cache(self, mock_charity_model):
@@ -521,199 +536,134 @@ class TestEbayCharityCaching(unittest.TestCase):
         request = self.factory.put('/api/charity/1/', request_data, format='json')
         self.view(request, charity_id=1)
 
-        self.mock_disk.delete.assert_not_called()
+        self.mock_cache.delete.assert_not_called()
 
 
 ############################# Report View Tests ##################################
 
-class TestEbayReportViewGet(unittest.TestCase):
+def make_admin_user():
+    admin_user = Mock(spec=DjangoUser)
+    admin_user.id = 1
+    admin_user.username = "admin"
+    admin_user.is_staff = True
+    admin_user.is_authenticated = True
+    return admin_user
 
-    def setUp(self):
-        self.factory = APIRequestFactory()
-        self.view = EbayReportView.as_view()
-        self.disk_patcher = patch('ebay.views.report_view.disk')
-        self.mock_disk = self.disk_patcher.start()
-        self.mock_disk.get.return_value = None
 
-        self.mock_admin_user = Mock(spec=DjangoUser)
-        self.mock_admin_user.id = 1
-        self.mock_admin_user.username = "admin"
-        self.mock_admin_user.is_staff = True
-        self.mock_admin_user.is_authenticated = True
+class TestEbayReportViewGet(TestCase):
 
-        self.mock_regular_user = Mock(spec=DjangoUser)
-        self.mock_regular_user.id = 2
-        self.mock_regular_user.username = "regular"
-        self.mock_regular_user.is_staff = False
-        self.mock_regular_user.is_authenticated = True
-
-    def tearDown(self):
-        self.disk_patcher.stop()
-
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_get_returns_report_data(self, mock_item_model, mock_charity_model):
-        mock_item_model.objects.count.return_value = 10
-        mock_charity_model.objects.count.return_value = 2
-
-        mock_charity_1 = Mock()
-        mock_charity_1.name = "Charity One"
-        mock_charity_2 = Mock()
-        mock_charity_2.name = "Charity Two"
-
-        mock_charity_model.objects.all.return_value = [mock_charity_1, mock_charity_2]
-
-        mock_item_model.objects.filter.return_value.count.side_effect = [5, 5]
-
-        request = self.factory.get('/api/report/')
-        force_authenticate(request, user=self.mock_admin_user)
-
-        response = self.view(request)
+    def setUp(self):
+        from ebay.models import Charity, Item
+        from ebay.rollups import record_items_added
 
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['total_items'], 10)
-        self.assertEqual(response.data['total_charities'], 2)
-        self.assertEqual(len(response.data['items_per_charity']), 2)
-
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_get_returns_correct_items_per_charity(self, mock_item_model, mock_charity_model):
-        mock_item_model.objects.count.return_value = 15
-        mock_charity_model.objects.count.return_value = 3
-
-        mock_charity_1 = Mock()
-        mock_charity_1.name = "Charity A"
-        mock_charity_2 = Mock()
-        mock_charity_2.name = "Charity B"
-        mock_charity_3 = Mock()
-        mock_charity_3.name = "Charity C"
-
-        mock_charity_model.objects.all.return_value = [
-            mock_charity_1,
-            mock_charity_2,
-            mock_charity_3
+        self.factory = APIRequestFactory()
+        self.view = EbayReportView.as_view()
+        self.cache_patcher = patch('ebay.views.report_view.cache')
+        self.mock_cache = self.cache_patcher.start()
+        self.mock_cache.get.return_value = None
+        self.mock_admin_user = make_admin_user()
+
+        self.red_cross = Charity.objects.create(id=1, name="Red Cross", description="red cross")
+        self.unicef = Charity.objects.create(id=2, name="UNICEF", description="unicef")
+        self.empty = Charity.objects.create(id=3, name="Charity's \"Special\" Name & More <test>", description="empty")
+
+        items = [
+            Item.objects.create(ebay_id=f"RC{index}", name=f"Item {index}", price=price, web_url="https://ebay.com",
+                                charity=self.red_cross,
+                                category_list=[{"categoryId": "1", "categoryName": category}])
+            for index, (price, category) in enumerate([(10, "Books"), (20, "Books"), (30, "Toys")])
         ]
+        items.append(Item.objects.create(ebay_id="U1", name="Item U1", price=5, web_url="https://ebay.com",
+                                         charity=self.unicef,
+                                         category_list=[{"categoryId": "1", "categoryName": "Toys"}]))
+        record_items_added(items)
 
-        mock_item_model.objects.filter.return_value.count.side_effect = [10, 3, 2]
+    def tearDown(self):
+        self.cache_patcher.stop()
 
+    def get_report(self):
         request = self.factory.get('/api/report/')
         force_authenticate(request, user=self.mock_admin_user)
+        return self.view(request)
 
-        response = self.view(request)
-
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-
-        items_per_charity = response.data['items_per_charity']
-        self.assertEqual(items_per_charity[0]['name'], "Charity A")
-        self.assertEqual(items_per_charity[0]['item_count'], 10)
-        self.assertEqual(items_per_charity[1]['name'], "Charity B")
-        self.assertEqual(items_per_charity[1]['item_count'], 3)
-        self.assertEqual(items_per_charity[2]['name'], "Charity C")
-        self.assertEqual(items_per_charity[2]['item_count'], 2)
-
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_get_returns_empty_data_when_no_items_or_charities(self, mock_item_model, mock_charity_model):
-        mock_item_model.objects.count.return_value = 0
-        mock_charity_model.objects.count.return_value = 0
-        mock_charity_model.objects.all.return_value = []
-
-        request = self.factory.get('/api/report/')
-        force_authenticate(request, user=self.mock_admin_user)
+    def charity_entry(self, response, name):
+        return next(entry for entry in response.data['items_per_charity'] if entry['name'] == name)
 
-        response = self.view(request)
+    def test_get_returns_report_data(self):
+        response = self.get_report()
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['total_items'], 0)
-        self.assertEqual(response.data['total_charities'], 0)
-        self.assertEqual(response.data['items_per_charity'], [])
-
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_get_returns_charity_with_zero_items(self, mock_item_model, mock_charity_model):
-        mock_item_model.objects.count.return_value = 0
-        mock_charity_model.objects.count.return_value = 1
-
-        mock_charity = Mock()
-        mock_charity.name = "Empty Charity"
-        mock_charity_model.objects.all.return_value = [mock_charity]
-
-        mock_item_model.objects.filter.return_value.count.return_value = 0
-
-        request = self.factory.get('/api/report/')
-        force_authenticate(request, user=self.mock_admin_user)
+        self.assertEqual(response.data['total_items'], 4)
+        self.assertEqual(response.data['total_charities'], 3)
+        self.assertEqual(len(response.data['items_per_charity']), 3)
 
-        response = self.view(request)
+    def test_get_returns_correct_items_per_charity(self):
+        response = self.get_report()
 
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['items_per_charity'][0]['name'], "Empty Charity")
-        self.assertEqual(response.data['items_per_charity'][0]['item_count'], 0)
+        self.assertEqual(self.charity_entry(response, "Red Cross")['item_count'], 3)
+        self.assertEqual(self.charity_entry(response, "UNICEF")['item_count'], 1)
 
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_get_calls_item_count(self, mock_item_model, mock_charity_model):
-        mock_item_model.objects.count.return_value = 5
-        mock_charity_model.objects.count.return_value = 1
-        mock_charity_model.objects.all.return_value = []
+    def test_get_returns_charity_with_zero_items(self):
+        entry = self.charity_entry(self.get_report(), "Charity's \"Special\" Name & More <test>")
 
-        request = self.factory.get('/api/report/')
-        force_authenticate(request, user=self.mock_admin_user)
+        self.assertEqual(entry['item_count'], 0)
+        self.assertIsNone(entry['average_price'])
+        self.assertEqual(entry['category_mix'], [])
+        self.assertEqual(entry['daily'], [])
 
-        self.view(request)
+    def test_average_price_and_category_mix(self):
+        entry = self.charity_entry(self.get_report(), "Red Cross")
 
-        mock_item_model.objects.count.assert_called_once()
+        self.assertEqual(entry['average_price'], 20.0)
+        self.assertEqual(entry['category_mix'], [{"category": "Books", "count": 2}, {"category": "Toys", "count": 1}])
 
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_get_calls_charity_count(self, mock_item_model, mock_charity_model):
-        mock_item_model.objects.count.return_value = 5
-        mock_charity_model.objects.count.return_value = 1
-        mock_charity_model.objects.all.return_value = []
+    def test_daily_series_tracks_additions_and_removals(self):
+        from databasescripts.database_actions import deleteItems
+        from ebay.models import Item
 
-        request = self.factory.get('/api/report/')
-        force_authenticate(request, user=self.mock_admin_user)
+        deleteItems(Item.objects.filter(ebay_id="RC0"))
+        response = self.get_report()
+        today = timezone.localdate().isoformat()
 
-        self.view(request)
+        self.assertEqual(self.charity_entry(response, "Red Cross")['daily'],
+                         [{"day": today, "added": 3, "removed": 1}])
+        self.assertEqual(response.data['daily'], [{"day": today, "added": 4, "removed": 1}])
+        self.assertEqual(self.charity_entry(response, "Red Cross")['item_count'], 2)
+        self.assertEqual(self.charity_entry(response, "Red Cross")['average_price'], 25.0)
 
-        mock_charity_model.objects.count.assert_called_once()
+    def test_recently_sold_comes_from_archive(self):
+        from databasescripts.database_actions import deleteItems
+        from ebay.models import Item, ItemArchive
 
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_get_calls_charity_all(self, mock_item_model, mock_charity_model):
-        mock_item_model.objects.count.return_value = 5
-        mock_charity_model.objects.count.return_value = 1
-        mock_charity_model.objects.all.return_value = []
+        deleteItems(Item.objects.filter(ebay_id__in=["RC0", "RC2"]), reason=ItemArchive.REASON_DELISTED)
+        deleteItems(Item.objects.filter(ebay_id="U1"), reason=ItemArchive.REASON_REFRESHED)
+        response = self.get_report()
 
-        request = self.factory.get('/api/report/')
-        force_authenticate(request, user=self.mock_admin_user)
+        self.assertEqual(self.charity_entry(response, "Red Cross")['recently_sold'], {"count": 2, "price_total": 40.0})
+        self.assertEqual(self.charity_entry(response, "UNICEF")['recently_sold'], {"count": 0, "price_total": 0.0})
+        self.assertEqual(response.data['recently_sold'], 2)
 
-        self.view(request)
+    def test_query_count_does_not_grow_with_charities(self):
+        from ebay.models import Charity
 
-        mock_charity_model.objects.all.assert_called_once()
+        with self.assertNumQueries(4):
+            self.get_report()
 
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_get_filters_items_by_charity(self, mock_item_model, mock_charity_model):
-        mock_item_model.objects.count.return_value = 10
-        mock_charity_model.objects.count.return_value = 2
+        Charity.objects.bulk_create([Charity(id=100 + index, name=f"Charity {index}", description="bulk")
+                                     for index in range(50)])
+        with self.assertNumQueries(4):
+            response = self.get_report()
 
-        mock_charity_1 = Mock()
-        mock_charity_1.name = "Charity One"
-        mock_charity_2 = Mock()
-        mock_charity_2.name = "Charity Two"
+        self.assertEqual(response.data['total_charities'], 53)
 
-        mock_charity_model.objects.all.return_value = [mock_charity_1, mock_charity_2]
-        mock_item_model.objects.filter.return_value.count.return_value = 5
+    def test_get_response_structure(self):
+        response = self.get_report()
 
-        request = self.factory.get('/api/report/')
-        force_authenticate(request, user=self.mock_admin_user)
-
-        self.view(request)
-
-        # Verify filter was called for each charity
-        self.assertEqual(mock_item_model.objects.filter.call_count, 2)
-        mock_item_model.objects.filter.assert_any_call(charity=mock_charity_1)
-        mock_item_model.objects.filter.assert_any_call(charity=mock_charity_2)
+        self.assertIsInstance(response.data['total_items'], int)
+        self.assertIsInstance(response.data['total_charities'], int)
+        self.assertIsInstance(response.data['items_per_charity'], list)
+        for key in ('name', 'item_count', 'average_price', 'category_mix', 'daily'):
+            self.assertIn(key, response.data['items_per_charity'][0])
 
 
 class TestEbayReportViewPermissions(unittest.TestCase):
@@ -721,15 +671,11 @@ class TestEbayReportViewPermissions(unittest.TestCase):
     def setUp(self):
         self.factory = APIRequestFactory()
         self.view = EbayReportView.as_view()
-        self.disk_patcher = patch('ebay.views.report_view.disk')
-        self.mock_disk = self.disk_patcher.start()
-        self.mock_disk.get.return_value = None
+        self.cache_patcher = patch('ebay.views.report_view.cache')
+        self.mock_cache = self.cache_patcher.start()
+        self.mock_cache.get.return_value = {'total_items': 0, 'total_charities': 0, 'items_per_charity': []}
 
-        self.mock_admin_user = Mock(spec=DjangoUser)
-        self.mock_admin_user.id = 1
-        self.mock_admin_user.username = "admin"
-        self.mock_admin_user.is_staff = True
-        self.mock_admin_user.is_authenticated = True
+        self.mock_admin_user = make_admin_user()
 
         self.mock_regular_user = Mock(spec=DjangoUser)
         self.mock_regular_user.id = 2
@@ -738,7 +684,7 @@ class TestEbayReportViewPermissions(unittest.TestCase):
         self.mock_regular_user.is_authenticated = True
 
     def tearDown(self):
-        self.disk_patcher.stop()
+        self.cache_patcher.stop()
 
     def test_permission_denied_for_unauthenticated_user(self):
         request = self.factory.get('/api/report/')
@@ -755,13 +701,7 @@ class TestEbayReportViewPermissions(unittest.TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_permission_granted_for_admin_user(self, mock_item_model, mock_charity_model):
-        mock_item_model.objects.count.return_value = 0
-        mock_charity_model.objects.count.return_value = 0
-        mock_charity_model.objects.all.return_value = []
-
+    def test_permission_granted_for_admin_user(self):
         request = self.factory.get('/api/report/')
         force_authenticate(request, user=self.mock_admin_user)
 
@@ -770,124 +710,10 @@ class TestEbayReportViewPermissions(unittest.TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
 
-class TestEbayReportViewEdgeCases(unittest.TestCase):
-
-    def setUp(self):
-        self.factory = APIRequestFactory()
-        self.view = EbayReportView.as_view()
-        self.disk_patcher = patch('ebay.views.report_view.disk')
-        self.mock_disk = self.disk_patcher.start()
-        self.mock_disk.get.return_value = None
-
-        self.mock_admin_user = Mock(spec=DjangoUser)
-        self.mock_admin_user.id = 1
-        self.mock_admin_user.username = "admin"
-        self.mock_admin_user.is_staff = True
-        self.mock_admin_user.is_authenticated = True
-
-    def tearDown(self):
-        self.disk_patcher.stop()
-
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_get_with_large_number_of_charities(self, mock_item_model, mock_charity_model):
-        mock_item_model.objects.count.return_value = 1000
-        mock_charity_model.objects.count.return_value = 100
-
-        mock_charities = []
-        for i in range(100):
-            mock_charity = Mock()
-            mock_charity.name = f"Charity {i}"
-            mock_charities.append(mock_charity)
-
-        mock_charity_model.objects.all.return_value = mock_charities
-        mock_item_model.objects.filter.return_value.count.return_value = 10
-
-        request = self.factory.get('/api/report/')
-        force_authenticate(request, user=self.mock_admin_user)
-
-        response = self.view(request)
-
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['items_per_charity']), 100)
-
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_get_with_charity_special_characters_in_name(self, mock_item_model, mock_charity_model):
-        mock_item_model.objects.count.return_value = 5
-        mock_charity_model.objects.count.return_value = 1
-
-        mock_charity = Mock()
-        mock_charity.name = "Charity's \"Special\" Name & More <test>"
-        mock_charity_model.objects.all.return_value = [mock_charity]
-
-        mock_item_model.objects.filter.return_value.count.return_value = 5
-
-        request = self.factory.get('/api/report/')
-        force_authenticate(request, user=self.mock_admin_user)
-
-        response = self.view(request)
-
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(
-            response.data['items_per_charity'][0]['name'],
-            "Charity's \"Special\" Name & More <test>"
-        )
-
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_get_response_structure(self, mock_item_model, mock_charity_model):
-        mock_item_model.objects.count.return_value = 5
-        mock_charity_model.objects.count.return_value = 1
-
-        mock_charity = Mock()
-        mock_charity.name = "Test Charity"
-        mock_charity_model.objects.all.return_value = [mock_charity]
-
-        mock_item_model.objects.filter.return_value.count.return_value = 5
-
-        request = self.factory.get('/api/report/')
-        force_authenticate(request, user=self.mock_admin_user)
-
-        response = self.view(request)
-
-        self.assertIn('total_items', response.data)
-        self.assertIn('total_charities', response.data)
-        self.assertIn('items_per_charity', response.data)
-
-        self.assertIsInstance(response.data['items_per_charity'], list)
-        if len(response.data['items_per_charity']) > 0:
-            self.assertIn('name', response.data['items_per_charity'][0])
-            self.assertIn('item_count', response.data['items_per_charity'][0])
-
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_get_with_single_charity(self, mock_item_model, mock_charity_model):
-        mock_item_model.objects.count.return_value = 25
-        mock_charity_model.objects.count.return_value = 1
-
-        mock_charity = Mock()
-        mock_charity.name = "Only Charity"
-        mock_charity_model.objects.all.return_value = [mock_charity]
-
-        mock_item_model.objects.filter.return_value.count.return_value = 25
-
-        request = self.factory.get('/api/report/')
-        force_authenticate(request, user=self.mock_admin_user)
-
-        response = self.view(request)
-
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['total_items'], 25)
-        self.assertEqual(response.data['total_charities'], 1)
-        self.assertEqual(len(response.data['items_per_charity']), 1)
-        self.assertEqual(response.data['items_per_charity'][0]['item_count'], 25)
-
-
 class TestEbayReportViewInit(unittest.TestCase):
 
     def test_init_creates_instance(self):
-        with patch('ebay.views.report_view.disk'):
+        with patch('ebay.views.report_view.cache'):
             view = EbayReportView()
             self.assertIsInstance(view, EbayReportView)
 
@@ -896,184 +722,24 @@ class TestEbayReportViewInit(unittest.TestCase):
         self.assertIn(IsAdminUser, EbayReportView.permission_classes)
 
 
-class TestEbayReportViewIntegration(TestCase):
-
-    def setUp(self):
-        self.factory = APIRequestFactory()
-        self.view = EbayReportView.as_view()
-        self.disk_patcher = patch('ebay.views.report_view.disk')
-        self.mock_disk = self.disk_patcher.start()
-        self.mock_disk.get.return_value = None
-
-        self.mock_admin_user = Mock(spec=DjangoUser)
-        self.mock_admin_user.id = 1
-        self.mock_admin_user.username = "admin"
-        self.mock_admin_user.is_staff = True
-        self.mock_admin_user.is_authenticated = True
-
-    def tearDown(self):
-        self.disk_patcher.stop()
-
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_full_report_generation(self, mock_item_model, mock_charity_model):
-
-        mock_item_model.objects.count.return_value = 50
-        mock_charity_model.objects.count.return_value = 3
-
-        mock_charity_1 = Mock()
-        mock_charity_1.name = "Red Cross"
-        mock_charity_2 = Mock()
-        mock_charity_2.name = "UNICEF"
-        mock_charity_3 = Mock()
-        mock_charity_3.name = "WWF"
-
-        mock_charity_model.objects.all.return_value = [
-            mock_charity_1,
-            mock_charity_2,
-            mock_charity_3
-        ]
-
-        mock_item_model.objects.filter.return_value.count.side_effect = [20, 18, 12]
-
-        request = self.factory.get('/api/report/')
-        force_authenticate(request, user=self.mock_admin_user)
-
-        response = self.view(request)
-
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['total_items'], 50)
-        self.assertEqual(response.data['total_charities'], 3)
-
-        items_per_charity = response.data['items_per_charity']
-        self.assertEqual(len(items_per_charity), 3)
-
-        charity_names = [entry['name'] for entry in items_per_charity]
-        self.assertIn("Red Cross", charity_names)
-        self.assertIn("UNICEF", charity_names)
-        self.assertIn("WWF", charity_names)
-
-        total_items_in_charities = sum(entry['item_count'] for entry in items_per_charity)
-        self.assertEqual(total_items_in_charities, 50)
-
+############################# Report Cache Tests ##################################
 
-class TestEbayReportViewDataTypes(unittest.TestCase):
+class TestEbayReportCaching(TestCase):
 
     def setUp(self):
         self.factory = APIRequestFactory()
         self.view = EbayReportView.as_view()
-        self.disk_patcher = patch('ebay.views.report_view.disk')
-        self.mock_disk = self.disk_patcher.start()
-        self.mock_disk.get.return_value = None
-
-        self.mock_admin_user = Mock(spec=DjangoUser)
-        self.mock_admin_user.id = 1
-        self.mock_admin_user.username = "admin"
-        self.mock_admin_user.is_staff = True
-        self.mock_admin_user.is_authenticated = True
+        self.cache_patcher = patch('ebay.views.report_view.cache')
+        self.mock_cache = self.cache_patcher.start()
+        self.mock_admin_user = make_admin_user()
 
     def tearDown(self):
-        self.disk_patcher.stop()
-
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_total_items_is_integer(self, mock_item_model, mock_charity_model):
-        mock_item_model.objects.count.return_value = 10
-        mock_charity_model.objects.count.return_value = 0
-        mock_charity_model.objects.all.return_value = []
-
-        request = self.factory.get('/api/report/')
-        force_authenticate(request, user=self.mock_admin_user)
-
-        response = self.view(request)
-
-        self.assertIsInstance(response.data['total_items'], int)
-
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_total_charities_is_integer(self, mock_item_model, mock_charity_model):
-        mock_item_model.objects.count.return_value = 0
-        mock_charity_model.objects.count.return_value = 5
-        mock_charity_model.objects.all.return_value = []
-
-        request = self.factory.get('/api/report/')
-        force_authenticate(request, user=self.mock_admin_user)
-
-        response = self.view(request)
-
-        self.assertIsInstance(response.data['total_charities'], int)
-
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_items_per_charity_is_list(self, mock_item_model, mock_charity_model):
-        mock_item_model.objects.count.return_value = 0
-        mock_charity_model.objects.count.return_value = 0
-        mock_charity_model.objects.all.return_value = []
+        self.cache_patcher.stop()
 
+    def get_report(self):
         request = self.factory.get('/api/report/')
         force_authenticate(request, user=self.mock_admin_user)
-
-        response = self.view(request)
-
-        self.assertIsInstance(response.data['items_per_charity'], list)
-
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_charity_name_is_string(self, mock_item_model, mock_charity_model):
-        mock_item_model.objects.count.return_value = 5
-        mock_charity_model.objects.count.return_value = 1
-
-        mock_charity = Mock()
-        mock_charity.name = "Test Charity"
-        mock_charity_model.objects.all.return_value = [mock_charity]
-
-        mock_item_model.objects.filter.return_value.count.return_value = 5
-
-        request = self.factory.get('/api/report/')
-        force_authenticate(request, user=self.mock_admin_user)
-
-        response = self.view(request)
-
-        self.assertIsInstance(response.data['items_per_charity'][0]['name'], str)
-
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_item_count_is_integer(self, mock_item_model, mock_charity_model):
-        mock_item_model.objects.count.return_value = 5
-        mock_charity_model.objects.count.return_value = 1
-
-        mock_charity = Mock()
-        mock_charity.name = "Test Charity"
-        mock_charity_model.objects.all.return_value = [mock_charity]
-
-        mock_item_model.objects.filter.return_value.count.return_value = 5
-
-        request = self.factory.get('/api/report/')
-        force_authenticate(request, user=self.mock_admin_user)
-
-        response = self.view(request)
-
-        self.assertIsInstance(response.data['items_per_charity'][0]['item_count'], int)
-
-
-############################# Report Cache Tests ##################################
-
-class TestEbayReportCaching(unittest.TestCase):
-
-    def setUp(self):
-        self.factory = APIRequestFactory()
-        self.view = EbayReportView.as_view()
-        self.disk_patcher = patch('ebay.views.report_view.disk')
-        self.mock_disk = self.disk_patcher.start()
-
-        self.mock_admin_user = Mock(spec=DjangoUser)
-        self.mock_admin_user.id = 1
-        self.mock_admin_user.username = "admin"
-        self.mock_admin_user.is_staff = True
-        self.mock_admin_user.is_authenticated = True
-
-    def tearDown(self):
-        self.disk_patcher.stop()
+        return self.view(request)
 
     def test_get_returns_cached_report_on_cache_hit(self):
         cached_report = {
@@ -1081,71 +747,32 @@ class TestEbayReportCaching(unittest.TestCase):
             'total_charities': 2,
             'items_per_charity': [{"name": "Cached", "item_count": 10}]
         }
-        self.mock_disk.get.return_value = cached_report
+        self.mock_cache.get.return_value = cached_report
 
-        request = self.factory.get('/api/report/')
-        force_authenticate(request, user=self.mock_admin_user)
-
-        response = self.view(request)
+        response = self.get_report()
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, cached_report)
-        self.mock_disk.get.assert_called_once_with('report_data')
+        self.mock_cache.get.assert_called_once_with('report_data')
 
     def test_get_does_not_query_db_on_cache_hit(self):
-        self.mock_disk.get.return_value = {'total_items': 5, 'total_charities': 1, 'items_per_charity': []}
-
-        with patch('ebay.views.report_view.Item') as mock_item, \
-             patch('ebay.views.report_view.Charity') as mock_charity:
-            request = self.factory.get('/api/report/')
-            force_authenticate(request, user=self.mock_admin_user)
-
-            self.view(request)
-
-            mock_item.objects.count.assert_not_called()
-            mock_charity.objects.count.assert_not_called()
-
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_get_sets_cache_on_cache_miss(self, mock_item_model, mock_charity_model):
-        self.mock_disk.get.return_value = None
-
-        mock_item_model.objects.count.return_value = 5
-        mock_charity_model.objects.count.return_value = 1
-        mock_charity = Mock()
-        mock_charity.name = "Test"
-        mock_charity_model.objects.all.return_value = [mock_charity]
-        mock_item_model.objects.filter.return_value.count.return_value = 5
+        self.mock_cache.get.return_value = {'total_items': 5, 'total_charities': 1, 'items_per_charity': []}
 
-        request = self.factory.get('/api/report/')
-        force_authenticate(request, user=self.mock_admin_user)
+        with self.assertNumQueries(0):
+            self.get_report()
 
-        self.view(request)
+    def test_get_sets_cache_on_cache_miss(self):
+        from ebay.models import Charity
 
-        self.mock_disk.set.assert_called_once()
-        call_args = self.mock_disk.set.call_args
-        self.assertEqual(call_args[0][0], 'report_data')
-        self.assertEqual(call_args[0][2], 60 * 30)
+        self.mock_cache.get.return_value = None
+        Charity.objects.create(id=1, name="Charity A", description="a")
 
-    @patch('ebay.views.report_view.Charity')
-    @patch('ebay.views.report_view.Item')
-    def test_get_caches_correct_data(self, mock_item_model, mock_charity_model):
-        self.mock_disk.get.return_value = None
-
-        mock_item_model.objects.count.return_value = 10
-        mock_charity_model.objects.count.return_value = 1
-        mock_charity = Mock()
-        mock_charity.name = "Charity A"
-        mock_charity_model.objects.all.return_value = [mock_charity]
-        mock_item_model.objects.filter.return_value.count.return_value = 10
-
-        request = self.factory.get('/api/report/')
-        force_authenticate(request, user=self.mock_admin_user)
-
-        self.view(request)
+        self.get_report()
 
-        cached_data = self.mock_disk.set.call_args[0][1]
-        self.assertEqual(cached_data['total_items'], 10)
+        self.mock_cache.set.assert_called_once()
+        key, cached_data, ttl = self.mock_cache.set.call_args[0]
+        self.assertEqual(key, 'report_data')
+        self.assertEqual(ttl, 60)
         self.assertEqual(cached_data['total_charities'], 1)
         self.assertEqual(cached_data['items_per_charity'][0]['name'], "Charity A")
 
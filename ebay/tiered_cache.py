@@ -0,0 +1,272 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+logger = logging.getLogger(__name__)
+TIERS = ('local', 'shared', 'miss')
+STATS_KEY_PREFIX = 'cache_stats_'
+STATS_FLUSH_SECONDS = 10
+RESUBSCRIBE_DELAY = 5
+
+
+class LocalLRU:
+    """Bounded in-process LRU whose entries also expire after a few seconds."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            return self.entries.pop(key, None) is not None
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class LocalTier:
+    """Process-wide state behind TieredCache; Django builds a cache instance per thread."""
+
+    def __init__(self, max_entries):
+        self.pid = os.getpid()
+        self.lru = LocalLRU(max_entries)
+        self.instance_id = uuid.uuid4().hex
+        self.counts = Counter()
+        self.counts_lock = threading.Lock()
+        self.flushed_at = time.monotonic()
+        self.listener = None
+        self.listener_lock = threading.Lock()
+        self.redis = None
+
+
+_local_tiers = {}
+_local_tiers_lock = threading.Lock()
+
+
+def local_tier(name, max_entries):
+    with _local_tiers_lock:
+        # a forked worker must not inherit its parent's entries or (dead) subscriber thread
+        if name not in _local_tiers or _local_tiers[name].pid != os.getpid():
+            _local_tiers[name] = LocalTier(max_entries)
+        return _local_tiers[name]
+
+
+class TieredCache(BaseCache):
+    """A small per-process LRU in front of a shared cache alias (Redis).
+
+    Local entries live for LOCAL_TIMEOUT seconds at most. Sets and deletes
+    are published on CHANNEL so every other process drops its local copy;
+    with no channel configured, LOCAL_TIMEOUT alone bounds staleness. clear() only
+    empties the local tier everywhere, because the shared Redis database
+    also holds generations, favorites and the job queue.
+
+    Hits per tier are flushed to the shared cache every few seconds; see
+    tier_stats() and the cache_stats command.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = options.get('SHARED_CACHE', 'default')
+        self.local_timeout = options.get('LOCAL_TIMEOUT', 30)
+        self.channel = options.get('CHANNEL')
+        self.max_entries = options.get('LOCAL_MAX_ENTRIES', 500)
+
+    @property
+    def tier(self):
+        return local_tier((self.shared_alias, self.key_prefix, self.channel), self.max_entries)
+
+    @property
+    def local(self):
+        return self.tier.lru
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def local_ttl(self, timeout):
+        return self.local_timeout if timeout is None else min(self.local_timeout, timeout)
+
+    def local_key(self, key, version):
+        return self.make_key(key, version=version)
+
+    def get(self, key, default=None, version=None):
+        self.ensure_listener()
+        local_key = self.local_key(key, version)
+        value = self.local.get(local_key)
+        if value is not None:
+            self.record('local')
+            return value
+
+        try:
+            value = self.shared.get(key, version=version)
+        except Exception as e:
+            logger.error(f"Error reading shared cache: {e}")
+            value = None
+
+        if value is None:
+            self.record('miss')
+            return default
+
+        self.record('shared')
+        self.local.set(local_key, value, self.local_timeout)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.ensure_listener()
+        timeout = self.get_backend_timeout(timeout)
+        try:
+            self.shared.set(key, value, timeout, version=version)
+        except Exception as e:
+            logger.error(f"Error writing shared cache: {e}")
+
+        local_key = self.local_key(key, version)
+        self.local.set(local_key, value, self.local_ttl(timeout))
+        # other processes may still hold the value this overwrites
+        self.publish({'keys': [local_key]})
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self.get_backend_timeout(timeout)
+        try:
+            added = self.shared.add(key, value, timeout, version=version)
+        except Exception as e:
+            logger.error(f"Error writing shared cache: {e}")
+            return False
+
+        if added:
+            self.local.set(self.local_key(key, version), value, self.local_ttl(timeout))
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        try:
+            return self.shared.touch(key, self.get_backend_timeout(timeout), version=version)
+        except Exception as e:
+            logger.error(f"Error touching shared cache: {e}")
+            return False
+
+    def delete(self, key, version=None):
+        return self.delete_many([key], version=version) > 0
+
+    def delete_many(self, keys, version=None):
+        local_keys = [self.local_key(key, version) for key in keys]
+        deleted = sum(self.local.delete(key) for key in local_keys)
+        try:
+            self.shared.delete_many(keys, version=version)
+        except Exception as e:
+            logger.error(f"Error deleting from shared cache: {e}")
+        self.publish({'keys': local_keys})
+        return deleted
+
+    def has_key(self, key, version=None):
+        return self.get(key, version=version) is not None
+
+    def clear(self):
+        self.local.clear()
+        self.publish({'clear': True})
+
+    def redis(self):
+        from ebay.worker import get_redis
+
+        tier = self.tier
+        if tier.redis is None:
+            tier.redis = get_redis()
+        return tier.redis
+
+    def publish(self, message):
+        if not self.channel:
+            return
+
+        try:
+            self.redis().publish(self.channel, json.dumps({'origin': self.tier.instance_id, **message}))
+        except Exception as e:
+            logger.error(f"Error publishing cache invalidation: {e}")
+
+    def apply_invalidation(self, data):
+        message = json.loads(data)
+        if message.get('origin') == self.tier.instance_id:
+            return
+        if message.get('clear'):
+            self.local.clear()
+        for key in message.get('keys', ()):
+            self.local.delete(key)
+
+    def ensure_listener(self):
+        tier = self.tier
+        if not self.channel or tier.listener is not None:
+            return
+
+        with tier.listener_lock:
+            if tier.listener is None:
+                # started lazily so forked workers each get their own subscriber
+                tier.listener = threading.Thread(target=self.listen, name='cache-invalidation', daemon=True)
+                tier.listener.start()
+
+    def listen(self):
+        while True:
+            try:
+                pubsub = self.redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    self.apply_invalidation(message['data'])
+            except Exception as e:
+                logger.error(f"Cache invalidation subscriber disconnected: {e}")
+            # anything published while disconnected was missed
+            self.local.clear()
+            time.sleep(RESUBSCRIBE_DELAY)
+
+    def record(self, name):
+        tier = self.tier
+        with tier.counts_lock:
+            tier.counts[name] += 1
+            if time.monotonic() - tier.flushed_at < STATS_FLUSH_SECONDS:
+                return
+            counts, tier.counts = tier.counts, Counter()
+            tier.flushed_at = time.monotonic()
+        self.flush_stats(counts)
+
+    def flush_stats(self, counts):
+        try:
+            for tier, count in counts.items():
+                key = STATS_KEY_PREFIX + tier
+                try:
+                    self.shared.incr(key, count)
+                except ValueError:
+                    self.shared.add(key, count, None)
+        except Exception as e:
+            logger.error(f"Error recording cache stats: {e}")
+
+
+def tier_stats(shared):
+    """Lookups answered by each tier across all processes, with their share of the total."""
+    found = shared.get_many([STATS_KEY_PREFIX + tier for tier in TIERS])
+    counts = {tier: int(found.get(STATS_KEY_PREFIX + tier, 0)) for tier in TIERS}
+    total = sum(counts.values())
+    return {tier: {'count': count, 'ratio': round(count / total, 4) if total else 0.0}
+            for tier, count in counts.items()}
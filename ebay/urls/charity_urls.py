@@ -1,9 +1,10 @@
 from django.urls import path
-from ebay.views.charity_views import EbayCharity
+from ebay.views.charity_views import EbayCharity, CharityDeletionStatus
 
 urlpatterns = [
     path('getCharities/', EbayCharity.as_view()),
     path('addCharity/', EbayCharity.as_view()),
     path('deleteCharity/<int:charity_id>', EbayCharity.as_view()),
+    path('deleteCharity/<int:charity_id>/status', CharityDeletionStatus.as_view()),
     path('updateCharity/<int:charity_id>', EbayCharity.as_view()),
 ]
\ No newline at end of file
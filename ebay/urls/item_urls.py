@@ -1,5 +1,7 @@
 from django.urls import path, register_converter
 from ebay.views.item_views import EbayCharityItems
+from ebay.views.suggest_view import ItemSuggestView
+from ebay.views.facet_view import ItemFacetView
 
 class CategoryWithSlashConverter:
     regex = "[a-zA-ZÀ-ÿ,&(): /'-]+"
@@ -13,6 +15,8 @@ class CategoryWithSlashConverter:
 register_converter(CategoryWithSlashConverter, "cat")
 
 urlpatterns = [
+    path('suggest/', ItemSuggestView.as_view()),
+    path('facets/', ItemFacetView.as_view()),
     path('ebaycharityitems/<str:item_id>', EbayCharityItems.as_view()),
     path('ebaycharityitems/search/<str:search_text>', EbayCharityItems.as_view()),
     path('ebaycharityitems/category/<cat:category_id>/<str:filter>', EbayCharityItems.as_view()),
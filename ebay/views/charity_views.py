@@ -2,26 +2,56 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from ebay.serializers import CharitySerializer
 from ebay.models import Charity
-from databasescripts.database_actions import deleteCharity, addCharity
+from databasescripts.database_actions import deleteCharity, addCharity, charityDeletionJobId
+from ebay.fieldsets import requested_fields, model_columns, fieldset_key
+from ebay.favorites_cache import users_favoriting, invalidate_users
+from ebay.generations import bump, namespace
 from django.core.cache import caches
+from rest_framework.permissions import IsAdminUser
+from rq.exceptions import NoSuchJobError
+from rq.job import Job
+from ebay.worker import get_redis
 
-disk = caches['diskcache']
+cache = caches['tiered']
 CHARITIES_CACHE_KEY = 'charities_list'
+# generation shared by the fieldset variants of the list
+CHARITIES_CACHE_SCOPE = 'charities'
 CHARITIES_CACHE_TTL = 60 * 60
 
+
+def invalidate_charities():
+    cache.delete(CHARITIES_CACHE_KEY)
+    bump([CHARITIES_CACHE_SCOPE])
+
 class EbayCharity(APIView):
+    # not read_replica: a read right after invalidate_charities() could refill the cache from a lagging replica
 
     def __init__(self):
         super().__init__()
 
     def get(self, request):
-        cached = disk.get(CHARITIES_CACHE_KEY)
+        fields = requested_fields(request, CharitySerializer)
+        if fields is not None:
+            return self.get_fieldset(fields)
+
+        cached = cache.get(CHARITIES_CACHE_KEY)
         if cached is not None:
             return Response(cached)
 
-        charities = Charity.objects.all()
+        charities = Charity.objects.filter(is_hidden=False)
         serializer = CharitySerializer(charities, many=True)
-        disk.set(CHARITIES_CACHE_KEY, serializer.data, CHARITIES_CACHE_TTL)
+        cache.set(CHARITIES_CACHE_KEY, serializer.data, CHARITIES_CACHE_TTL)
+        return Response(serializer.data)
+
+    def get_fieldset(self, fields):
+        cache_key = f'{CHARITIES_CACHE_KEY}{fieldset_key(fields)}{namespace(CHARITIES_CACHE_SCOPE)}'
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return Response(cached)
+
+        charities = Charity.objects.filter(is_hidden=False).only(*model_columns(Charity, fields))
+        serializer = CharitySerializer(charities, many=True, fields=fields)
+        cache.set(cache_key, serializer.data, CHARITIES_CACHE_TTL)
         return Response(serializer.data)
 
     def post(self, request):
@@ -29,7 +59,7 @@ class EbayCharity(APIView):
         add = addCharity(request.data)
 
         if add == "Success":
-            disk.delete(CHARITIES_CACHE_KEY)
+            invalidate_charities()
             return Response("Sucesfully added charity", status=201)
         else:
             return Response("Failed to add charity", status=400)
@@ -39,8 +69,8 @@ class EbayCharity(APIView):
         charity_delete = deleteCharity(charity_id)
 
         if charity_delete == "Success":
-            disk.delete(CHARITIES_CACHE_KEY)
-            return Response(status=204)
+            invalidate_charities()
+            return Response({"job_id": charityDeletionJobId(charity_id)}, status=202)
         else:
             return Response(charity_delete, status=500)
 
@@ -55,19 +85,26 @@ class EbayCharity(APIView):
             charity.image_url = request.data['image_url']
 
             charity.save()
-            disk.delete(CHARITIES_CACHE_KEY)
+            invalidate_charities()
+            invalidate_users(users_favoriting(charity_ids=[charity.id]))
             return Response(status=204)
 
         except Exception as e:
             return Response(f"{e}", status=500)
-            
-
-
 
 
+class CharityDeletionStatus(APIView):
+    permission_classes = [IsAdminUser]
 
-        
-
-        
-
+    def get(self, request, charity_id):
 
+        try:
+            job = Job.fetch(charityDeletionJobId(charity_id), connection=get_redis())
+        except NoSuchJobError:
+            return Response("No deletion job for this charity", status=404)
+
+        return Response({
+            "status": job.get_status(),
+            "deleted": job.meta.get("deleted", 0),
+            "total": job.meta.get("total"),
+        })
@@ -0,0 +1,18 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from ebay.facets import get_facets
+
+
+class ItemFacetView(APIView):
+    read_replica = True
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        category = request.query_params.get('category') or None
+        filter = request.query_params.get('filter') or None
+
+        if filter is not None and category is None:
+            return Response("filter requires a category", status=400)
+
+        facets = get_facets(query=query, category=category, filter=filter)
+        return Response({"query": query, "category": category, "filter": filter, "facets": facets})
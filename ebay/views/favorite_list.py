@@ -1,15 +1,68 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from ebay.models import FavoriteList, Item, User
+from django.db import transaction
+from django.db.models import Prefetch
+from rest_framework.permissions import IsAuthenticated
+from ebay.models import Charity, FavoriteList, Item
 from ebay.serializers import FavoriteListSerializer, CharitySerializer, ItemSerializer
+from ebay.fieldsets import requested_fields, model_columns
+from ebay.pagination import ItemPageNumberPagination
+from ebay.favorites_cache import get_favorite_ids, get_favorites_payload, invalidate_users
 
 class FavoriteListView(APIView):
     
     def get(self, request):
-        user = User.objects.get(username=request.user)
-        favorite_list = FavoriteList.objects.get(user=user.id)
-        serializer = FavoriteListSerializer(favorite_list, many=False)
-        return Response(serializer.data)
+        """Favorites for the current user.
+
+        ?ids_only=1 returns just the favorited ebay_ids and charity ids.
+        ?page= paginates the items. ?fields=/?exclude= narrow the favorited
+        items and ?charity_fields=/?charity_exclude= narrow the charities.
+        """
+        if request.query_params.get('ids_only') in ('1', 'true'):
+            return Response(get_favorite_ids(request.user.id, self.favorite_ids))
+
+        item_fields = requested_fields(request, ItemSerializer)
+        charity_fields = requested_fields(request, CharitySerializer, prefix='charity_')
+        paginate = ItemPageNumberPagination.page_query_param in request.query_params
+
+        if item_fields is None and charity_fields is None and not paginate:
+            return Response(get_favorites_payload(
+                request.user.id, lambda: self.favorites_data(request, None, None, False)
+            ))
+        return Response(self.favorites_data(request, item_fields, charity_fields, paginate))
+
+    def favorites_data(self, request, item_fields, charity_fields, paginate):
+        items = Item.objects.only(*model_columns(Item, item_fields or ItemSerializer().fields))
+        charities = Charity.objects.only(*model_columns(Charity, charity_fields or CharitySerializer().fields))
+
+        favorite_lists = FavoriteList.objects.prefetch_related(Prefetch('charities', queryset=charities))
+        if not paginate:
+            favorite_lists = favorite_lists.prefetch_related(Prefetch('items', queryset=items))
+
+        favorite_list = favorite_lists.get(user_id=request.user.id)
+        serializer = FavoriteListSerializer(favorite_list, many=False, item_fields=item_fields,
+                                            charity_fields=charity_fields, include_items=not paginate)
+        data = serializer.data
+
+        if paginate:
+            paginator = ItemPageNumberPagination()
+            page = paginator.paginate_queryset(items.filter(favoritelist=favorite_list).order_by('-id'), request, self)
+            data['items'] = paginator.get_paginated_response(
+                ItemSerializer(page, many=True, fields=item_fields).data
+            ).data
+
+        return data
+
+    def favorite_ids(self, user_id):
+        FavoriteItem = FavoriteList.items.through
+        FavoriteCharity = FavoriteList.charities.through
+
+        return {
+            "items": list(FavoriteItem.objects.filter(favoritelist__user_id=user_id)
+                          .values_list('item__ebay_id', flat=True)),
+            "charities": list(FavoriteCharity.objects.filter(favoritelist__user_id=user_id)
+                              .values_list('charity_id', flat=True)),
+        }
     
     def post(self, request):
         data = request.data  
@@ -45,3 +98,91 @@ class FavoriteListView(APIView):
         favorite_list.save()
         serializer = FavoriteListSerializer(favorite_list, many=False)
         return Response(serializer.data)
+
+
+MAX_FAVORITES_BATCH = 500
+
+
+class FavoriteBatchView(APIView):
+    """Add and remove many favorites at once.
+
+    Body: {"add": {"items": [ebay_id, ...], "charities": [id, ...]}, "remove": {...}}.
+    The response lists only what changed, plus any ids that did not resolve.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            add = self.parse_section(request.data.get('add'))
+            remove = self.parse_section(request.data.get('remove'))
+        except ValueError as e:
+            return Response(f"{e}", status=400)
+
+        if sum(len(ids) for section in (add, remove) for ids in section.values()) > MAX_FAVORITES_BATCH:
+            return Response(f"At most {MAX_FAVORITES_BATCH} ids per batch", status=400)
+
+        favorite_list_id = FavoriteList.objects.filter(user_id=request.user.id).values_list('id', flat=True).first()
+        if favorite_list_id is None:
+            return Response("Favorite list not found", status=404)
+
+        item_ids = self.resolve_items(add['items'] + remove['items'])
+        charity_ids = set(Charity.objects.filter(id__in=add['charities'] + remove['charities'])
+                          .values_list('id', flat=True))
+
+        with transaction.atomic():
+            items = self.apply(FavoriteList.items.through, 'item_id', favorite_list_id,
+                               {item_ids[ebay_id]: ebay_id for ebay_id in add['items'] if ebay_id in item_ids},
+                               {item_ids[ebay_id]: ebay_id for ebay_id in remove['items'] if ebay_id in item_ids})
+            charities = self.apply(FavoriteList.charities.through, 'charity_id', favorite_list_id,
+                                   {charity_id: charity_id for charity_id in add['charities'] if charity_id in charity_ids},
+                                   {charity_id: charity_id for charity_id in remove['charities']
+                                    if charity_id in charity_ids})
+
+        if any(items) or any(charities):
+            invalidate_users([request.user.id])
+
+        return Response({
+            "added": {"items": items[0], "charities": charities[0]},
+            "removed": {"items": items[1], "charities": charities[1]},
+            "missing": {
+                "items": sorted({ebay_id for ebay_id in add['items'] + remove['items'] if ebay_id not in item_ids}),
+                "charities": sorted({charity_id for charity_id in add['charities'] + remove['charities']
+                                     if charity_id not in charity_ids}),
+            },
+        })
+
+    def parse_section(self, section):
+        section = section or {}
+        if not isinstance(section, dict):
+            raise ValueError("add and remove must be objects")
+
+        items, charities = section.get('items', []), section.get('charities', [])
+        if not isinstance(items, list) or not isinstance(charities, list):
+            raise ValueError("items and charities must be lists")
+
+        try:
+            return {"items": [str(ebay_id) for ebay_id in items], "charities": [int(charity_id) for charity_id in charities]}
+        except (TypeError, ValueError):
+            raise ValueError("charity ids must be integers")
+
+    def resolve_items(self, ebay_ids):
+        return dict(Item.objects.filter(ebay_id__in=ebay_ids).values_list('ebay_id', 'id'))
+
+    def apply(self, through, column, favorite_list_id, to_add, to_remove):
+        """Bulk insert/delete rows of an M2M through table; returns the (added, removed) public ids."""
+        to_add = {key: value for key, value in to_add.items() if key not in to_remove}
+        rows = through.objects.filter(favoritelist_id=favorite_list_id)
+        existing = set(rows.filter(**{f'{column}__in': list(to_add) + list(to_remove)})
+                       .values_list(column, flat=True))
+
+        added = [key for key in to_add if key not in existing]
+        removed = [key for key in to_remove if key in existing]
+
+        if added:
+            through.objects.bulk_create(
+                [through(favoritelist_id=favorite_list_id, **{column: key}) for key in added], ignore_conflicts=True
+            )
+        if removed:
+            rows.filter(**{f'{column}__in': removed}).delete()
+
+        return [to_add[key] for key in added], [to_remove[key] for key in removed]
@@ -1,79 +1,117 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from ebay.models import Item
-from ebay.serializers import ItemSerializer
+from ebay.serializers import ItemSerializer, ItemListSerializer
 from databasescripts.database_actions import retrieveItem, getItemsBySubCategory, getItemsByFilter
-from rest_framework.pagination import PageNumberPagination
+from ebay.pagination import ItemPageNumberPagination, KeysetPagination, wants_cursor_pagination
+from ebay.listing import listing_options
 from django.core.cache import caches
-from ebay.search import search
+from ebay.search import RANK_FIELD, is_ranked, search
+from ebay.counts import category_count, queryset_count
+from ebay.fieldsets import requested_fields, model_columns, fieldset_key
+from ebay.fragments import card_fragments, detail_fragment, splice_results, json_response
+from ebay.single_flight import get_or_fill
+from ebay.db_routing import primary_reads
+from ebay.generations import GLOBAL_SCOPE, category_scope, charity_scope, is_current, namespace, stamp
 
-disk = caches['diskcache']
+cache = caches['tiered']
 ITEM_DETAIL_TTL = 60 * 30
 ITEM_SEARCH_TTL = 60 * 15
 ITEM_CATEGORY_TTL = 60 * 1440
+# how long past those a page may still be served while it is recomputed
+ITEM_SEARCH_STALE_TTL = 60 * 45
+ITEM_CATEGORY_STALE_TTL = 60 * 1440
 
 class EbayCharityItems(APIView):
-
-    paginator = PageNumberPagination()
-    paginator.page_size = 50
+    read_replica = True
 
     def get(self, request, item_id=None, search_text=None, category_id=None, filter=None):
 
         if item_id is not None:
-            cache_key = f'item_{item_id}'
-            cached = disk.get(cache_key)
-            if cached is not None:
-                return Response(cached)
+            fields = requested_fields(request, ItemSerializer)
+            cache_key = f'item_{item_id}{fieldset_key(fields)}'
+            # the charity isn't known until the item is read, so its generation is stored with the page
+            cached = cache.get(cache_key)
+            if isinstance(cached, tuple) and is_current(cached[0]):
+                return self.cached_response(cached[1])
+
+            if fields is None:
+                with primary_reads():
+                    found = detail_fragment(item_id, with_charity=True)
+                if found is None:
+                    return Response("Item not found", status=404)
+                charity_id, body = found
+                cache.set(cache_key, (stamp(charity_scope(charity_id)), body), ITEM_DETAIL_TTL)
+                return json_response(body)
 
-            item = retrieveItem(item_id)
+            with primary_reads():
+                item = retrieveItem(item_id, only=[*model_columns(Item, fields), 'charity_id'])
             if item is not None:
-                serializer = ItemSerializer(item)
-                disk.set(cache_key, serializer.data, ITEM_DETAIL_TTL)
+                serializer = ItemSerializer(item, fields=fields)
+                cache.set(cache_key, (stamp(charity_scope(item.charity_id)), serializer.data), ITEM_DETAIL_TTL)
                 return Response(serializer.data)
             else:
                 return Response("Item not found", status=404)
 
         elif search_text is not None:
-            page = request.query_params.get('page', 1)
-            cache_key = f'items_search_{search_text}_p{page}'
-            cached = disk.get(cache_key)
-            if cached is not None:
-                return Response(cached)
-
-            items = search(search_text)
-            paginated_items = self.paginator.paginate_queryset(items, request, self)
-            serializer = ItemSerializer(paginated_items, many=True)
-            response = self.paginator.get_paginated_response(serializer.data)
-            disk.set(cache_key, response.data, ITEM_SEARCH_TTL)
-            return response
+            return self.paginated_response(
+                request, lambda: search(search_text), f'items_search_{search_text}{namespace(GLOBAL_SCOPE)}',
+                (ITEM_SEARCH_TTL, ITEM_SEARCH_STALE_TTL), queryset_count,
+                ranked_by=RANK_FIELD if is_ranked(search_text) else None
+            )
 
         elif category_id is not None:
-            page = request.query_params.get('page', 1)
+            generation = namespace(category_scope(category_id))
 
             if filter is None:
-                cache_key = f'items_cat_{category_id}_p{page}'
-                cached = disk.get(cache_key)
-                if cached is not None:
-                    return Response(cached)
-
-                items = getItemsBySubCategory(category_id)
-                paginated_items = self.paginator.paginate_queryset(items, request, self)
-                serializer = ItemSerializer(paginated_items, many=True)
-                response = self.paginator.get_paginated_response(serializer.data)
-                disk.set(cache_key, response.data, ITEM_CATEGORY_TTL)
-                return response
+                return self.paginated_response(
+                    request, lambda: getItemsBySubCategory(category_id), f'items_cat_{category_id}{generation}',
+                    (ITEM_CATEGORY_TTL, ITEM_CATEGORY_STALE_TTL), lambda items: category_count(category_id)
+                )
             else:
-                cache_key = f'items_cat_{category_id}_f_{filter}_p{page}'
-                cached = disk.get(cache_key)
-                if cached is not None:
-                    return Response(cached)
-
-                items = getItemsByFilter(category_id, filter)
-                paginated_items = self.paginator.paginate_queryset(items, request, self)
-                serializer = ItemSerializer(paginated_items, many=True)
-                response = self.paginator.get_paginated_response(serializer.data)
-                disk.set(cache_key, response.data, ITEM_CATEGORY_TTL)
-                return response
+                return self.paginated_response(
+                    request, lambda: getItemsByFilter(category_id, filter),
+                    f'items_cat_{category_id}_f_{filter}{generation}', (ITEM_CATEGORY_TTL, ITEM_CATEGORY_STALE_TTL),
+                    lambda items: queryset_count(items, category_scope(category_id))
+                )
+
+        else:
+            return Response("Please provide an item_id, search_text, or category_id", status=400)
+
+    def cached_response(self, cached):
+        if isinstance(cached, bytes):
+            return json_response(cached)
+        return Response(cached)
 
+    def paginated_response(self, request, get_items, cache_prefix, ttls, get_count, ranked_by=None):
+        fields = requested_fields(request, ItemSerializer, default_fields=ItemListSerializer.Meta.fields)
+        options = listing_options(request)
+        cursor_mode = wants_cursor_pagination(request)
+        if cursor_mode:
+            paginator = KeysetPagination(*options.keyset_order(ranked_by))
         else:
-            return Response("Please provide an item_id, search_text, or category_id", status=400)
\ No newline at end of file
+            paginator = ItemPageNumberPagination()
+        cache_key = f'{cache_prefix}{options.cache_key()}_{paginator.cache_key(request)}{fieldset_key(fields)}'
+
+        def render_page():
+            items = options.apply(get_items())
+            if fields is None:
+                items = items.only('id', 'card_json', *options.sort_fields())
+            else:
+                items = items.only(*model_columns(Item, fields), *options.sort_fields())
+
+            if cursor_mode:
+                paginated_items = paginator.paginate_queryset(items, request, self)
+            else:
+                count = queryset_count(items) if options.needs_count() else get_count(items)
+                paginated_items = paginator.paginate_queryset(items, request, self, count=count)
+
+            if fields is None:
+                envelope = paginator.get_paginated_response([]).data
+                return splice_results(envelope, card_fragments(paginated_items))
+
+            serializer = ItemSerializer(paginated_items, many=True, fields=fields)
+            return paginator.get_paginated_response(serializer.data).data
+
+        # one request per page recomputes it; others wait for a missing page or get the stale one
+        return self.cached_response(get_or_fill(cache, cache_key, render_page, *ttls))
@@ -1,13 +1,20 @@
+from collections import defaultdict
+import datetime
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from ebay.models import Item
-from ebay.models import Charity
+from ebay.models import Charity, CharityDailyStats, FacetCount, ItemArchive
+from django.db.models import Count, Sum
 from rest_framework.permissions import IsAdminUser
 from django.core.cache import caches
+from django.utils import timezone
+from ebay.db_routing import primary_reads
+from ebay.generations import GLOBAL_SCOPE, namespace
 
-disk = caches['diskcache']
+cache = caches['tiered']
 REPORT_CACHE_KEY = 'report_data'
-REPORT_CACHE_TTL = 60 * 30
+REPORT_CACHE_TTL = 60
+REPORT_DAYS = 30
+CATEGORY_MIX_SIZE = 10
 
 
 class EbayReportView(APIView):
@@ -15,27 +22,82 @@ class EbayReportView(APIView):
         super().__init__()
 
     permission_classes = [IsAdminUser]
+    read_replica = True
 
     def get(self, request):
-        cached = disk.get(REPORT_CACHE_KEY)
+        cache_key = REPORT_CACHE_KEY + namespace(GLOBAL_SCOPE)
+        cached = cache.get(cache_key)
         if cached is not None:
             return Response(cached)
 
-        total_items = Item.objects.count()
-        total_charities = Charity.objects.count()
+        with primary_reads():
+            charities = list(Charity.objects.filter(is_hidden=False)
+                             .values('id', 'name', 'stats__item_count', 'stats__price_total'))
+            daily = self.daily_series()
+            category_mix = self.category_mix()
+            recently_sold = self.recently_sold()
 
-        all_charities = Charity.objects.all()
         items_per_charity = []
-
-        for charity in all_charities:
-            item_count = Item.objects.filter(charity=charity).count()
-            items_per_charity.append({"name": charity.name, "item_count": item_count})
+        for charity in charities:
+            item_count = charity['stats__item_count'] or 0
+            price_total = charity['stats__price_total'] or 0
+            items_per_charity.append({
+                "id": charity['id'],
+                "name": charity['name'],
+                "item_count": item_count,
+                "average_price": round(float(price_total) / item_count, 2) if item_count else None,
+                "category_mix": category_mix.get(charity['id'], []),
+                "daily": daily.get(charity['id'], []),
+                "recently_sold": recently_sold.get(charity['id'], {"count": 0, "price_total": 0.0}),
+            })
 
         report_data = {
-            'total_items': total_items,
-            'total_charities': total_charities,
-            'items_per_charity': items_per_charity
+            'total_items': sum(entry['item_count'] for entry in items_per_charity),
+            'total_charities': len(items_per_charity),
+            'items_per_charity': items_per_charity,
+            'daily': self.combined_series(daily),
+            'recently_sold': sum(entry['count'] for entry in recently_sold.values()),
+        }
+
+        cache.set(cache_key, report_data, REPORT_CACHE_TTL)
+        return Response(report_data)
+
+    def daily_series(self):
+        since = timezone.localdate() - datetime.timedelta(days=REPORT_DAYS - 1)
+        series = defaultdict(list)
+
+        for row in (CharityDailyStats.objects.filter(day__gte=since).order_by('day')
+                    .values('charity_id', 'day', 'added', 'removed')):
+            series[row['charity_id']].append(
+                {"day": row['day'].isoformat(), "added": row['added'], "removed": row['removed']}
+            )
+        return series
+
+    def combined_series(self, daily):
+        totals = defaultdict(lambda: {"added": 0, "removed": 0})
+        for entries in daily.values():
+            for entry in entries:
+                totals[entry["day"]]["added"] += entry["added"]
+                totals[entry["day"]]["removed"] += entry["removed"]
+
+        return [{"day": day, **totals[day]} for day in sorted(totals)]
+
+    def recently_sold(self):
+        """Items delisted in the report window, read from the archive rather than the live table."""
+        since = timezone.now() - datetime.timedelta(days=REPORT_DAYS)
+
+        return {
+            row['charity_id']: {"count": row['count'], "price_total": float(row['price_total'] or 0)}
+            for row in (ItemArchive.objects.filter(archived_at__gte=since, reason=ItemArchive.REASON_DELISTED)
+                        .values('charity_id').annotate(count=Count('id'), price_total=Sum('price')))
         }
 
-        disk.set(REPORT_CACHE_KEY, report_data, REPORT_CACHE_TTL)
-        return Response(report_data)
\ No newline at end of file
+    def category_mix(self):
+        mix = defaultdict(list)
+
+        for row in (FacetCount.objects.filter(facet='charity', count__gt=0).exclude(scope='')
+                    .order_by('-count').values('scope', 'value', 'count')):
+            entries = mix[int(row['value'])]
+            if len(entries) < CATEGORY_MIX_SIZE:
+                entries.append({"category": row['scope'], "count": row['count']})
+        return mix
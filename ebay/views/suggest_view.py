@@ -0,0 +1,17 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from ebay.suggest import get_suggester, DEFAULT_LIMIT
+
+
+class ItemSuggestView(APIView):
+
+    def get(self, request):
+        text = request.query_params.get('q', '')
+
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            return Response("limit must be an integer", status=400)
+
+        suggestions = get_suggester().suggest(text, limit)
+        return Response({"query": text, "suggestions": suggestions})
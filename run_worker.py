@@ -1,7 +1,8 @@
 import os
 import django
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'your_project.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'charityshopbackend.settings')
+os.environ.setdefault('PROCESS_TYPE', 'worker')
 django.setup()
 
 from redis import Redis